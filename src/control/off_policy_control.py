@@ -67,6 +67,25 @@ class OffPolicyControl:
 
         self.policy_update_after_episode(mdp)
 
+    def learn_recorded_episode(self, episode):
+        # Learns from an episode that was generated elsewhere (e.g. by an actor process), with the
+        # same updates as `learn_episode`. The episode is an `mdp.EpisodeRecord`.
+
+        self.try_initialize_state(episode.state_history[0], episode.available_actions_history[0])
+
+        for t, current_action in enumerate(episode.action_history):
+
+            current_state = episode.state_history[t]
+            next_state = episode.state_history[t+1]
+            next_reward = episode.reward_history[t+1]
+
+            self.try_initialize_state(next_state, episode.available_actions_history[t+1])
+            self.policy_update_after_step(current_state, current_action,
+                                          next_state, next_reward,
+                                          episode)
+
+        self.policy_update_after_episode(episode)
+
     def generate_episode_with_target_policy(self, mdp, step_limit=None, per_step_callback=None):
 
         self.try_initialize_state(mdp.state, mdp.available_actions)
@@ -0,0 +1,30 @@
+from .policy import QTableFile
+
+import argparse
+import pickle
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Converts q-tables between pickle files (as written by older versions of the training script) and the binary q-table format')
+    parser.add_argument('input_file', help='A pickle file or a binary q-table file. The format is detected automatically.')
+    parser.add_argument('output_file', help='The converted file, in the other format.')
+
+    args = parser.parse_args()
+
+    if QTableFile.is_q_table_file(args.input_file):
+
+        with QTableFile(args.input_file) as q_table_file:
+            q_table = q_table_file.to_dict()
+
+        with open(args.output_file, 'wb') as f:
+            pickle.dump(q_table, f)
+
+    else:
+
+        with open(args.input_file, 'rb') as f:
+            q_table = pickle.load(f)
+
+        QTableFile.write(args.output_file, q_table.items())
+
+if __name__ == '__main__':
+    main()
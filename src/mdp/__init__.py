@@ -1,9 +1,12 @@
+from .lru_cache import LRUCache
+from .state_interner import StateInterner
 from .markov_decision_procedure import MarkovDecisionProcedure
 from .blocksworld import BlocksWorld, BlocksWorldBuilder
 from .vacuum_cleaner_world import VacuumCleanerWorld, VacuumCleanerWorldBuilder
 from .sokoban import Sokoban, SokobanBuilder
 from .gym_minigrid import GymMinigrid, GymMinigridBuilder, GymMinigridCustomLevelBuilder
 from .sliding_puzzle import SlidingPuzzle, SlidingPuzzleBuilder
-from .state_history import StateHistory
+from .state_history import StateHistory, EpisodeRecord
+from .vector_mdp import VectorMDP
 
 from . import abstraction
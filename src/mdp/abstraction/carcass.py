@@ -1,8 +1,8 @@
 import os
 import random
-import clingo
 
 from .. import StateHistory
+from .carcass_engine import CarcassEngine
 
 class Carcass(StateHistory):
 
@@ -10,12 +10,15 @@ class Carcass(StateHistory):
     def file_path(file_name):
         return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'carcass_rules', file_name)
 
-    def __init__(self, mdp, rules_filename, debug=False):
+    def __init__(self, mdp, rules_filename, debug=False, abstraction_cache=None):
 
         self.mdp = mdp
         self.rules_filename = rules_filename 
         self.debug = debug
 
+        # Optional `LRUCache`, shared by all carcasses of a builder.
+        self.abstraction_cache = abstraction_cache
+
         self.available_actions=set()
         self._ground_actions=dict()
         self.state=None
@@ -29,29 +32,15 @@ class Carcass(StateHistory):
     def ground_state(self):
         return self.mdp.ground_state
 
-    def _update_abstract_state(self):
-
-        ctl = clingo.Control()
-        ctl.load(self.file_path(self.rules_filename))
-        ctl.add('base', [], ' '.join(f'{s}.' for s in self.mdp.state))
-        ctl.add('base', [], ' '.join(f'{s}.' for s in self.mdp.state_static))
-
-        if self.debug:
-           ctl.add('base', [], '#show highlight/3. #show line/3. #show arrow/3.')
-
-        ctl.configuration.solve.models = 0  # create all stable models and find the optimal one
-        ctl.ground(parts=[('base', [])])
+    def _compute_abstraction(self):
 
-        solvehandle = ctl.solve(yield_=True)
+        engine = CarcassEngine.for_rules(self.file_path(self.rules_filename), self.debug)
+        symbols = engine.solve(self.mdp.state | self.mdp.state_static)
 
-        model = list(solvehandle)[0]
-
-    
         #self.state=f'abstract{rule_id}'
-        self.available_actions = set()
-        self._ground_actions=dict()
+        ground_actions = dict()
 
-        self._asp_model_symbols = list(model.symbols(shown=True))
+        self._asp_model_symbols = symbols
 
         state_name = ''
         
@@ -68,10 +57,31 @@ class Carcass(StateHistory):
                 abstract_action =  str(symbol.arguments[0])
                 ground_action = str(symbol.arguments[1])
         
-                self.available_actions.add(abstract_action)
-        
-                self._ground_actions[abstract_action] = self._ground_actions.get(abstract_action, set()) | {ground_action}
+                ground_actions[abstract_action] = ground_actions.get(abstract_action, frozenset()) | {ground_action}
+
+        return state_name, ground_actions
+
+    def _update_abstract_state(self):
+
+        # In debug mode, the abstraction is always computed, so that the debug output
+        # belongs to the current state.
+        if self.abstraction_cache is None or self.debug:
+            state_name, ground_actions = self._compute_abstraction()
+
+        else:
+
+            # The abstraction only depends on the ground state and the static facts.
+            key = (self.rules_filename, frozenset(self.mdp.state), frozenset(self.mdp.state_static))
+            cached_abstraction = self.abstraction_cache.get(key)
+
+            if cached_abstraction is None:
+                cached_abstraction = self._compute_abstraction()
+                self.abstraction_cache.put(key, cached_abstraction)
+
+            state_name, ground_actions = cached_abstraction
 
+        self.available_actions = set(ground_actions.keys())
+        self._ground_actions = dict(ground_actions)
 
         if state_name == 'carcass_gutter':
             
@@ -0,0 +1,91 @@
+import clingo
+import clingo.ast
+
+from typing import Set, Dict, Tuple, List, Iterable
+
+from ..clingo_engine import MultiShotEngine
+
+class CarcassEngine(MultiShotEngine):
+    """
+    A long-lived clingo program for the rules of a carcass.
+
+    The rules file is read and parsed only once. If the rules do not contain optimization statements,
+    they are also grounded only once (multi-shot solving): the atoms of the current ground state are
+    `#external` atoms (see `MultiShotEngine`).
+
+    Rules with optimization statements (e.g. the shortest paths of the minigrid carcasses) are
+    grounded again with the state as facts for every call. Without facts, the grounder cannot
+    simplify the search space, and solving becomes much more expensive than grounding.
+    """
+
+    # The inputs are the atoms of the ground state, which the rules never derive.
+    _INPUTS = { 'atom': [] }
+
+    # Engines are shared by all carcasses that use the same rules file.
+    @classmethod
+    def for_rules(cls, rules_file_path: str, debug: bool = False) -> 'CarcassEngine':
+        return cls.shared(rules_file_path, debug)
+
+    def __init__(self, rules_file_path: str, debug: bool = False):
+
+        super().__init__()
+
+        self.rules_file_path: str = rules_file_path
+        self.debug: bool = debug
+
+        self._statements: List[clingo.ast.AST] = list()
+        clingo.ast.parse_files([rules_file_path], self._statements.append)
+
+        self.has_optimization: bool = any(s.ast_type == clingo.ast.ASTType.Minimize
+                                          for s in self._statements)
+
+    def solve(self, atoms: Iterable[str]) -> List[clingo.Symbol]:
+
+        atoms = set(atoms)
+
+        if self.has_optimization:
+
+            ctl = self._ground_rules(facts=atoms, externals=set())
+
+        else:
+
+            self._assign_externals([{ 'atom': atoms }])
+            ctl = self._ctl
+
+        symbols = None
+
+        # With the default configuration (`models = 1`) clingo stops after the first model, unless
+        # the rules contain optimization statements. Then it yields better and better models until
+        # the optimal one is found. Only the last model is kept.
+        with ctl.solve(yield_=True) as solvehandle:
+            for model in solvehandle:
+                symbols = model.symbols(shown=True)
+
+        if symbols is None:
+            raise ValueError(f'the carcass {self.rules_file_path} has no model for {sorted(atoms)}')
+
+        return symbols
+
+    def _ground_program(self, atoms: Dict[str, Set[str]]) -> clingo.Control:
+        return self._ground_rules(facts=set(), externals=atoms['atom'])
+
+    def _external_symbols(self, kind: str, atom: str) -> List[clingo.Symbol]:
+        return [clingo.parse_term(atom)]
+
+    def _ground_rules(self, facts: Set[str], externals: Set[str]) -> clingo.Control:
+
+        ctl = clingo.Control()
+
+        with clingo.ast.ProgramBuilder(ctl) as builder:
+            for statement in self._statements:
+                builder.add(statement)
+
+        ctl.add('base', [], ' '.join(f'{a}.' for a in facts))
+        ctl.add('base', [], ' '.join(f'#external {a}.' for a in externals))
+
+        if self.debug:
+           ctl.add('base', [], '#show highlight/3. #show line/3. #show arrow/3.')
+
+        ctl.ground(parts=[('base', [])])
+
+        return ctl
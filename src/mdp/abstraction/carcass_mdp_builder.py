@@ -1,14 +1,16 @@
 from . import Carcass
+from ..lru_cache import LRUCache
 
 class CarcassBuilder:
 
-    def __init__(self, mdp_builder, rules_filename):
+    def __init__(self, mdp_builder, rules_filename, abstraction_cache: LRUCache = None):
         self.mdp_builder = mdp_builder
         self.rules_filename = rules_filename
+        self.abstraction_cache = abstraction_cache
 
     def build_mdp(self):
         ground_mdp = self.mdp_builder.build_mdp()
-        return Carcass(ground_mdp, self.rules_filename)
+        return Carcass(ground_mdp, self.rules_filename, abstraction_cache=self.abstraction_cache)
 
     @property
     def mdp_interface_file_path(self):
@@ -8,16 +8,22 @@ from . import PrologInterface
 
 class PrologCarcass(StateHistory):
 
+    # The abstract state name, and all pairs of abstract and ground actions
+    queries = ['choose(S)', 'choose(S), abstractAction(AAbs,ACon)']
+
     @staticmethod
     def file_path(file_name):
         return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'prolog_carcass_rules', file_name)
 
-    def __init__(self, mdp, rules_filename, debug=False):
+    def __init__(self, mdp, rules_filename, debug=False, abstraction_cache=None):
 
         self.mdp = mdp
         self.rules_filename = rules_filename 
         self.debug = debug
 
+        # Optional `LRUCache`, shared by all carcasses of a builder.
+        self.abstraction_cache = abstraction_cache
+
         self.available_actions=set()
         self._ground_actions=dict()
         self.state=None
@@ -31,27 +37,59 @@ class PrologCarcass(StateHistory):
     def ground_state(self):
         return self.mdp.ground_state
 
-    def _update_abstract_state(self):
-
+    @staticmethod
+    def knowledge_base(ground_state, state_static):
+        return [f'{s}' for s in ground_state] + [f'{s}' for s in state_static]
 
-        prolog = PrologInterface()
-        facts = [f'{s}' for s in self.mdp.state] + [f'{s}' for s in self.mdp.state_static]
-        query_results = prolog.run_query(consult_file=self.file_path(self.rules_filename), 
-                                            knowledge_base=facts,
-                                            queries=['choose(S)', 'choose(S), abstractAction(AAbs,ACon)'])
+    @staticmethod
+    def abstraction_from_query_results(query_results):
 
         state_name=f'carcass_{query_results[0][0]['S']}'
 
-        self.available_actions = set()
-        self._ground_actions=dict()
+        ground_actions = dict()
         for computed_answer in query_results[1]:
                 
             abstract_action = computed_answer['AAbs'].replace(' ','')
             ground_action = computed_answer['ACon'].replace(' ','')
         
-            self.available_actions.add(abstract_action)
-        
-            self._ground_actions[abstract_action] = self._ground_actions.get(abstract_action, set()) | {ground_action}
+            ground_actions[abstract_action] = ground_actions.get(abstract_action, frozenset()) | {ground_action}
+
+        return state_name, ground_actions
+
+    def _compute_abstraction(self):
+
+        prolog = PrologInterface()
+        query_results = prolog.run_query(consult_file=self.file_path(self.rules_filename), 
+                                         knowledge_base=self.knowledge_base(self.mdp.state, self.mdp.state_static),
+                                         queries=self.queries)
+
+        return self.abstraction_from_query_results(query_results)
+
+    @staticmethod
+    def abstraction_cache_key(rules_filename, ground_state, state_static):
+        return (rules_filename, frozenset(ground_state), frozenset(state_static))
+
+    def _update_abstract_state(self):
+
+        # In debug mode, the abstraction is always computed, so that the debug output
+        # belongs to the current state.
+        if self.abstraction_cache is None or self.debug:
+            state_name, ground_actions = self._compute_abstraction()
+
+        else:
+
+            # The abstraction only depends on the ground state and the static facts.
+            key = self.abstraction_cache_key(self.rules_filename, self.mdp.state, self.mdp.state_static)
+            cached_abstraction = self.abstraction_cache.get(key)
+
+            if cached_abstraction is None:
+                cached_abstraction = self._compute_abstraction()
+                self.abstraction_cache.put(key, cached_abstraction)
+
+            state_name, ground_actions = cached_abstraction
+
+        self.available_actions = set(ground_actions.keys())
+        self._ground_actions = dict(ground_actions)
 
         if state_name == 'carcass_gutter':
             
@@ -1,14 +1,36 @@
-from . import PrologCarcass
+from . import PrologCarcass, PrologInterface
+from ..lru_cache import LRUCache
 
 class PrologCarcassBuilder:
 
-    def __init__(self, mdp_builder, rules_filename):
+    def __init__(self, mdp_builder, rules_filename, abstraction_cache: LRUCache = None):
         self.mdp_builder = mdp_builder
         self.rules_filename = rules_filename
+        self.abstraction_cache = abstraction_cache
 
     def build_mdp(self):
         ground_mdp = self.mdp_builder.build_mdp()
-        return PrologCarcass(ground_mdp, self.rules_filename)
+        return PrologCarcass(ground_mdp, self.rules_filename, abstraction_cache=self.abstraction_cache)
+
+    def precompute_abstractions(self, ground_states, state_static=None):
+        """
+        Fills the abstraction cache for many ground states at once, e.g. for all states of a replay
+        buffer or after the rules file was changed. Existing entries are overwritten.
+        """
+
+        assert self.abstraction_cache is not None, 'precomputing abstractions requires an abstraction cache'
+
+        ground_states = list(ground_states)
+        state_static = self.mdp_state_static if state_static is None else state_static
+        state_static = state_static or set()
+
+        knowledge_bases = [PrologCarcass.knowledge_base(s, state_static) for s in ground_states]
+        batch_query_results = PrologInterface().run_batch_query(knowledge_bases, PrologCarcass.queries,
+                                                                consult_file=PrologCarcass.file_path(self.rules_filename))
+
+        for ground_state, query_results in zip(ground_states, batch_query_results):
+            key = PrologCarcass.abstraction_cache_key(self.rules_filename, ground_state, state_static)
+            self.abstraction_cache.put(key, PrologCarcass.abstraction_from_query_results(query_results))
 
     @property
     def mdp_interface_file_path(self):
@@ -1,47 +1,114 @@
 from pyswip.prolog import Prolog
-from multiprocessing import Process, Queue
+from multiprocessing import Process, Pipe
+from threading import Lock
+
+def _prolog_worker(connection, consult_file):
+    """
+    Answers batches of queries sent over `connection` until it receives `None`.
+
+    The rules file is consulted only once. Each knowledge base of a batch is asserted before the
+    queries are run and retracted afterwards, so that every knowledge base sees the rules file only.
+    """
+
+    p = Prolog()
+
+    if consult_file:
+        p.consult(consult_file)
+
+    while True:
+
+        request = connection.recv()
+
+        if request is None:
+            break
+
+        knowledge_bases, queries = request
+        connection.send([_run_queries(p, knowledge_base, queries) for knowledge_base in knowledge_bases])
+
+    connection.close()
+
+def _run_queries(p, knowledge_base, queries):
+
+    asserted_formulas = []
+
+    try:
+
+        for formula in knowledge_base:
+            p.assertz(formula)
+            asserted_formulas.append(formula)
+
+        if isinstance(queries, list):
+            return [list(p.query(q)) for q in queries]
+        else:
+            return list(p.query(queries))
+
+    except Exception as e:
+        # Prolog exceptions can not always be pickled, so we only send the message.
+        return RuntimeError(f'Prolog query failed: {e}')
+
+    finally:
+        for formula in reversed(asserted_formulas):
+            p.retract(formula)
 
 class PrologInterface:
 
+    # One long-lived worker process per consulted file: (process, connection, lock)
+    _workers = dict()
+
     def run_query(self, knowledge_base=[], queries=[], consult_file=None):
         """
-        Starts a second process to run the queries.
-        This is to ensure that the knowledge base is wiped clean after every call to `run_query`!
+        Runs the queries in a second process, which is kept alive for later calls.
+        The knowledge base is wiped clean after every call to `run_query`!
         """
 
-        def worker(kb,queries,outq):
+        return self.run_batch_query([knowledge_base], queries, consult_file)[0]
 
-            p = Prolog()
+    def run_batch_query(self, knowledge_bases, queries=[], consult_file=None):
+        """
+        Runs the same queries against each of the knowledge bases, e.g. against many ground states.
+        All knowledge bases are sent to the worker at once. Returns one result per knowledge base.
+        """
+
+        process, connection, lock = self._worker_for(consult_file)
+
+        with lock:
+            try:
+                connection.send(([list(kb) for kb in knowledge_bases], queries))
+                responses = connection.recv()
+            except (EOFError, OSError):
+                # The worker died. Forget it, so that the next call starts a new one.
+                del self._workers[consult_file]
+                raise
 
-            if consult_file:
-                p.consult(consult_file)
+        for response in responses:
+            if isinstance(response, Exception):
+                raise response
 
-            for formula in knowledge_base:
-                p.assertz(formula)
+        return responses
 
-            if isinstance(queries, list):
-                
-                results = []
-                for q in queries:
-                    computed_answers = list(p.query(q))
-                    results.append(computed_answers)
+    @classmethod
+    def _worker_for(cls, consult_file):
 
-                outq.put(results)
+        if consult_file not in cls._workers:
 
-            else:
-                computed_answers = p.query(queries)
+            connection, worker_connection = Pipe()
+            process = Process(target=_prolog_worker, args=(worker_connection, consult_file), daemon=True)
+            process.start()
 
-                outq.put(list(computed_answers))
+            cls._workers[consult_file] = (process, connection, Lock())
 
-            #computed_answers = list(p.query(query))
-            #return computed_answers
+        return cls._workers[consult_file]
 
-        mp_q = Queue()
-        mp_p = Process(target=worker, args=(knowledge_base,queries,mp_q))
-        mp_p.start()
-        mp_r = mp_q.get()
-        mp_p.join()
-        
+    @classmethod
+    def shutdown(cls):
+        """
+        Stops all worker processes.
+        """
 
-        return mp_r
+        for process, connection, lock in cls._workers.values():
+            with lock:
+                connection.send(None)
+                connection.close()
+            process.join()
 
+        cls._workers.clear()
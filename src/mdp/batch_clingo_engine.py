@@ -0,0 +1,149 @@
+import clingo
+from clingo import ast
+
+from typing import Set, FrozenSet, Dict, Tuple, Iterable, List, Sequence
+
+from .clingo_engine import ClingoEngine, MultiShotEngine
+
+class _InstanceTagger(ast.Transformer):
+    """
+    Rewrites a domain program, such that every atom gets the index of an instance as a new first
+    argument (e.g. `tic(on(b1,table),0)` becomes `tic(I,on(b1,table),0)`), and every rule only
+    applies to the instances given by `rlasp_instance/1`.
+    """
+
+    VARIABLE = 'Instance__'
+    INSTANCE_PREDICATE = 'rlasp_instance'
+
+    def visit_SymbolicAtom(self, atom):
+        return atom.update(symbol=self._tag(atom.symbol))
+
+    def visit_Rule(self, rule):
+
+        rule = rule.update(**self.visit_children(rule))
+
+        location = rule.location
+        instance = ast.Function(location, self.INSTANCE_PREDICATE, [ast.Variable(location, self.VARIABLE)], 0)
+
+        return rule.update(body=list(rule.body) + [ast.Literal(location, ast.Sign.NoSign, ast.SymbolicAtom(instance))])
+
+    def visit_Defined(self, defined):
+        return defined.update(arity=defined.arity + 1)
+
+    def _tag(self, term):
+
+        # Classically negated atoms, e.g. `-tic(box(X,Y),T)`
+        if term.ast_type == ast.ASTType.UnaryOperation:
+            return term.update(argument=self._tag(term.argument))
+
+        variable = ast.Variable(term.location, self.VARIABLE)
+
+        # Atoms without arguments, e.g. `goal`
+        if term.ast_type == ast.ASTType.SymbolicTerm:
+            return ast.Function(term.location, term.symbol.name, [variable], 0)
+
+        return term.update(arguments=[variable] + list(term.arguments))
+
+class BatchClingoEngine(MultiShotEngine):
+    """
+    Computes the transitions of up to `size` ground MDPs of the same domain with one solver call.
+
+    The domain program is grounded once for all instances, with the index of the instance as an
+    additional first argument of every atom. The current states and actions of the instances are
+    `#external` atoms `currentState(I, ...)` and `currentAction(I, ...)` (see `MultiShotEngine`).
+    """
+
+    _INPUTS = {
+        'state': [('nextState', 2, 1)],
+        'action': [('nextExecutable', 2, 1), ('currentExecutable', 2, 1)],
+    }
+
+    @classmethod
+    def for_domain(cls, interface_file_path: str, problem_file_path: str,
+                   state_static: Iterable[str], size: int) -> 'BatchClingoEngine':
+        return cls.shared(interface_file_path, problem_file_path, frozenset(state_static), size)
+
+    def __init__(self, interface_file_path: str, problem_file_path: str, state_static: Iterable[str], size: int):
+
+        super().__init__()
+
+        self.interface_file_path: str = interface_file_path
+        self.problem_file_path: str = problem_file_path
+        self.state_static: FrozenSet[str] = frozenset(state_static)
+        self.size: int = size
+
+    def transitions(self, states_and_actions: Sequence[Tuple[Iterable[str], str]]) -> List[Tuple[FrozenSet[str], int, Set[str]]]:
+        """
+        Returns (next state, reward, available actions) for each pair of state and action,
+        like `ClingoEngine.transition`.
+        """
+
+        assert len(states_and_actions) <= self.size, f'at most {self.size} transitions can be computed at once'
+
+        states = [set(state) for state, _ in states_and_actions]
+        actions = [action for _, action in states_and_actions]
+
+        self._assign_externals([{ 'state': state, 'action': {action} } for state, action in zip(states, actions)])
+
+        next_states = [set() for _ in states]
+        next_rewards = [None for _ in states]
+        available_actions = [set() for _ in states]
+
+        with self._ctl.solve(yield_=True) as solvehandle:
+
+            model = solvehandle.model()
+
+            if model is None:
+                # The single engine reports which action is not executable.
+                for state, action in zip(states, actions):
+                    ClingoEngine.for_domain(self.interface_file_path, self.problem_file_path,
+                                            self.state_static).transition(state, action)
+                raise ValueError('not all actions are executable in their states')
+
+            for symbol in model.symbols(shown=True):
+
+                # Atoms are of the form `nextState(I, f(...))`, `nextReward(I, r)` and `nextExecutable(I, f(...))`
+                instance, argument = symbol.arguments
+
+                if symbol.name == 'nextState':
+                    next_states[instance.number].add(str(argument))
+
+                if symbol.name == 'nextReward':
+                    next_rewards[instance.number] = argument.number
+
+                if symbol.name == 'nextExecutable':
+                    available_actions[instance.number].add(str(argument))
+
+        return [(frozenset(next_state), next_reward, actions)
+                for next_state, next_reward, actions in zip(next_states, next_rewards, available_actions)]
+
+    def _ground_program(self, atoms: Dict[str, Set[str]]) -> clingo.Control:
+
+        ctl = clingo.Control()
+        tagger = _InstanceTagger()
+
+        # The domain is rewritten like the static facts, the externals are added per instance.
+        with ast.ProgramBuilder(ctl) as builder:
+
+            def add(statement):
+                builder.add(tagger(statement))
+
+            ast.parse_files([self.interface_file_path, self.problem_file_path], add)
+            ast.parse_string(' '.join(f'{s}.' for s in self.state_static), add)
+
+        instances = range(self.size)
+
+        ctl.add('base', [], ' '.join(f'{_InstanceTagger.INSTANCE_PREDICATE}({i}).' for i in instances))
+        ctl.add('base', [], ' '.join(f'#external currentState({i},{s}).' for s in atoms['state'] for i in instances))
+        ctl.add('base', [], ' '.join(f'#external currentAction({i},{a}).' for a in atoms['action'] for i in instances))
+        ctl.add('base', [], '#show nextState/2. #show nextReward/2. #show nextExecutable/2.')
+        ctl.ground(parts=[('base', [])])
+
+        return ctl
+
+    def _external_symbols(self, kind: str, atom: str) -> List[clingo.Symbol]:
+
+        name = 'currentState' if kind == 'state' else 'currentAction'
+        term = clingo.parse_term(atom)
+
+        return [clingo.Function(name, [clingo.Number(i), term]) for i in range(self.size)]
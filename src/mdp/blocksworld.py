@@ -1,28 +1,116 @@
 import os
-import clingo
 import random
-from typing import Set, List
+from typing import Set, List, FrozenSet, Dict
+
+import numpy as np
 
 from .markov_decision_procedure import MarkovDecisionProcedure
+from .lru_cache import LRUCache
+from .native_engine import NativeEngine, parse_atom
+from .ranked_states import RankedStates
+
+class BlocksWorldEngine(NativeEngine):
+    """
+    The transitions of `blocksworld.lp`, written in python.
+    """
+
+    def __init__(self, state_static):
+
+        super().__init__(state_static)
+
+        self.subgoals: Set = set()
+        for atom in state_static:
+            name, arguments = parse_atom(atom)
+            if name == 'subgoal':
+                self.subgoals.add(arguments)
+
+    def available_actions(self, state):
+
+        on, goal = self._parse_state(state)
+        blocks = { b for b, _ in on }
+
+        return self._executable(blocks, on, goal)
+
+    def transition(self, state, action):
+
+        on, goal = self._parse_state(state)
+        blocks = { b for b, _ in on }
+
+        name, (moved_block, location) = parse_atom(action)
+        if name != 'move' or not action in self._executable(blocks, on, goal):
+            raise ValueError(f"action '{action}' is not executable in state {sorted(state)}")
+
+        next_on = { (b, l) for b, l in on if b != moved_block } | { (moved_block, location) }
+        next_goal = self._is_goal(next_on)
+
+        # Reward: -1 for every action, +100 for reaching the goal
+        next_reward = -1
+        if next_goal and not goal:
+            next_reward += 100
+
+        next_state = { f'on({b},{l})' for b, l in next_on }
+        if next_goal:
+            next_state.add('goal')
+
+        return frozenset(next_state), next_reward, self._executable(blocks, next_on, next_goal)
+
+    def _parse_state(self, state):
+
+        on = set()
+        goal = False
+
+        for atom in state:
+            name, arguments = parse_atom(atom)
+            if name == 'on':
+                on.add(arguments)
+            elif name == 'goal':
+                goal = True
+
+        return on, goal or self._is_goal(on)
+
+    def _is_goal(self, on):
+        return self.subgoals <= on
+
+    def _executable(self, blocks, on, terminal):
+
+        if terminal:
+            return set()
+
+        occupied = { l for _, l in on if l in blocks }
+        free = { l for l in blocks | {'table'} if not l in occupied }
+
+        return { f'move({b},{l})' for b in blocks & free for l in free
+                 if b != l and not (b, l) in on }
 
 class BlocksWorld(MarkovDecisionProcedure):
 
-    def __init__(self, state_initial: Set[str], state_static: Set[str]):
+    native_engine_class = BlocksWorldEngine
+
+    def __init__(self, state_initial: Set[str], state_static: Set[str], transition_cache: LRUCache = None,
+                 transition_model: str = 'asp'):
 
         # No discounting in any blocks world
         discount_rate = 1.0
         
-        super().__init__(state_initial, state_static, discount_rate, 'blocksworld.lp')
+        super().__init__(state_initial, state_static, discount_rate, 'blocksworld.lp', transition_cache,
+                         transition_model)
 
 class BlocksWorldBuilder():
 
-    def __init__(self, blocks_world_size: int, state_enumeration_limit: int = 9, state_static: Set = None, reverse_stack_order = False):
+    # Probabilities of grounding a tower (see `_grounding_probabilities`), shared by all builders
+    # of the same size.
+    _grounding_probability_tables: Dict[int, np.ndarray] = dict()
+
+    def __init__(self, blocks_world_size: int, state_enumeration_limit: int = 9, state_static: Set = None, reverse_stack_order = False,
+                 transition_cache: LRUCache = None, transition_model: str = 'asp'):
 
         self.blocks_world_size: int = blocks_world_size
         self.state_enumeration_limit: int = state_enumeration_limit
+        self.transition_cache: LRUCache = transition_cache
+        self.transition_model: str = transition_model
 
-        # Used for sampling random states
-        self._g_cache = dict()
+        # Used for sampling random states, computed when needed
+        self._g_table: List[List[int]] = None
 
         self.block_terms: List[str] = [f'b{n}' for n in range(blocks_world_size)]
         if reverse_stack_order:
@@ -33,12 +121,10 @@ class BlocksWorldBuilder():
         else:
             self.state_static: Set = set(f'subgoal({x},{y})' for (x,y) in zip(self.block_terms, ['table']+self.block_terms))
 
-        self.file_name: str  = 'blocksworld_initial_states.lp'
-        self.file_path: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), self.file_name)
-
         if blocks_world_size <= state_enumeration_limit:
 
-            self.all_states: List[Set[str]] = self._generate_all_states()
+            # The states are not generated, but computed from their index when accessed.
+            self.all_states: RankedStates = RankedStates(self._g(blocks_world_size, 0), self._state_for_rank)
 
 
         sample_mdp = self.build_mdp()
@@ -51,7 +137,7 @@ class BlocksWorldBuilder():
         while True:
 
             state_start = self._generate_random_state()
-            mdp = BlocksWorld(state_start, self.state_static)
+            mdp = BlocksWorld(state_start, self.state_static, self.transition_cache, self.transition_model)
 
             # Continue generating random start states until we find one that is not equal to 
             # the goal state.
@@ -64,7 +150,7 @@ class BlocksWorldBuilder():
 
         if self.blocks_world_size <= self.state_enumeration_limit:
             # print('true random enumerated')
-            return random.choice(self.all_states)
+            return self._state_for_rank(random.randrange(self._g(self.blocks_world_size, 0)))
         #   else:
         #       print('pseudo random')
         #       return self._generate_pseudo_random_state()
@@ -78,72 +164,117 @@ class BlocksWorldBuilder():
         # in which there are k grounded towers and n ungrounded ones.
         # See p.123 of Slaney, Thiebaux. Blocks World revisited. 2021.
 
-        if n == 0:
-            return 1
+        # The counts are exact, and computed row by row without recursion:
+        # g(0, k) = 1, g(n, k) = g(n-1, k+1) + (n-1+k) * g(n-1, k) for all n + k <= size.
+        # The table grows quadratically with huge numbers, so it is only used for small sizes.
+        if self._g_table is None:
+
+            size = self.blocks_world_size
+            self._g_table = [[1] * (size + 1)]
+
+            for m in range(1, size + 1):
+                previous = self._g_table[-1]
+                self._g_table.append([previous[j+1] + (m-1+j) * previous[j] for j in range(size - m + 1)])
+
+        return self._g_table[n][k]
+
+    @classmethod
+    def _grounding_probabilities(cls, size: int) -> np.ndarray:
+
+        # p[φ, τ] = g(φ − 1, τ + 1)/g(φ, τ) is the probability of putting a tower onto the table,
+        # when there are φ ungrounded and τ grounded towers. The counts themselves overflow floats
+        # for large sizes, so the table is computed from the ratios q[n, k] = g(n, k)/g(n, k + 1),
+        # which stay close to 1:
+        #   q[0, k] = 1
+        #   q[n, k] = (1 + (n-1+k) q[n-1, k]) / (1/q[n-1, k+1] + n + k)
+        #   p[φ, τ] = 1 / (1 + (φ-1+τ) q[φ-1, τ])
+        if size not in cls._grounding_probability_tables:
 
-        # Chache the results to reduce redundant computations
-        if (n,k) in self._g_cache.keys():
-            return self._g_cache[n,k]
+            k = np.arange(size + 1, dtype=np.float64)
 
-        x = self._g(n-1,k+1) + (n-1+k) * self._g(n-1,k)
-        self._g_cache[n,k] = x
-        return x
+            q = np.ones((max(size, 1), size + 1))
+            for n in range(1, size):
+                m = size - n
+                q[n, :m] = (1 + (n-1+k[:m]) * q[n-1, :m]) / (1/q[n-1, 1:m+1] + n + k[:m])
+
+            p = np.zeros((size + 1, size + 1))
+            for phi in range(1, size + 1):
+                m = size - phi + 1
+                p[phi, :m] = 1 / (1 + (phi-1+k[:m]) * q[phi-1, :m])
+
+            cls._grounding_probability_tables[size] = p
+
+        return cls._grounding_probability_tables[size]
 
     def _generate_random_uniform_state(self):
 
         # Algorithm from page 126 of:
         # Slaney, Thiebaux. Blocks World revisited. 2021.
         # Samples blocksworld states from a random uniform distribution.
-        # Does not scale well but fine for our purposes.
-        # Better would be the algorithm on page 127.
+        # Every step takes constant time: the probabilities are looked up in a table that is
+        # computed once per size, and towers are only represented by their bottom and top blocks.
+        grounding_probabilities = self._grounding_probabilities(self.blocks_world_size)
+
+        on = dict()
 
         # (1) start with an empty table and n ungrounded towers each consisting of a single block,
-        ungrounded_towers = [ [b] for b in self.block_terms ]
-        grounded_towers = []
+        ungrounded_towers = [ (b, b) for b in self.block_terms ]
+        grounded_tops = []
 
         # (2) repeat until all towers are grounded:
         while(len(ungrounded_towers) > 0):
-        
+
             phi = len(ungrounded_towers)
-            tau = len(grounded_towers)
-        
+            tau = len(grounded_tops)
+
             # (2a) arbitrarily select one of the φ yet ungrounded towers,
-            t = ungrounded_towers.pop(random.randrange(len(ungrounded_towers)))
-        
-            if random.uniform(0.0,1.0) <= self._g(phi-1,tau+1)/self._g(phi,tau):
+            bottom, top = ungrounded_towers.pop()
+
+            if random.random() < grounding_probabilities[phi, tau]:
                 # (2b) select the table with probability g(φ − 1, τ + 1)/g(φ, τ ) ...
-                grounded_towers.append(t)
+                on[bottom] = 'table'
+                grounded_tops.append(top)
             else:
                 # (2b ct'd.) ... or one of the other towers (grounded or not) 
                 # each with probability g(φ − 1, τ )/g(φ, τ ), 
                 # and place the selected ungrounded tower onto it.
-                i = random.randrange(len(ungrounded_towers) + len(grounded_towers))
+                i = random.randrange(len(ungrounded_towers) + len(grounded_tops))
                 if i < len(ungrounded_towers):
-                    ungrounded_towers[i] += t
+                    other_bottom, other_top = ungrounded_towers[i]
+                    on[bottom] = other_top
+                    ungrounded_towers[i] = (other_bottom, top)
                 else:
-                    grounded_towers[i-len(ungrounded_towers)] += t
-        
-        generated_state = set()
-        for t in grounded_towers:
-            generated_state |= { f'on({x},{y})' for x,y in zip(t, ['table'] + t) }
-        
-        return generated_state
+                    on[bottom] = grounded_tops[i-len(ungrounded_towers)]
+                    grounded_tops[i-len(ungrounded_towers)] = top
 
-    def _generate_all_states(self):
+        return frozenset(f'on({x},{y})' for x, y in on.items())
 
-        ctl = clingo.Control()
+    def _state_for_rank(self, rank: int) -> FrozenSet[str]:
+
+        # Unranking: like `_generate_random_uniform_state`, but the choices are taken from `rank`
+        # instead of being random, and always the last ungrounded tower is selected. Each of the
+        # g(φ, τ) extensions of a part-state corresponds to exactly one rank in [0, g(φ, τ)):
+        # the first g(φ − 1, τ + 1) ranks put the tower on the table, each following block of
+        # g(φ − 1, τ) ranks puts it onto one of the other towers.
+        ungrounded_towers = [ [b] for b in self.block_terms ]
+        grounded_towers = []
 
-        ctl.load(self.file_path)
-        ctl.add('base', [], ' '.join(f'block({t}).' for t in self.block_terms))
-        ctl.add('base', [], '#show state/1.')
-        ctl.configuration.solve.models = 0
+        while(len(ungrounded_towers) > 0):
 
+            phi = len(ungrounded_towers)
+            tau = len(grounded_towers)
 
-        ctl.ground(parts=[('base', [])])
-        models = ctl.solve(yield_=True)
+            t = ungrounded_towers.pop()
 
-        generated_states = [frozenset(str(symbol.arguments[0]) 
-                                        for symbol in model.symbols(shown=True))
-                                for model in models]
+            ranks_on_table = self._g(phi-1, tau+1)
+
+            if rank < ranks_on_table:
+                grounded_towers.append(t)
+            else:
+                i, rank = divmod(rank - ranks_on_table, self._g(phi-1, tau))
+                if i < len(ungrounded_towers):
+                    ungrounded_towers[i] += t
+                else:
+                    grounded_towers[i-len(ungrounded_towers)] += t
 
-        return generated_states
+        return frozenset(f'on({x},{y})' for t in grounded_towers for x,y in zip(t, ['table'] + t))
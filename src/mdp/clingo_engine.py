@@ -0,0 +1,196 @@
+import clingo
+
+from typing import Set, FrozenSet, Dict, Tuple, Iterable, List, Sequence
+
+class MultiShotEngine:
+    """
+    Base class of the long-lived (multi-shot) clingo programs, whose inputs (e.g. the current state
+    and action) are not added as facts but as `#external` atoms, which are switched on and off for
+    every call.
+
+    Externals can only be declared for atoms that are known at grounding time. Whenever an input
+    contains an atom that was never seen before, the program is grounded again with an enlarged set
+    of externals. To keep this rare, every grounding also adds all atoms that the ground program
+    could possibly produce as later inputs.
+
+    Subclasses provide:
+
+     * `_INPUTS`: for each kind of input atoms (e.g. 'state'), the signatures (name, arity, argument)
+       of ground atoms whose argument may become an input atom of this kind later on,
+     * `_ground_program(atoms)`, which grounds the program with externals for the given atoms of
+       each kind and returns the `clingo.Control`,
+     * `_external_symbols(kind, atom)`, which returns the list of external symbols of an atom, one
+       per instance of the program (see `BatchClingoEngine`, all other engines have one instance).
+    """
+
+    _INPUTS: Dict[str, List[Tuple[str, int, int]]] = dict()
+
+    # Engines are shared by all users of the same program, by class and key.
+    _engines: Dict[Tuple[type, Tuple], 'MultiShotEngine'] = dict()
+
+    @classmethod
+    def shared(cls, *key) -> 'MultiShotEngine':
+
+        engine = MultiShotEngine._engines.get((cls, key))
+
+        if engine is None:
+            engine = MultiShotEngine._engines[cls, key] = cls(*key)
+
+        return engine
+
+    def __init__(self):
+
+        # Known atoms of each kind, mapped to their external symbols
+        self._externals: Dict[str, Dict[str, List[clingo.Symbol]]] = { kind: dict() for kind in self._INPUTS }
+
+        # Atoms that the last ground program could reach, but for which no external exists yet.
+        self._reachable_atoms: Dict[str, Set[str]] = { kind: set() for kind in self._INPUTS }
+
+        self._ctl: clingo.Control = None
+        self._externals_set_to_true: Set[clingo.Symbol] = set()
+
+    def _assign_externals(self, inputs: Sequence[Dict[str, Iterable[str]]]):
+        """
+        Switches on exactly the externals of the given input atoms (by kind, for each instance),
+        and grounds the program again if necessary.
+        """
+
+        unknown_atoms = { kind: set() for kind in self._INPUTS }
+        for instance_inputs in inputs:
+            for kind, atoms in instance_inputs.items():
+                unknown_atoms[kind].update(a for a in atoms if a not in self._externals[kind])
+
+        if self._ctl is None or any(unknown_atoms.values()):
+            self._ground(unknown_atoms)
+
+        externals = { self._externals[kind][atom][instance]
+                      for instance, instance_inputs in enumerate(inputs)
+                      for kind, atoms in instance_inputs.items()
+                      for atom in atoms }
+
+        for symbol in self._externals_set_to_true - externals:
+            self._ctl.assign_external(symbol, False)
+        for symbol in externals - self._externals_set_to_true:
+            self._ctl.assign_external(symbol, True)
+        self._externals_set_to_true = externals
+
+    def _ground(self, unknown_atoms: Dict[str, Set[str]]):
+
+        atoms = { kind: self._externals[kind].keys() | self._reachable_atoms[kind] | unknown_atoms[kind]
+                  for kind in self._INPUTS }
+
+        self._ctl = self._ground_program(atoms)
+        self._externals_set_to_true = set()
+        self._externals = { kind: { a: self._external_symbols(kind, a) for a in atoms[kind] }
+                            for kind in self._INPUTS }
+
+        # Remember everything the ground program could reach, so that these atoms
+        # will get externals of their own once grounding is necessary again.
+        symbolic_atoms = self._ctl.symbolic_atoms
+        self._reachable_atoms = { kind: { str(a.symbol.arguments[argument])
+                                          for name, arity, argument in signatures
+                                          for a in symbolic_atoms.by_signature(name, arity) }
+                                        - self._externals[kind].keys()
+                                  for kind, signatures in self._INPUTS.items() }
+
+class ClingoEngine(MultiShotEngine):
+    """
+    A long-lived (multi-shot) clingo program describing the transitions of a ground MDP.
+
+    The domain is loaded and grounded once. The current state and action are `#external` atoms
+    `currentState(...)` and `currentAction(...)` (see `MultiShotEngine`). Therefore a transition
+    costs one call to the solver but no parsing and (mostly) no grounding.
+    """
+
+    _INPUTS = {
+        'state': [('nextState', 1, 0)],
+        'action': [('nextExecutable', 1, 0), ('currentExecutable', 1, 0)],
+    }
+
+    # Engines are shared by all MDPs that use the same domain files and static facts.
+    @classmethod
+    def for_domain(cls, interface_file_path: str, problem_file_path: str,
+                   state_static: Iterable[str]) -> 'ClingoEngine':
+        return cls.shared(interface_file_path, problem_file_path, frozenset(state_static))
+
+    def __init__(self, interface_file_path: str, problem_file_path: str, state_static: Iterable[str]):
+
+        super().__init__()
+
+        self.interface_file_path: str = interface_file_path
+        self.problem_file_path: str = problem_file_path
+        self.state_static: FrozenSet[str] = frozenset(state_static)
+
+    def available_actions(self, state: Iterable[str]) -> Set[str]:
+
+        available_actions = set()
+        for symbol in self._solve(state, None):
+
+            # We expect atoms of the form `currentExecutable(move(X, Y)`
+            # but we are only interested in the first argument `move(X, Y)`
+            if symbol.name == 'currentExecutable':
+                available_actions.add(str(symbol.arguments[0]))
+
+        return available_actions
+
+    def transition(self, state: Iterable[str], action: str) -> Tuple[FrozenSet[str], int, Set[str]]:
+
+        next_reward = None
+        next_state = set()
+        available_actions = set()
+
+        for symbol in self._solve(state, action):
+
+            if symbol.name == 'nextState':
+
+                #˙Atom is of the form `state(f(...))`
+                # where`f(...)` is an uninterpreted function belonging to the state representation.
+                next_state.add(str(symbol.arguments[0]))
+
+            if symbol.name == 'nextReward':
+
+                # Atom is of the form `nextReward(r)`, and `r` is the reward.
+                next_reward = symbol.arguments[0].number
+
+            if symbol.name == 'nextExecutable':
+
+                # Atom is of the form `nextExecutable(f(...))`
+                # where`f(...)` is an uninterpreted function representing an executable action.
+                available_actions.add(str(symbol.arguments[0]))
+
+        return frozenset(next_state), next_reward, available_actions
+
+    def _solve(self, state: Iterable[str], action: str):
+
+        state = set(state)
+        actions = set() if action is None else {action}
+
+        self._assign_externals([{ 'state': state, 'action': actions }])
+
+        with self._ctl.solve(yield_=True) as solvehandle:
+
+            # Since we are only modelling deterministic actions, there is only one possible model.
+            model = solvehandle.model()
+
+            if model is None:
+                raise ValueError(f"action '{action}' is not executable in state {sorted(state)}")
+
+            return model.symbols(shown=True)
+
+    def _ground_program(self, atoms: Dict[str, Set[str]]) -> clingo.Control:
+
+        ctl = clingo.Control()
+        ctl.load(self.interface_file_path)
+        ctl.load(self.problem_file_path)
+        ctl.add('base', [], ' '.join(f'{s}.' for s in self.state_static))
+        ctl.add('base', [], ' '.join(f'#external currentState({s}).' for s in atoms['state']))
+        ctl.add('base', [], ' '.join(f'#external currentAction({a}).' for a in atoms['action']))
+        ctl.add('base', [], '#show nextState/1. #show nextReward/1. #show nextExecutable/1. '
+                            '#show currentExecutable/1.')
+        ctl.ground(parts=[('base', [])])
+
+        return ctl
+
+    def _external_symbols(self, kind: str, atom: str) -> List[clingo.Symbol]:
+        name = 'currentState' if kind == 'state' else 'currentAction'
+        return [clingo.Function(name, [clingo.parse_term(atom)])]
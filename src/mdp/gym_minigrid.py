@@ -1,7 +1,9 @@
 import random
 import copy
 import os
+import weakref
 
+import numpy as np
 import gymnasium as gym
 import minigrid
 from minigrid.wrappers import FullyObsWrapper
@@ -59,16 +61,63 @@ def world_object_tuple_to_term(x, y, type_idx, color_idx, state_idx):
     else:
         return f'obj({atom},({x},{y}))'
 
+def _world_object_tuple_to_atom_or_none(type_idx, color_idx, state_idx):
+
+    # Only agents and doors have states, and not all state indices are used by them.
+    try:
+        return world_object_tuple_to_atom(type_idx, color_idx, state_idx)
+    except KeyError:
+        return None
+
+# Observations encode each grid cell as a tuple (type, color, state). These are numbered as
+# cell codes `(type * NUM_COLORS + color) * NUM_STATES + state`, which index the atom table.
+NUM_TYPES = len(minigrid.core.constants.IDX_TO_OBJECT)
+NUM_COLORS = len(minigrid.core.constants.IDX_TO_COLOR)
+NUM_STATES = max(len(IDX_TO_AGENT_DIRECTION), len(IDX_TO_DOOR_STATE))
+
+CELL_CODE_TO_ATOM = np.array([ _world_object_tuple_to_atom_or_none(type_idx, color_idx, state_idx)
+                               for type_idx in range(NUM_TYPES)
+                               for color_idx in range(NUM_COLORS)
+                               for state_idx in range(NUM_STATES) ], dtype=object)
+
+CELL_CODE_IS_OBJECT = np.array([ atom is not None for atom in CELL_CODE_TO_ATOM ])
+
+# The terms `obj(atom,(x,y))` of all cells seen so far, by (x, y, cell code)
+_cell_terms = dict()
+
+def observation_image_to_cell_codes(img):
+
+    img = img.astype(np.intp)
+    return (img[:,:,0] * NUM_COLORS + img[:,:,1]) * NUM_STATES + img[:,:,2]
+
+def cell_code_to_term(x, y, cell_code):
+
+    term = _cell_terms.get((x, y, cell_code))
+
+    if term is None:
+        term = f'obj({CELL_CODE_TO_ATOM[cell_code]},({x},{y}))'
+        _cell_terms[x, y, cell_code] = term
+
+    return term
+
 class GymMinigrid(StateHistory):
 
-    def __init__(self, env, use_alternative_reward_system=False):
+    def __init__(self, env, use_alternative_reward_system=False, seed=None):
 
         self.env = env
         self.use_alternative_reward_system = use_alternative_reward_system
 
         self.done = False
 
-        result = self.env.reset(seed=random.randint(0, 9999))
+        # The cell codes of the last observation, and the terms of its non-empty cells by
+        # position. Only the cells that change are encoded again.
+        self._cell_codes = None
+        self._cell_terms = dict()
+
+        if seed is None:
+            seed = random.randint(0, 9999)
+
+        result = self.env.reset(seed=seed)
         observation = result[0]
         self.state = self._observation_to_state(observation)
         self.state_static = set()
@@ -81,11 +130,26 @@ class GymMinigrid(StateHistory):
 
     def _observation_to_state(self, obs):
 
-        img = obs['image']
-        width, height, channels = img.shape
+        cell_codes = observation_image_to_cell_codes(obs['image'])
 
-        state = { world_object_tuple_to_term(x, y, *img[x,y]) 
-                    for x in range(width) for y in range(height) } - { None }
+        if self._cell_codes is None or self._cell_codes.shape != cell_codes.shape:
+            self._cell_terms = dict()
+            changed_cells = np.argwhere(CELL_CODE_IS_OBJECT[cell_codes])
+        else:
+            changed_cells = np.argwhere(cell_codes != self._cell_codes)
+
+        self._cell_codes = cell_codes
+
+        changed_codes = cell_codes[changed_cells[:,0], changed_cells[:,1]]
+
+        for (x, y), cell_code in zip(changed_cells.tolist(), changed_codes.tolist()):
+
+            if CELL_CODE_IS_OBJECT[cell_code]:
+                self._cell_terms[x, y] = cell_code_to_term(x, y, cell_code)
+            else:
+                self._cell_terms.pop((x, y), None)
+
+        state = set(self._cell_terms.values())
 
         carrying = self.env.unwrapped.carrying
         if carrying:
@@ -141,25 +205,44 @@ class GymMinigrid(StateHistory):
 class GymMinigridBuilder:
 
     def __init__(self, env_label='MiniGrid-MultiRoom-N6-v0', full_observability=True, 
-                 use_alternative_reward_system=False):
+                 use_alternative_reward_system=False, seed=None):
 
         self.env_label = env_label
         self.full_observability = full_observability
         self.use_alternative_reward_system = use_alternative_reward_system
 
+        # Environments of MDPs that are gone (garbage collected), which are reset for new episodes
+        # instead of making new ones. As long as an MDP exists, e.g. to render a finished episode,
+        # it keeps its environment.
+        self.env_pool = []
+
+        self.seed(seed)
+
         # So far, no planner is available for this.
         self.mdp_interface_file_path = None
         self.mdp_problem_file_path = None
         self.mdp_state_static = None
 
+    def seed(self, seed=None):
+
+        # Without a seed, the levels are drawn with the global random generator.
+        self._random = random if seed is None else random.Random(seed)
+
     def build_mdp(self):
 
-        env = gym.make(self.env_label)
+        if self.env_pool:
+            env = self.env_pool.pop()
 
-        if self.full_observability:
-            env = FullyObsWrapper(env)
+        else:
+            env = gym.make(self.env_label)
+
+            if self.full_observability:
+                env = FullyObsWrapper(env)
+
+        mdp = GymMinigrid(env, self.use_alternative_reward_system, self._random.randint(0, 9999))
+        weakref.finalize(mdp, self.env_pool.append, env)
 
-        return GymMinigrid(env, self.use_alternative_reward_system)
+        return mdp
 
 
 class CustomMinigridEnvironment(MiniGridEnv):
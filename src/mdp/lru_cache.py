@@ -0,0 +1,81 @@
+import os
+import pickle
+
+from collections import OrderedDict
+from typing import Any, Hashable
+
+class LRUCache:
+    """
+    A bounded dictionary which evicts the least recently used entries first.
+
+    Counts hits and misses, and can be stored to / loaded from disk so that a warm cache can be
+    reused across training runs. Copying a cache returns the cache itself, since it is meant to be
+    shared (e.g. by all MDPs built by the same builder).
+    """
+
+    def __init__(self, max_size: int = 100000, file_path: str = None):
+
+        self.max_size: int = max_size
+        self.file_path: str = file_path
+
+        self._entries: OrderedDict = OrderedDict()
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+        if file_path and os.path.exists(file_path):
+            self.load(file_path)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable):
+        return key in self._entries
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        else:
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any):
+
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def save(self, file_path: str = None):
+
+        file_path = file_path or self.file_path
+        with open(file_path, 'wb') as f:
+            pickle.dump(list(self._entries.items()), f)
+
+    def load(self, file_path: str = None):
+
+        file_path = file_path or self.file_path
+        with open(file_path, 'rb') as f:
+            for key, value in pickle.load(f):
+                self.put(key, value)
@@ -1,20 +1,25 @@
 import os
-import clingo
 import random
 
-from typing import Set, List
+from typing import Set, List, FrozenSet, Tuple
 
 from .state_history import StateHistory
+from .clingo_engine import ClingoEngine
+from .lru_cache import LRUCache
+from .native_engine import DifferentialEngine
 
 class MarkovDecisionProcedure(StateHistory):
 
+    # Domains with a transition model written in python override this with a `NativeEngine` subclass.
+    native_engine_class = None
+
     @staticmethod
     def file_path(file_name):
         return os.path.join(os.path.dirname(os.path.abspath(__file__)), file_name)
 
     def __init__(self, state_initial: Set[str], state_static: Set[str], discount_rate: float,
-                 problem_file_name: str):
-        
+                 problem_file_name: str, transition_cache: LRUCache = None, transition_model: str = 'asp'):
+
         super().__init__(frozenset(state_initial))
 
         self.state: Set[str] = frozenset(state_initial)
@@ -25,6 +30,15 @@ class MarkovDecisionProcedure(StateHistory):
         self.interface_file_name: str = 'markov_decision_procedure.lp'
         self.problem_file_name: str = problem_file_name
 
+        # All ASP domains are deterministic, so transitions can be shared across MDPs and episodes.
+        self.transition_cache: LRUCache = transition_cache
+
+        # Transitions are computed by the ASP encoding (`asp`), by a native python engine (`python`)
+        # or by both, checking that they agree (`differential`).
+        assert transition_model in {'asp', 'python', 'differential'}, f"unknown transition model: '{transition_model}'"
+        assert transition_model == 'asp' or self.native_engine_class, f'{type(self).__name__} has no native engine'
+        self.transition_model: str = transition_model
+
         self.available_actions = self._compute_available_actions()
 
     @property
@@ -39,75 +53,71 @@ class MarkovDecisionProcedure(StateHistory):
     def ground_state(self):
         return self.state
 
-    def transition(self, action: str):
-        ctl = clingo.Control()
-
-        ctl.load(self.file_path(self.interface_file_name))
-        ctl.load(self.file_path(self.problem_file_name))
-        ctl.add('base', [], ' '.join(f'currentState({s}).' for s in self.state))
-        ctl.add('base', [], ' '.join(f'{s}.' for s in self.state_static))
-        ctl.add('base', [], f'currentAction({action}).')
-        ctl.add('base', [], '#show nextState/1. #show nextReward/1. #show nextExecutable/1.')
+    @property
+    def engine(self):
+        # The engine is looked up instead of stored, so that MDPs can still be copied and pickled.
 
-        ctl.ground(parts=[('base', [])])
-        solvehandle = ctl.solve(yield_=True)
+        if self.transition_model == 'python':
+            return self.native_engine_class.for_domain(self.state_static)
 
-        # Since we are only modelling deterministic actions, there is only one possible next state (model).
-        model = solvehandle.model()
+        clingo_engine = ClingoEngine.for_domain(self.interface_file_path, self.problem_file_path, self.state_static)
 
-        next_reward = None
-        next_state = set()
-        available_actions = set()
+        if self.transition_model == 'differential':
+            return DifferentialEngine(self.native_engine_class.for_domain(self.state_static), clingo_engine)
 
-        for symbol in model.symbols(shown=True):
+        return clingo_engine
 
-            if symbol.name == 'nextState':
+    def transition(self, action: str, computed_transition: Tuple[FrozenSet[str], int, Set[str]] = None):
+        # `computed_transition` is the result of `engine.transition` for the current state and
+        # the action, if it is already known (e.g. computed by a `VectorMDP` for several MDPs at once).
 
-                #˙Atom is of the form `state(f(...))`
-                # where`f(...)` is an uninterpreted function belonging to the state representation.
-                f = symbol.arguments[0]
-                next_state.add(str(f))
+        if self.transition_cache is None:
+            next_state, next_reward, available_actions = computed_transition or self.engine.transition(self.state, action)
 
-            if symbol.name == 'nextReward':
+        else:
+            key = self._cache_key(self.state, action)
+            cached_transition = self.transition_cache.get(key)
 
-                # Atom is of the form `nextReward(r)`, and `r` is the reward.
-                next_reward = symbol.arguments[0].number
+            if cached_transition is None:
+                cached_transition = computed_transition or self.engine.transition(self.state, action)
+                self.transition_cache.put(key, cached_transition)
 
-            if symbol.name == 'nextExecutable':
+                # The solver already told us which actions are executable in the next state.
+                # Remember them, so that an MDP starting in that state needs no solver call.
+                self.transition_cache.put(self._cache_key(cached_transition[0]),
+                                          frozenset(cached_transition[2]))
 
-                # Atom is of the form `nextExecutable(f(...))`
-                # where`f(...)` is an uninterpreted function representing an executable action.
-                available_actions.add(str(symbol.arguments[0]))
+            next_state, next_reward, available_actions = cached_transition
+            available_actions = set(available_actions)
 
-        self.state = frozenset(next_state)
+        self.state = next_state
         self.available_actions = available_actions
 
         super().transition(action, # A[t]
-                           frozenset(next_state), # S[t+1]
+                           next_state, # S[t+1]
                            next_reward # R[t+1]
                           )
 
-        return frozenset(next_state), next_reward
+        return next_state, next_reward
 
 
+    def is_transition_cached(self, action: str) -> bool:
+        return self.transition_cache is not None and self._cache_key(self.state, action) in self.transition_cache
+
     def _compute_available_actions(self) -> Set[str]:
 
-        ctl = clingo.Control()
-        ctl.load(self.file_path(self.interface_file_name))
-        ctl.load(self.file_path(self.problem_file_name))
-        ctl.add('base', [], ' '.join(f'currentState({s}).' for s in self.state))
-        ctl.add('base', [], ' '.join(f'{s}.' for s in self.state_static))
-        ctl.add('base', [], '#show currentExecutable/1.')
-
-        ctl.ground(parts=[('base', [])])
-        solvehandle = ctl.solve(yield_=True)
-
-        # In search for next actions, we only expect one answer set.
-        model = solvehandle.model()
-        available_actions = set()
-        for symbol in model.symbols(shown=True):
-
-            # We expect atoms of the form `currentExecutable(move(X, Y)`
-            # but we are only interested in the first argument `move(X, Y)`
-            available_actions.add(str(symbol.arguments[0]))
-        return available_actions
+        if self.transition_cache is None:
+            return self.engine.available_actions(self.state)
+
+        # Available actions are cached like a transition without an action.
+        key = self._cache_key(self.state)
+        available_actions = self.transition_cache.get(key)
+
+        if available_actions is None:
+            available_actions = frozenset(self.engine.available_actions(self.state))
+            self.transition_cache.put(key, available_actions)
+
+        return set(available_actions)
+
+    def _cache_key(self, state, action: str = None):
+        return (self.problem_file_name, self.state_static, state, action)
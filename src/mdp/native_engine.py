@@ -0,0 +1,73 @@
+from typing import Set, FrozenSet, Dict, Tuple, Iterable
+
+def parse_atom(atom: str) -> Tuple[str, Tuple[str, ...]]:
+    # Splits a flat atom like `push(6,3,left)` into its name and its arguments.
+    # Nested terms are not needed by any of the native engines.
+
+    if '(' not in atom:
+        return atom, tuple()
+
+    name, arguments = atom[:-1].split('(', 1)
+    return name, tuple(a.strip() for a in arguments.split(','))
+
+class NativeEngine:
+    """
+    Base class for transition models written in plain python.
+
+    Native engines have the same interface as the `ClingoEngine` and must produce exactly the
+    same results as the ASP encoding of their domain. They are created once per set of static
+    facts.
+
+    Subclasses provide:
+
+     * `available_actions(state)`, which returns the set of actions executable in a state,
+     * `transition(state, action)`, which returns the next state (as a frozenset), the reward and
+       the set of actions executable in the next state.
+    """
+
+    _engines: Dict[Tuple[type, FrozenSet[str]], 'NativeEngine'] = dict()
+
+    @classmethod
+    def for_domain(cls, state_static: Iterable[str]) -> 'NativeEngine':
+
+        key = (cls, frozenset(state_static))
+
+        if key not in cls._engines:
+            cls._engines[key] = cls(key[1])
+
+        return cls._engines[key]
+
+    def __init__(self, state_static: FrozenSet[str]):
+        self.state_static: FrozenSet[str] = state_static
+
+class DifferentialEngine:
+    """
+    Runs a native engine and the clingo engine side by side and fails on every disagreement.
+    Meant for testing native engines on real trajectories, not for training.
+    """
+
+    def __init__(self, native_engine: NativeEngine, clingo_engine):
+        self.native_engine = native_engine
+        self.clingo_engine = clingo_engine
+
+    def available_actions(self, state: Iterable[str]) -> Set[str]:
+
+        expected = self.clingo_engine.available_actions(state)
+        actual = self.native_engine.available_actions(state)
+
+        if expected != actual:
+            raise AssertionError(f'Available actions in state {sorted(state)} differ. '
+                                 f'ASP: {sorted(expected)}, native: {sorted(actual)}')
+
+        return expected
+
+    def transition(self, state: Iterable[str], action: str) -> Tuple[FrozenSet[str], int, Set[str]]:
+
+        expected = self.clingo_engine.transition(state, action)
+        actual = self.native_engine.transition(state, action)
+
+        if expected != actual:
+            raise AssertionError(f'Transition for action {action} in state {sorted(state)} differs. '
+                                 f'ASP: {expected}, native: {actual}')
+
+        return expected
@@ -0,0 +1,27 @@
+from collections.abc import Sequence
+from typing import Callable, FrozenSet
+
+class RankedStates(Sequence):
+    """
+    A sequence of states that are computed from their index (`unrank`) when they are accessed,
+    instead of being kept in memory.
+    """
+
+    def __init__(self, length: int, unrank: Callable[[int], FrozenSet[str]]):
+        self._length: int = length
+        self._unrank = unrank
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+
+        if isinstance(index, slice):
+            return [self._unrank(i) for i in range(*index.indices(self._length))]
+
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError('state index out of range')
+
+        return self._unrank(index)
@@ -1,36 +1,37 @@
-import os
-import clingo
+import math
 import random
-from typing import Set, List
+from typing import Set, List, FrozenSet
 
 from .markov_decision_procedure import MarkovDecisionProcedure
+from .lru_cache import LRUCache
+from .ranked_states import RankedStates
 
 class SlidingPuzzle(MarkovDecisionProcedure):
 
-    def __init__(self, state_initial: Set[str], state_static: Set[str]):
+    def __init__(self, state_initial: Set[str], state_static: Set[str], transition_cache: LRUCache = None):
 
         # TODO: check
         # No discounting for Sliding
         discount_rate = 1.0
         file_name = 'sliding_puzzle.lp'
 
-        super().__init__(state_initial, state_static, discount_rate, file_name)
+        super().__init__(state_initial, state_static, discount_rate, file_name, transition_cache)
 
 class SlidingPuzzleBuilder:
 
-    def __init__(self, puzzle_size: int, missing_pieces: int, state_enumeration_limit: int = 9):
+    def __init__(self, puzzle_size: int, missing_pieces: int, state_enumeration_limit: int = 9,
+                 transition_cache: LRUCache = None):
 
         self.puzzle_size: int = puzzle_size
         self.missing_pieces: int = missing_pieces
         self.state_enumeration_limit: int = state_enumeration_limit
+        self.transition_cache: LRUCache = transition_cache
 
         self.piece_terms: List[str] = [f'p{n}' for n in range(self.puzzle_size**2-self.missing_pieces)]
 
-        self.file_name: str  = 'sliding_puzzle_initial_states.lp'
-        self.file_path: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), self.file_name)
-
         if puzzle_size <= state_enumeration_limit:
-            self.all_states: List[Set[str]] = self._generate_all_states()
+            # All solvable states. They are not generated, but computed from their index when accessed.
+            self.all_states: RankedStates = RankedStates(self._count_solvable_states(), self._state_for_rank)
 
         sample_mdp = self.build_mdp()
         self.mdp_interface_file_path = sample_mdp.interface_file_path
@@ -49,52 +50,111 @@ class SlidingPuzzleBuilder:
         while True:
 
             state_start = self._generate_random_state()
-            mdp = SlidingPuzzle(state_start, state_static)
+            mdp = SlidingPuzzle(state_start, state_static, self.transition_cache)
 
             # Continue generating random start states until we find one that is not equal to
-            # the goal state.
-            # For the sliding puzzle this condition is not good enough as there are plenty
-            # problems with no solution.
+            # the goal state. All generated states are solvable.
             if len(mdp.available_actions) > 0:
                 break
 
         return mdp
 
     def _generate_random_state(self):
+        # Uniform over all solvable states
+        return self._generate_random_solvable_state()
+
+    def _generate_random_solvable_state(self):
+
+        # The cells of the pieces, where the cell of position (x, y) is x * puzzle_size + y.
+        cells = random.sample(range(self.puzzle_size**2), len(self.piece_terms))
+
+        # Swapping two pieces changes the parity of the permutation, but not the position of
+        # the blank. It maps the unsolvable states one-to-one onto the solvable ones, so that
+        # the result is uniform over the solvable states.
+        if not self._is_solvable(cells):
+            cells[0], cells[1] = cells[1], cells[0]
+
+        return self._state_for_cells(cells)
+
+    def _is_solvable(self, cells: List[int]) -> bool:
+
+        # With two or more blanks, every placement can be reached (the blanks can be used to
+        # swap any two pieces). With a single blank, a move swaps the blank with a piece: it changes
+        # the parity of the permutation of all cells, and the parity of the distance between the
+        # blank and its goal position. Only states in which both parities are equal, like in the
+        # goal state, are solvable.
+        if self.missing_pieces != 1:
+            return True
+
+        n = self.puzzle_size**2
+
+        # In the goal state, piece i is on cell i and the blank (item n-1) on the last cell.
+        items = [n-1] * n
+        for piece, cell in enumerate(cells):
+            items[cell] = piece
+
+        blank_x, blank_y = divmod(items.index(n-1), self.puzzle_size)
+        blank_distance = 2 * (self.puzzle_size - 1) - blank_x - blank_y
+
+        # The parity of a permutation is the parity of n minus the number of its cycles.
+        cycles = 0
+        visited = [False] * n
+        for cell in range(n):
+            if not visited[cell]:
+                cycles += 1
+                while not visited[cell]:
+                    visited[cell] = True
+                    cell = items[cell]
+
+        return (n - cycles) % 2 == blank_distance % 2
+
+    def _count_solvable_states(self) -> int:
+
+        n = self.puzzle_size**2
+        placements = math.perm(n, len(self.piece_terms))
+
+        if self._ranks_half_of_the_placements():
+            return placements // 2
+
+        return placements
 
-        if self.puzzle_size <= self.state_enumeration_limit:
-            return random.choice(self.all_states)
-        else:
-            return self._generate_pseudo_random_state()
+    def _ranks_half_of_the_placements(self) -> bool:
+        return self.missing_pieces == 1 and len(self.piece_terms) >= 2
 
-    def _generate_pseudo_random_state(self):
+    def _state_for_rank(self, rank: int) -> FrozenSet[str]:
 
-        generated_state = set()
-        shuffled_pieces = random.sample(self.piece_terms, len(self.piece_terms))
-        positions = list((i,j) for i in range(self.puzzle_size) for j in range(self.puzzle_size))
-        shuffled_positions = iter(random.sample(positions, self.puzzle_size**2))
+        # The rank is read as a mixed-radix number, with one digit for the cell of each piece
+        # among the cells that are still free.
+        free_cells = list(range(self.puzzle_size**2))
+        cells = []
 
-        for piece in shuffled_pieces:
-            position = next(shuffled_positions)
-            generated_state.add('on({},{},{})'.format(piece, position[0], position[1]))
+        if self._ranks_half_of_the_placements():
 
-        return generated_state
+            # Only the placements in which p0 is on a lower cell than p1 are ranked. Their digit is
+            # the index of the pair of cells. The other half is reached by swapping p0 and p1, and
+            # exactly one of both is solvable (see `_generate_random_solvable_state`).
+            n = len(free_cells)
+            rank, pair = divmod(rank, n * (n-1) // 2)
 
-    def _generate_all_states(self):
+            first = 0
+            while pair >= n - 1 - first:
+                pair -= n - 1 - first
+                first += 1
+            second = first + 1 + pair
 
-        ctl = clingo.Control()
+            cells = [first, second]
+            free_cells.remove(second)
+            free_cells.remove(first)
 
-        ctl.load(self.file_path)
-        ctl.add('base', [], 'size({}).'.format(self.puzzle_size))
-        ctl.add('base', [], ' '.join(f'piece({p}).' for p in self.piece_terms))
-        ctl.add('base', [], '#show state/1.')
-        ctl.configuration.solve.models = 0
+        for _ in range(len(cells), len(self.piece_terms)):
+            rank, digit = divmod(rank, len(free_cells))
+            cells.append(free_cells.pop(digit))
 
-        ctl.ground(parts=[('base', [])])
-        models = ctl.solve(yield_=True)
+        if not self._is_solvable(cells):
+            cells[0], cells[1] = cells[1], cells[0]
 
-        generated_states = [frozenset(str(symbol.arguments[0])
-                                        for symbol in model.symbols(shown=True))
-                                for model in models]
+        return self._state_for_cells(cells)
 
-        return generated_states
+    def _state_for_cells(self, cells: List[int]) -> FrozenSet[str]:
+        return frozenset('on({},{},{})'.format(piece, *divmod(cell, self.puzzle_size))
+                         for piece, cell in zip(self.piece_terms, cells))
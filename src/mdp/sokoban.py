@@ -2,20 +2,167 @@ import os
 from typing import Set
 
 from . import MarkovDecisionProcedure
+from .lru_cache import LRUCache
+from .native_engine import NativeEngine, parse_atom
+
+class SokobanEngine(NativeEngine):
+    """
+    The transitions of `sokoban.lp`, written in python.
+    """
+
+    DIRECTIONS = {
+        'left':  (-1,  0),
+        'right': ( 1,  0),
+        'up':    ( 0, -1),
+        'down':  ( 0,  1),
+    }
+
+    def __init__(self, state_static):
+
+        super().__init__(state_static)
+
+        self.blocks = set()
+        self.destinations = set()
+        self.rows = set()
+        self.cols = set()
+
+        for atom in state_static:
+            name, arguments = parse_atom(atom)
+            arguments = tuple(int(a) for a in arguments)
+
+            if name == 'block':
+                self.blocks.add(arguments)
+            elif name == 'dest':
+                self.destinations.add(arguments)
+            elif name == 'row':
+                self.rows.add(arguments[0])
+            elif name == 'col':
+                self.cols.add(arguments[0])
+
+    def available_actions(self, state):
+
+        boxes, sokobans = self._parse_state(state)
+        pushes = self._pushes(boxes, sokobans)
+
+        if self._is_terminal(boxes, pushes):
+            return set()
+        else:
+            return pushes
+
+    def transition(self, state, action):
+
+        boxes, sokobans = self._parse_state(state)
+        pushes = self._pushes(boxes, sokobans)
+
+        if self._is_terminal(boxes, pushes) or not action in pushes:
+            raise ValueError(f"action '{action}' is not executable in state {sorted(state)}")
+
+        _, (x, y, direction) = parse_atom(action)
+        x, y = int(x), int(y)
+        dx, dy = self.DIRECTIONS[direction]
+
+        # The box moves one step, the sokoban takes its former place.
+        next_boxes = boxes - {(x, y)} | {(x + dx, y + dy)}
+        next_sokobans = {(x, y)}
+        next_pushes = self._pushes(next_boxes, next_sokobans)
+
+        # Reward: -1 for every push, +100 for solving the level, -100 for getting stuck
+        next_reward = -1
+        if self._is_incomplete(boxes) and not self._is_incomplete(next_boxes):
+            next_reward += 100
+        if self._has_failed(next_boxes, next_pushes) and not self._has_failed(boxes, pushes):
+            next_reward -= 100
+
+        next_state = { f'box({bx},{by})' for bx, by in next_boxes } \
+                   | { f'sokoban({sx},{sy})' for sx, sy in next_sokobans }
+
+        if self._is_terminal(next_boxes, next_pushes):
+            next_available_actions = set()
+        else:
+            next_available_actions = next_pushes
+
+        return frozenset(next_state), next_reward, next_available_actions
+
+    def _parse_state(self, state):
+
+        boxes = set()
+        sokobans = set()
+
+        for atom in state:
+            name, arguments = parse_atom(atom)
+            if name == 'box':
+                boxes.add(tuple(int(a) for a in arguments))
+            elif name == 'sokoban':
+                sokobans.add(tuple(int(a) for a in arguments))
+
+        return boxes, sokobans
+
+    def _is_free(self, position, boxes):
+        x, y = position
+        return x in self.cols and y in self.rows and not position in self.blocks and not position in boxes
+
+    def _reachable(self, boxes, sokobans):
+
+        reachable = set(sokobans)
+        frontier = list(sokobans)
+
+        while frontier:
+            x, y = frontier.pop()
+            for dx, dy in self.DIRECTIONS.values():
+                neighbour = (x + dx, y + dy)
+                if not neighbour in reachable and self._is_free(neighbour, boxes):
+                    reachable.add(neighbour)
+                    frontier.append(neighbour)
+
+        return reachable
+
+    def _pushes(self, boxes, sokobans):
+
+        # All pushes that are possible, regardless of the state being terminal or not.
+        reachable = self._reachable(boxes, sokobans)
+
+        return { f'push({x},{y},{direction})' for x, y in boxes 
+                 for direction, (dx, dy) in self.DIRECTIONS.items()
+                 if self._is_free((x + dx, y + dy), boxes) and (x - dx, y - dy) in reachable }
+
+    def _is_incomplete(self, boxes):
+        return not boxes <= self.destinations
+
+    def _has_failed(self, boxes, pushes):
+
+        # A box is stuck in a corner
+        for x, y in boxes - self.destinations:
+            for dx in [-1, 1]:
+                for dy in [-1, 1]:
+                    if (x + dx, y) in self.blocks and (x, y + dy) in self.blocks:
+                        return True
+
+        # The level is incomplete but no more actions are available
+        return self._is_incomplete(boxes) and len(pushes) == 0
+
+    def _is_terminal(self, boxes, pushes):
+        return not self._is_incomplete(boxes) or self._has_failed(boxes, pushes)
 
 class Sokoban(MarkovDecisionProcedure):
 
-    def __init__(self, state_initial: Set[str], state_static: Set[str]):
+    native_engine_class = SokobanEngine
+
+    def __init__(self, state_initial: Set[str], state_static: Set[str], transition_cache: LRUCache = None,
+                 transition_model: str = 'asp'):
 
         # No discounting for Sokoban
         discount_rate = 1.0 
         file_name = 'sokoban.lp'
 
-        super().__init__(state_initial, state_static, discount_rate, file_name)
+        super().__init__(state_initial, state_static, discount_rate, file_name, transition_cache,
+                         transition_model)
 
 class SokobanBuilder:
 
-    def __init__(self, level_name):
+    def __init__(self, level_name, transition_cache: LRUCache = None, transition_model: str = 'asp'):
+
+        self.transition_cache: LRUCache = transition_cache
+        self.transition_model: str = transition_model
 
         # All levels are stored in ./sokoban_levels/
         path_to_level = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
@@ -61,4 +208,5 @@ class SokobanBuilder:
 
 
     def build_mdp(self):
-        return Sokoban(state_initial=self.level_asp_initial, state_static=self.level_asp_static)
+        return Sokoban(state_initial=self.level_asp_initial, state_static=self.level_asp_static,
+                       transition_cache=self.transition_cache, transition_model=self.transition_model)
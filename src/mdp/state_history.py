@@ -9,6 +9,12 @@ class StateHistory:
         self.action_history: List[str] = [] #A0 will be given later once the first action is executed
         self.reward_history: List[float] = [None] # R0, which is undefined
 
+        # The return G0 is summed up with every transition, the returns of all time steps
+        # are computed on demand and cached until the next transition.
+        self._discounted_return: float = 0
+        self._next_discount: float = 1
+        self._return_history: List[float] = None
+
     def transition(self, action, next_state, next_reward):
 
         # Update trajectory:
@@ -16,14 +22,46 @@ class StateHistory:
         self.state_history.append(next_state) # S[t+1]
         self.reward_history.append(next_reward) # R[t+1]
 
+        self._discounted_return += self._next_discount * next_reward
+        self._next_discount *= self.discount_rate
+        self._return_history = None
+
+    @property
+    def discounted_return(self) -> float:
+        # The return G0 of the trajectory so far, i.e. `return_history[0]`
+        return self._discounted_return
 
     @property
     def return_history(self) -> List[float]:
 
-        T = len(self.state_history)
-        G = [0] * T
+        if self._return_history is None:
+
+            T = len(self.state_history)
+            G = [0] * T
+
+            for t in reversed(range(T-1)):
+                G[t] = self.reward_history[t+1] + self.discount_rate * G[t+1]
+
+            self._return_history = G
+
+        return self._return_history
+
+
+class EpisodeRecord(StateHistory):
+    """
+    A copy of the trajectory of an episode, together with the available actions of each state, so that
+    the episode can be learned from without its MDP (e.g. after sending it to another process).
+
+    The record follows an MDP if it is passed as `per_step_callback` to `OffPolicyControl.learn_episode`.
+    """
+
+    def __init__(self, mdp):
+
+        super().__init__(mdp.state)
 
-        for t in reversed(range(T-1)):
-            G[t] = self.reward_history[t+1] + self.discount_rate * G[t+1]
+        self.discount_rate: float = mdp.discount_rate
+        self.available_actions_history: List[Set[str]] = [set(mdp.available_actions)]
 
-        return G
+    def callback(self, current_action, next_state, next_reward, mdp, **kwargs):
+        self.transition(current_action, next_state, next_reward)
+        self.available_actions_history.append(set(mdp.available_actions))
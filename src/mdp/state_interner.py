@@ -0,0 +1,88 @@
+import copy
+from typing import Dict, List, Tuple, FrozenSet, Hashable
+
+from .lru_cache import LRUCache
+
+class StateInterner:
+    """
+    Maps ground states (sets of atoms like `on(b3,b1)`) to compact keys.
+
+    Every atom gets a small integer id, and a state becomes the sorted tuple of the ids of its atoms.
+    Such keys are cheaper to store and to hash than frozensets of strings, and all states share the
+    same atom strings. Keys are idempotent: interning a key returns the key itself. Non-set states,
+    e.g. the string states of abstract MDPs, are left untouched.
+
+    Interning trades lookup speed for memory. Computing a key sorts the ids of all atoms, which is
+    much slower than looking up a frozenset (whose hash is cached). The keys of the
+    `key_cache_size` most recently used frozensets are cached, but even a cached key takes an extra
+    lookup, so policies look up interned states several times more slowly than plain frozensets.
+    """
+
+    # Separates atoms in the string representation of a key. Atoms never contain spaces.
+    SEPARATOR = ' '
+
+    def __init__(self, key_cache_size: int = 10000):
+        self._atom_ids: Dict[str, int] = dict()
+        self._atoms: List[str] = list()
+
+        # Keys of the most recently used frozensets
+        self._key_cache: LRUCache = LRUCache(key_cache_size)
+
+    def __deepcopy__(self, memo):
+
+        # Caches are shared when copied, but the keys of a copy may differ from the original.
+        interner = copy.copy(self)
+        interner._atom_ids = dict(self._atom_ids)
+        interner._atoms = list(self._atoms)
+        interner._key_cache = LRUCache(self._key_cache.max_size)
+
+        return interner
+
+    def __len__(self):
+        return len(self._atoms)
+
+    def atom_id(self, atom: str) -> int:
+
+        atom_id = self._atom_ids.get(atom)
+
+        if atom_id is None:
+            atom_id = len(self._atoms)
+            self._atom_ids[atom] = atom_id
+            self._atoms.append(atom)
+
+        return atom_id
+
+    def atom(self, atom_id: int) -> str:
+        return self._atoms[atom_id]
+
+    def key(self, state) -> Hashable:
+
+        if isinstance(state, frozenset):
+
+            key = self._key_cache.get(state)
+
+            if key is None:
+                key = tuple(sorted(self.atom_id(atom) for atom in state))
+                self._key_cache.put(state, key)
+
+            return key
+
+        if isinstance(state, set):
+            return tuple(sorted(self.atom_id(atom) for atom in state))
+
+        return state
+
+    def state(self, key) -> FrozenSet[str]:
+
+        if isinstance(key, tuple):
+            return frozenset(self._atoms[atom_id] for atom_id in key)
+
+        return key
+
+    def to_string(self, key: Tuple[int, ...]) -> str:
+        # The string of a ground state key does not depend on the ids, so it is stable across interners.
+        return self.SEPARATOR.join(sorted(self._atoms[atom_id] for atom_id in key))
+
+    def from_string(self, string: str) -> Tuple[int, ...]:
+        atoms = [atom for atom in string.split(self.SEPARATOR) if atom != '']
+        return self.key(frozenset(atoms))
@@ -1,24 +1,26 @@
 from .markov_decision_procedure import MarkovDecisionProcedure
+from .lru_cache import LRUCache
 
 class VacuumCleanerWorld(MarkovDecisionProcedure):
 
-    def __init__(self):
+    def __init__(self, transition_cache: LRUCache = None):
 
         # Start state, goal state and discount rate are all fixed for this MDP
         state_initial = {'robot(left)', 'dirty(left)', 'dirty(right)'}
         state_static = {} # No static components for this MDP.
         discount_rate = 1
 
-        super().__init__(state_initial, state_static, discount_rate, 'vacuum_cleaner_world.lp')
+        super().__init__(state_initial, state_static, discount_rate, 'vacuum_cleaner_world.lp', transition_cache)
 
 class VacuumCleanerWorldBuilder:
 
-    def __init__(self):
-        sample_mdp = VacuumCleanerWorld()
+    def __init__(self, transition_cache: LRUCache = None):
+        self.transition_cache: LRUCache = transition_cache
+        sample_mdp = VacuumCleanerWorld(self.transition_cache)
 
         self.mdp_interface_file_path = sample_mdp.interface_file_path
         self.mdp_problem_file_path = sample_mdp.problem_file_path
         self.mdp_state_static = sample_mdp.state_static
 
     def build_mdp(self):
-        return VacuumCleanerWorld()
+        return VacuumCleanerWorld(self.transition_cache)
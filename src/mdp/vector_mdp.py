@@ -0,0 +1,104 @@
+from collections import defaultdict
+from typing import Any, Dict, List, Sequence, Tuple
+
+from .batch_clingo_engine import BatchClingoEngine
+from .markov_decision_procedure import MarkovDecisionProcedure
+
+class VectorMDP:
+    """
+    `size` independent MDPs built by the same builder, which are stepped together with a batch of
+    actions. Finished MDPs (without available actions, or after `step_limit` steps) are replaced
+    by new ones from the builder.
+
+    For ASP domains (`MarkovDecisionProcedure`s with the `asp` transition model), the transitions
+    that are not in the transition cache are computed with one solver call for all MDPs (see
+    `BatchClingoEngine`). All other MDPs (e.g. carcasses, minigrid or python transition models)
+    are stepped one after the other.
+    """
+
+    def __init__(self, mdp_builder, size: int, step_limit: int = None):
+
+        self.mdp_builder = mdp_builder
+        self.size: int = size
+        self.step_limit: int = step_limit
+
+        self.mdps: List[Any] = [mdp_builder.build_mdp() for _ in range(size)]
+
+        # The MDPs that were finished (and replaced) by the last step, by their index
+        self.finished_mdps: Dict[int, Any] = dict()
+
+    @property
+    def states(self) -> List[Any]:
+        return [mdp.state for mdp in self.mdps]
+
+    @property
+    def ground_states(self) -> List[Any]:
+        return [mdp.ground_state for mdp in self.mdps]
+
+    @property
+    def available_actions(self) -> List[Any]:
+        return [mdp.available_actions for mdp in self.mdps]
+
+    def step(self, actions: Sequence[str]) -> Tuple[List[Any], List[float], List[bool]]:
+        """
+        Executes one action in each MDP, and returns the next states, the rewards and whether
+        the MDPs are finished. The next states of finished MDPs are their last states; `states`
+        already holds the initial states of the new MDPs.
+        """
+
+        assert len(actions) == self.size, f'expected {self.size} actions, got {len(actions)}'
+
+        computed_transitions = self._compute_transitions(actions)
+
+        next_states = []
+        next_rewards = []
+        dones = []
+        self.finished_mdps = dict()
+
+        for i, action in enumerate(actions):
+
+            mdp = self.mdps[i]
+
+            if i in computed_transitions:
+                next_state, next_reward = mdp.transition(action, computed_transitions[i])
+            else:
+                next_state, next_reward = mdp.transition(action)
+
+            done = len(mdp.available_actions) == 0 or \
+                   (self.step_limit is not None and len(mdp.action_history) >= self.step_limit)
+
+            if done:
+                self.finished_mdps[i] = mdp
+                self.mdps[i] = self.mdp_builder.build_mdp()
+
+            next_states.append(next_state)
+            next_rewards.append(next_reward)
+            dones.append(done)
+
+        return next_states, next_rewards, dones
+
+    def _compute_transitions(self, actions: Sequence[str]) -> Dict[int, Tuple]:
+
+        # MDPs of the same domain and static facts share a batch engine.
+        batches = defaultdict(list)
+
+        for i, (mdp, action) in enumerate(zip(self.mdps, actions)):
+
+            if isinstance(mdp, MarkovDecisionProcedure) and mdp.transition_model == 'asp' \
+               and not mdp.is_transition_cached(action):
+                batches[mdp.interface_file_path, mdp.problem_file_path, mdp.state_static].append(i)
+
+        computed_transitions = dict()
+
+        for domain, indices in batches.items():
+
+            # A single transition is computed by the engine of the MDP.
+            if len(indices) == 1:
+                continue
+
+            engine = BatchClingoEngine.for_domain(*domain, self.size)
+            transitions = engine.transitions([(self.mdps[i].state, actions[i]) for i in indices])
+
+            computed_transitions.update(zip(indices, transitions))
+
+        return computed_transitions
@@ -1,5 +1,9 @@
 from .random_policy import RandomPolicy
 from .planner_policy import PlannerPolicy
+from .background_planner import BackgroundPlanner
+from .q_table_file import QTableFile
 from .q_table_policy import QTablePolicy
+from .array_q_table_policy import ArrayQTablePolicy
+from .shared_q_table_policy import SharedQTablePolicy
 from .planning_epsilon_greedy_policy import PlanningEpsilonGreedyPolicy
 from .planning_exploring_starts_policy import PlanningExploringStartsPolicy
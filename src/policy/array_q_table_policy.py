@@ -0,0 +1,254 @@
+from typing import Set, Dict, List, Tuple, Any
+import bisect
+import random
+
+import numpy as np
+
+from . import QTablePolicy
+from .q_table_file import QTableFile
+
+class ArrayQTablePolicy(QTablePolicy):
+    """
+    A `QTablePolicy` that stores all q-values in one contiguous NumPy array.
+
+    The values of a state are a slice of the array, ordered like the available actions of the state.
+    States with the same available actions share one action index. The maximal value of each state
+    and the actions reaching it are updated incrementally, so that greedy actions and optimal values
+    are looked up without scanning all actions of the state.
+
+    `q_table` is still readable as a dict of dicts, but it is a copy: changes do not affect the policy.
+    """
+
+    def __init__(self, initial_value_estimate: float = 0.0, state_interner = None, initial_capacity: int = 1024):
+
+        self.initial_value_estimate: float = initial_value_estimate
+
+        # If given, states are stored under compact keys (see `mdp.StateInterner`).
+        self.state_interner = state_interner
+
+        # The file that `values` refers to, after loading with a memory map
+        self._q_table_file: QTableFile = None
+
+        self._clear(initial_capacity)
+
+    def _clear(self, initial_capacity: int):
+
+        self.values: np.ndarray = np.zeros(initial_capacity, dtype=np.float64)
+        self.size: int = 0
+
+        # State key -> row of the state
+        self._rows: Dict[Any, int] = dict()
+
+        # Per row: offset into `values`, available actions (shared), action index (shared),
+        # maximal value and the sorted positions of the actions with the maximal value
+        # (`None` until the row is used for the first time, for rows loaded from a file).
+        self._offsets: List[int] = list()
+        self._actions: List[Tuple[Any, ...]] = list()
+        self._action_indices: List[Dict[Any, int]] = list()
+        self._max_values: List[float] = list()
+        self._argmax: List[List[int]] = list()
+
+        # Available actions -> (actions, action index), shared by all rows with these actions
+        self._action_sets: Dict[Tuple[Any, ...], Tuple[Tuple[Any, ...], Dict[Any, int]]] = dict()
+
+    @property
+    def q_table(self) -> Dict[Any, Dict[Any, float]]:
+        return { k: self._row_as_dict(row) for k, row in self._rows.items() }
+
+    def is_new_state(self, state) -> bool:
+        return not self._key(state) in self._rows
+
+    def value_for(self, state, action) -> float:
+
+        if action is None:
+            return 0
+
+        row = self._rows[self._key(state)]
+        return float(self.values[self._offsets[row] + self._action_indices[row][action]])
+
+    def suggest_action_for_state(self, state, *args) -> Any:
+
+        row = self._rows[self._key(state)]
+        argmax = self._argmax[row] if self._argmax[row] is not None else self._update_max(row)
+
+        if len(argmax) == 0:
+            return None
+
+        if len(argmax) == 1:
+            return self._actions[row][argmax[0]]
+
+        # Ties are broken like in `QTablePolicy`, randomly in the order of the available actions.
+        actions = self._actions[row]
+        return random.choice([actions[position] for position in argmax])
+
+    def initialize_state(self, state, available_actions: Set):
+        if self.is_new_state(state):
+            self._add_row(self._key(state), { a: self.initial_value_estimate for a in available_actions })
+
+    def update(self, state, action, delta: float):
+
+        row = self._rows[self._key(state)]
+        position = self._action_indices[row][action]
+
+        value = float(self.values[self._offsets[row] + position]) + delta
+        self.values[self._offsets[row] + position] = value
+
+        argmax = self._argmax[row] if self._argmax[row] is not None else self._update_max(row)
+        max_value = self._max_values[row]
+
+        if value > max_value:
+            self._max_values[row] = value
+            self._argmax[row] = [position]
+
+        elif value == max_value:
+            if position not in argmax:
+                bisect.insort(argmax, position)
+
+        elif position in argmax:
+            argmax.remove(position)
+
+            # Only if the single best action got worse, the state has to be scanned again.
+            if len(argmax) == 0:
+                self._update_max(row)
+
+    def optimal_value_for(self, state):
+
+        row = self._rows[self._key(state)]
+        argmax = self._argmax[row] if self._argmax[row] is not None else self._update_max(row)
+
+        if len(argmax) == 0:
+            return 0
+
+        return self._max_values[row]
+
+    def export_q_table(self) -> Dict[Any, Dict[Any, float]]:
+        # The q-table with the original states as keys, e.g. for saving it to a file.
+        if self.state_interner is not None:
+            return { self.state_interner.state(k): self._row_as_dict(row) for k, row in self._rows.items() }
+        else:
+            return self.q_table
+
+    def import_q_table(self, q_table: Dict[Any, Dict[Any, float]]):
+
+        self._release_file()
+        self._clear(max(len(self.values), 1))
+
+        for s, v in q_table.items():
+            self._add_row(self._key(s), v)
+
+    def save(self, file_path: str):
+
+        # The rows are streamed to the file one by one.
+        states = self._rows.keys()
+        if self.state_interner is not None:
+            states = map(self.state_interner.state, states)
+
+        QTableFile.write(file_path, zip(states, map(self._row_as_dict, self._rows.values())))
+
+    def load(self, file_path: str, states = None, mmap_mode: str = None):
+        """
+        Reads a `QTableFile`, optionally only the given states.
+
+        With `mmap_mode` 'r' (read-only, e.g. for evaluation) or 'c' (copy-on-write), the values
+        are not read into memory, but the file is memory-mapped and the rows refer to it directly.
+        The file stays open until `close` is called, or until the values are copied anyway.
+        """
+
+        self.close()
+
+        q_table_file = QTableFile(file_path, mmap_mode or 'r')
+
+        if mmap_mode is None:
+            with q_table_file:
+                self._load_rows(q_table_file, states, mmap_mode)
+        else:
+            self._q_table_file = q_table_file
+            self._load_rows(q_table_file, states, mmap_mode)
+
+    def close(self):
+        """
+        Closes the file that the values refer to, after `load` with a `mmap_mode`. The values
+        are copied into memory first, so that the policy can still be used.
+        """
+
+        if self._q_table_file is not None:
+            self.values = np.array(self.values)
+            self._release_file()
+
+    def _release_file(self):
+
+        # Once no values refer to the file any more, its memory map can be closed.
+        if self._q_table_file is not None:
+            self._q_table_file.close()
+            self._q_table_file = None
+
+    def _load_rows(self, q_table_file: QTableFile, states, mmap_mode: str):
+
+        if mmap_mode is None and states is not None:
+            # Only the values of the given states are copied into memory.
+            self.import_q_table(q_table_file.to_dict(states))
+            return
+
+        self._clear(0)
+
+        # With a memory map, new states are appended behind the values of the file. That makes a copy.
+        self.values = q_table_file.values if mmap_mode else np.array(q_table_file.values)
+        self.size = len(self.values)
+
+        # The maximal values are computed when a state is used for the first time, so that
+        # loading does not read the values.
+        for state, offset, actions, _ in q_table_file.rows(states, with_values=False):
+            self._append_row(self._key(state), offset, actions)
+
+    def _add_row(self, key, action_values: Dict[Any, float]):
+
+        values = list(action_values.values())
+
+        # The capacity is doubled when necessary, so that adding states takes amortized constant time.
+        if self.size + len(values) > len(self.values):
+            new_values = np.zeros(max(2 * len(self.values), self.size + len(values)), dtype=np.float64)
+            new_values[:self.size] = self.values[:self.size]
+            self.values = new_values
+            self._release_file()
+
+        offset = self.size
+        self.values[offset:offset + len(values)] = values
+        self.size += len(values)
+
+        self._append_row(key, offset, tuple(action_values), values)
+
+    def _append_row(self, key, offset: int, actions: Tuple[Any, ...], values: List[float] = None):
+
+        if actions not in self._action_sets:
+            self._action_sets[actions] = (actions, { a: i for i, a in enumerate(actions) })
+        actions, action_index = self._action_sets[actions]
+
+        self._rows[key] = len(self._offsets)
+        self._offsets.append(offset)
+        self._actions.append(actions)
+        self._action_indices.append(action_index)
+        self._max_values.append(0)
+        self._argmax.append(None)
+
+        if values is not None:
+            self._set_max(len(self._offsets) - 1, values)
+
+    def _update_max(self, row: int) -> List[int]:
+        offset = self._offsets[row]
+        return self._set_max(row, self.values[offset:offset + len(self._actions[row])].tolist())
+
+    def _set_max(self, row: int, values: List[float]) -> List[int]:
+
+        if len(values) == 0:
+            self._argmax[row] = []
+            return self._argmax[row]
+
+        max_value = max(values)
+        self._max_values[row] = max_value
+        self._argmax[row] = [position for position, value in enumerate(values) if value == max_value]
+
+        return self._argmax[row]
+
+    def _row_as_dict(self, row: int) -> Dict[Any, float]:
+        offset = self._offsets[row]
+        return dict(zip(self._actions[row], self.values[offset:offset + len(self._actions[row])].tolist()))
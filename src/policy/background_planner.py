@@ -0,0 +1,160 @@
+import itertools
+import queue
+import threading
+
+from typing import Dict, FrozenSet, Optional
+
+from .planner_policy import PlannerPolicy
+
+class BackgroundPlanner:
+    """
+    Runs a `PlannerPolicy` in a background thread, so that the training loop does not wait for plans.
+
+    `suggest_action_for_ground_state` never blocks: it returns the planned action if a plan for the
+    ground state is ready, and `None` otherwise. In the latter case, the ground state is queued for
+    planning and the caller is expected to fall back to another policy (e.g. the Q-table). A ready
+    plan is handed out only once. States without any plan are remembered, and never planned again.
+
+    Whenever a plan is computed, the states it predicts for the next steps are queued speculatively,
+    since the agent is likely to reach them next. Requested states are always planned before
+    speculative ones, and more recent requests before older ones.
+    """
+
+    # Priorities of queued ground states, lower ones are planned first. The thread stops before
+    # planning anything else.
+    _STOP = -2
+    _PLANNING = -1
+    _REQUESTED = 0
+    _SPECULATIVE = 1
+
+    def __init__(self, planner_policy: PlannerPolicy, ready_cache_size: int = 100000,
+                 speculation_depth: int = 1):
+
+        # The planner is used by the background thread only.
+        self.planner_policy: PlannerPolicy = planner_policy
+
+        # The number of predicted states per plan that are planned speculatively.
+        self.speculation_depth: int = speculation_depth
+
+        # Maps ground states to planned actions, in the order they were planned. If the cache is full,
+        # the oldest plans are dropped. Guarded by `_lock`, like `_queued_states`.
+        self.ready_cache: Dict[FrozenSet[str], str] = dict()
+        self.ready_cache_size: int = ready_cache_size
+        self._queued_states: Dict[FrozenSet[str], int] = dict()
+        self._lock = threading.Lock()
+
+        # Entries are (priority, -request counter, ground state), `None` stops the thread.
+        self._queue = queue.PriorityQueue()
+        self._request_counter = itertools.count()
+
+        self._thread: threading.Thread = None
+
+        # Once stopped, no more states are queued, and queued states are dropped.
+        self._stopping = threading.Event()
+
+    def suggest_action_for_ground_state(self, ground_state) -> Optional[str]:
+
+        ground_state = frozenset(ground_state)
+
+        with self._lock:
+            if ground_state in self.ready_cache:
+
+                suggested_action = self.ready_cache[ground_state]
+
+                # States without a plan stay in the cache, so that they are not queued again.
+                if suggested_action is not None:
+                    del self.ready_cache[ground_state]
+
+                return suggested_action
+
+        self.request_plan(ground_state)
+
+        return None
+
+    def request_plan(self, ground_state, speculative: bool = False):
+
+        ground_state = frozenset(ground_state)
+        priority = self._SPECULATIVE if speculative else self._REQUESTED
+
+        with self._lock:
+
+            if self._stopping.is_set() or ground_state in self.ready_cache:
+                return
+
+            # A state that is queued speculatively is queued again, once it is actually requested.
+            if self._queued_states.get(ground_state, self._SPECULATIVE + 1) <= priority:
+                return
+
+            self._queued_states[ground_state] = priority
+            self._queue.put((priority, -next(self._request_counter), ground_state))
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def wait_until_idle(self):
+        """
+        Blocks until all queued ground states are planned.
+        """
+
+        self._queue.join()
+
+    def stop(self):
+        """
+        Stops the thread after the plan it is computing right now. Queued states are not planned.
+        """
+
+        self._stopping.set()
+
+        if self._thread is not None:
+            self._queue.put((self._STOP, 0, None))
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+
+        while not self._stopping.is_set():
+
+            priority, _, ground_state = self._queue.get()
+
+            try:
+
+                if ground_state is None:
+                    break
+
+                with self._lock:
+                    # The state may have been queued twice, with different priorities.
+                    if self._queued_states.get(ground_state) != priority:
+                        continue
+                    self._queued_states[ground_state] = self._PLANNING
+
+                # Plans go through the plan cache (and plan suffix) of the planner, like without a
+                # background thread.
+                try:
+                    suggested_action, _, plan = self.planner_policy.suggest_plan_for_ground_state(ground_state)
+                except ValueError:
+                    # There is no plan for this state. Remember that, instead of planning again.
+                    suggested_action, plan = None, tuple()
+
+                with self._lock:
+                    self.ready_cache[ground_state] = suggested_action
+                    del self._queued_states[ground_state]
+                    while len(self.ready_cache) > self.ready_cache_size:
+                        del self.ready_cache[next(iter(self.ready_cache))]
+
+                for _, _, predicted_state in plan[:self.speculation_depth]:
+                    self.request_plan(predicted_state, speculative=True)
+
+            finally:
+                self._queue.task_done()
+
+        # Drop all queued states (and the stop entry), so that `wait_until_idle` does not block.
+        with self._lock:
+            self._queued_states.clear()
+            while not self._queue.empty():
+                self._queue.get_nowait()
+                self._queue.task_done()
+
+    def initialize_new_episode(self):
+        # Nothing to prepare in this policy
+        pass
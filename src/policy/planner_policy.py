@@ -1,10 +1,13 @@
 import os
-import clingo
-from typing import Tuple, Set
+import time
+from typing import Tuple, Set, FrozenSet
+
+from .planning_engine import PlanningEngine
 
 class PlannerPolicy:
 
-    def __init__(self, planning_horizon: int, mdp_builder):
+    def __init__(self, planning_horizon: int, mdp_builder, plan_cache = None, reuse_plan_suffix: bool = False,
+                 iterative_deepening: bool = False, time_budget: float = None, conflict_limit: int = None):
 
         self.planning_horizon: int = planning_horizon
         self.mdp_interface_file_path: str = mdp_builder.mdp_interface_file_path
@@ -16,6 +19,27 @@ class PlannerPolicy:
 
         self.asp_output = None
 
+        # Optional `mdp.LRUCache`, mapping (ground state, horizon) to (action, return, plan).
+        self.plan_cache = plan_cache
+
+        # If true, the remaining steps of the last plan are followed as long as the ground states
+        # match the predicted trajectory. Note that the plan suffix is only optimal for the
+        # remaining (shrinking) horizon, not for the full planning horizon.
+        self.reuse_plan_suffix: bool = reuse_plan_suffix
+        self._last_plan: Tuple[Tuple[str, int, FrozenSet[str]], ...] = tuple()
+
+        # If true, plans are computed for the horizons 1, 2, ... `planning_horizon`. We stop as soon
+        # as a plan ends in a terminal state, or when the time budget is used up.
+        self.iterative_deepening: bool = iterative_deepening
+
+        # Limits for each planning call. When the wall-clock `time_budget` (in seconds) is used up, or
+        # when the solver runs into `conflict_limit` conflicts, the best plan found so far is used.
+        self.time_budget: float = time_budget
+        self.conflict_limit: int = conflict_limit
+
+        # Whether the last computed plan is proven to be optimal, and how many plans were not.
+        self.optimality_proven: bool = None
+        self.unproven_plans: int = 0
 
     def suggest_action_for_ground_state(self, ground_state) -> str:
         next_action, _ = self.suggest_action_and_return_for_ground_state(ground_state)
@@ -26,28 +50,98 @@ class PlannerPolicy:
         return optimal_return
 
     def suggest_action_and_return_for_ground_state(self, ground_state) -> Tuple[str, int]:
+        suggested_action, expected_return, _ = self.suggest_plan_for_ground_state(ground_state)
+        return (suggested_action, expected_return)
+
+    def suggest_plan_for_ground_state(self, ground_state) -> Tuple[str, int, Tuple[Tuple[str, int, FrozenSet[str]], ...]]:
+        """
+        Returns the suggested action, the expected return and the plan starting in the ground state.
+        Uses the plan cache and the plan suffix, if enabled.
+        """
+
+        ground_state = frozenset(ground_state)
+
+        if self.plan_cache is not None:
+
+            key = (self.mdp_problem_file_path, frozenset(self.mdp_state_static), ground_state, self.planning_horizon)
+            cached_plan = self.plan_cache.get(key)
+
+            if cached_plan is not None:
+                suggested_action, expected_return, self._last_plan = cached_plan
+                return cached_plan
+
+        if self.reuse_plan_suffix:
+
+            suffix = self._plan_suffix_for_ground_state(ground_state)
+
+            if suffix:
+                # The return of the suffix is the sum of its remaining rewards.
+                return (suffix[0][0], sum(r for _, r, _ in suffix), suffix)
+
+        suggested_action, expected_return, plan, planned_horizon = self.compute_plan_for_ground_state(ground_state)
+        self._last_plan = plan
+
+        if not self.optimality_proven:
+            self.unproven_plans += 1
+
+        # Plans cut short by the time budget are not optimal for the full horizon.
+        if self.plan_cache is not None and planned_horizon == self.planning_horizon and self.optimality_proven:
+            self.plan_cache.put(key, (suggested_action, expected_return, plan))
+
+        return (suggested_action, expected_return, plan)
+
+    def _plan_suffix_for_ground_state(self, ground_state):
 
-        ctl = clingo.Control()
+        # Each step of a plan is (action, reward, predicted next state)
+        for i, (_, _, predicted_state) in enumerate(self._last_plan):
+            if predicted_state == ground_state:
+                return self._last_plan[i+1:]
 
-        ctl.load(self.mdp_interface_file_path)
-        ctl.load(self.mdp_problem_file_path)
-        ctl.load(self.planner_file_path)
-        ctl.add('base', [], ' '.join(f'currentState({s}).' for s in ground_state))
-        ctl.add('base', [], ' '.join(f'{s}.' for s in self.mdp_state_static))
-        ctl.add('base', [], f'#const t={self.planning_horizon}.')
-        ctl.add('base', [], '#show maxReturn/1. #show bestCurrentAction/1.')
+        return tuple()
 
-        ctl.configuration.solve.models = 0  # create all stable models and find the optimal one
-        ctl.ground(parts=[('base', [])])
-        models = ctl.solve(yield_=True)
+    def compute_plan_for_ground_state(self, ground_state):
+        """
+        Returns the suggested action, the expected return, the plan and the horizon it was planned for.
+        Sets `optimality_proven` to whether the plan is proven to be optimal for this horizon.
+        """
 
-        model = list(models)[0]
-        self.asp_output = str(model)
+        if not self.iterative_deepening:
+            return self._compute_plan_for_horizon(ground_state, self.planning_horizon, self.time_budget) + (self.planning_horizon,)
+
+        start_time = time.monotonic()
+        remaining_time = self.time_budget
+
+        for horizon in range(1, self.planning_horizon + 1):
+
+            suggested_action, expected_return, plan = self._compute_plan_for_horizon(ground_state, horizon, remaining_time)
+
+            if len(plan) < horizon and self.optimality_proven:
+                # A terminal state is reached before the horizon. Planning further ahead changes nothing.
+                return suggested_action, expected_return, plan, self.planning_horizon
+
+            if self.time_budget is not None:
+                remaining_time = self.time_budget - (time.monotonic() - start_time)
+                if remaining_time <= 0:
+                    break
+
+        return suggested_action, expected_return, plan, horizon
+
+    def _compute_plan_for_horizon(self, ground_state, planning_horizon: int, time_budget: float = None) -> Tuple[str, int, Tuple[Tuple[str, int, FrozenSet[str]], ...]]:
+
+        engine = PlanningEngine.for_domain(self.mdp_interface_file_path, self.mdp_problem_file_path,
+                                           self.planner_file_path, self.mdp_state_static, planning_horizon)
+        symbols, self.optimality_proven = engine.solve(ground_state, time_budget, self.conflict_limit)
+
+        self.asp_output = ' '.join(str(s) for s in symbols)
 
         expected_return = None
         suggested_action = None
+
+        actions = dict()
+        rewards = dict()
+        states = dict()
         
-        for symbol in model.symbols(shown=True):
+        for symbol in symbols:
             if symbol.name == 'maxReturn':
 
                 # Atom is of the form `maxReward(r)` and `r` is the expected return of the current state.
@@ -61,7 +155,27 @@ class PlannerPolicy:
 
                 suggested_action = str(symbol.arguments[0])
 
-        return (suggested_action, expected_return)
+            if symbol.name == 'act':
+
+                # Atom is of the form `act(f(...), t)`: action `f(...)` is taken at time step `t`.
+                actions[symbol.arguments[1].number] = str(symbol.arguments[0])
+
+            if symbol.name == 'partialReward':
+
+                # Atom is of the form `partialReward(r, t)`: part `r` of the reward received at time step `t`.
+                t = symbol.arguments[1].number
+                rewards[t] = rewards.get(t, 0) + symbol.arguments[0].number
+
+            if symbol.name == 'tic':
+
+                # Atom is of the form `tic(f(...), t)`: `f(...)` is part of the state at time step `t`.
+                t = symbol.arguments[1].number
+                states.setdefault(t, set()).add(str(symbol.arguments[0]))
+
+        plan = tuple((actions[t], rewards.get(t+1, 0), frozenset(states.get(t+1, set())))
+                     for t in sorted(actions))
+
+        return (suggested_action, expected_return, plan)
 
     def initialize_new_episode(self):
         # Nothing to prepare in this policy
@@ -0,0 +1,118 @@
+import clingo
+import threading
+import time
+
+from typing import Set, FrozenSet, Dict, Tuple, Iterable, List
+
+from mdp.clingo_engine import MultiShotEngine
+
+class PlanningEngine(MultiShotEngine):
+    """
+    A long-lived (multi-shot) clingo program computing optimal plans for a fixed horizon.
+
+    Domain, planner and horizon are loaded and grounded once. The current state is given by
+    `#external currentState(...)` atoms (see `MultiShotEngine`). All state atoms that the ground
+    program could reach within the horizon get externals as well.
+    """
+
+    _INPUTS = { 'state': [('tic', 2, 0)] }
+
+    # Engines are shared by all planners that use the same domain, static facts and horizon.
+    @classmethod
+    def for_domain(cls, interface_file_path: str, problem_file_path: str, planner_file_path: str,
+                   state_static: Iterable[str], planning_horizon: int) -> 'PlanningEngine':
+        return cls.shared(interface_file_path, problem_file_path, planner_file_path, frozenset(state_static),
+                          planning_horizon)
+
+    def __init__(self, interface_file_path: str, problem_file_path: str, planner_file_path: str,
+                 state_static: Iterable[str], planning_horizon: int):
+
+        super().__init__()
+
+        self.interface_file_path: str = interface_file_path
+        self.problem_file_path: str = problem_file_path
+        self.planner_file_path: str = planner_file_path
+        self.state_static: FrozenSet[str] = frozenset(state_static)
+        self.planning_horizon: int = planning_horizon
+
+        # Engines are shared, e.g. with a `BackgroundPlanner` thread, so only one call solves at a time.
+        self._lock = threading.Lock()
+
+    def solve(self, state: Iterable[str], time_budget: float = None,
+              conflict_limit: int = None) -> Tuple[List[clingo.Symbol], bool]:
+        """
+        Returns the shown symbols of the best model and whether this model is proven to be optimal.
+
+        Solving runs asynchronously. When `time_budget` (in seconds) is used up, or when the solver
+        runs into `conflict_limit` conflicts, the search stops and the best model found so far is
+        returned. If there is no model yet, we keep waiting for the first one.
+        """
+
+        with self._lock:
+            return self._solve(state, time_budget, conflict_limit)
+
+    def _solve(self, state: Iterable[str], time_budget: float, conflict_limit: int) -> Tuple[List[clingo.Symbol], bool]:
+
+        state = set(state)
+
+        self._assign_externals([{ 'state': state }])
+
+        self._ctl.configuration.solve.solve_limit = 'umax' if conflict_limit is None else str(conflict_limit)
+
+        deadline = None if time_budget is None else time.monotonic() + time_budget
+
+        # Clingo reports better and better models, until the optimal one is found.
+        best_model = { 'symbols': None, 'optimality_proven': False }
+
+        def on_model(model: clingo.Model) -> bool:
+
+            best_model['symbols'] = model.symbols(shown=True)
+            best_model['optimality_proven'] = model.optimality_proven
+
+            # Returning false stops the search.
+            return deadline is None or time.monotonic() < deadline
+
+        def search():
+
+            with self._ctl.solve(on_model=on_model, async_=True) as solvehandle:
+
+                finished = solvehandle.wait(time_budget)
+
+                if not finished and best_model['symbols'] is not None:
+                    solvehandle.cancel()
+
+                # Without any model so far, the search stops at the first model.
+                return solvehandle.get()
+
+        result = search()
+
+        # Like the time budget, the conflict limit only stops the search once there is a model.
+        # Otherwise the search goes on without the limit, until the first model is found.
+        if best_model['symbols'] is None and result.unknown:
+            self._ctl.configuration.solve.solve_limit = 'umax'
+            deadline = time.monotonic()
+            result = search()
+
+        if best_model['symbols'] is None:
+            raise ValueError(f'no plan exists for state {sorted(state)}')
+
+        # An exhausted search space proves the last model to be optimal.
+        return best_model['symbols'], best_model['optimality_proven'] or result.exhausted
+
+    def _ground_program(self, atoms: Dict[str, Set[str]]) -> clingo.Control:
+
+        ctl = clingo.Control()
+        ctl.load(self.interface_file_path)
+        ctl.load(self.problem_file_path)
+        ctl.load(self.planner_file_path)
+        ctl.add('base', [], ' '.join(f'{s}.' for s in self.state_static))
+        ctl.add('base', [], ' '.join(f'#external currentState({s}).' for s in atoms['state']))
+        ctl.add('base', [], f'#const t={self.planning_horizon}.')
+        ctl.add('base', [], '#show maxReturn/1. #show bestCurrentAction/1. '
+                            '#show act/2. #show tic/2. #show partialReward/2.')
+        ctl.ground(parts=[('base', [])])
+
+        return ctl
+
+    def _external_symbols(self, kind: str, atom: str) -> List[clingo.Symbol]:
+        return [clingo.Function('currentState', [clingo.parse_term(atom)])]
@@ -5,7 +5,8 @@ from . import RandomPolicy, PlannerPolicy, QTablePolicy
 class PlanningEpsilonGreedyPolicy:
 
     def __init__(self, planner_policy: PlannerPolicy, random_policy: RandomPolicy, 
-                 qtable_policy: QTablePolicy, epsilon: float, plan_for_new_states: bool = True):
+                 qtable_policy: QTablePolicy, epsilon: float, plan_for_new_states: bool = True,
+                 state_interner = None):
 
         self.random_policy = random_policy 
         self.qtable_policy = qtable_policy
@@ -14,6 +15,10 @@ class PlanningEpsilonGreedyPolicy:
         self.plan_for_new_states = plan_for_new_states
 
         self.planned_states = set()
+        self.state_interner = state_interner
+
+    def _key(self, state):
+        return self.state_interner.key(state) if self.state_interner is not None else state
 
     def is_new_state(self, state):
         return any(p.is_new_state(state) for p in [self.random_policy, self.qtable_policy])
@@ -27,15 +32,20 @@ class PlanningEpsilonGreedyPolicy:
         if not ground_state:
             ground_state = state
 
-        if self.plan_for_new_states and not state in self.planned_states:
-            self.planned_states.add(state)
-            return self.planner_policy.suggest_action_for_ground_state(ground_state)
-            
+        if self.plan_for_new_states and not self._key(state) in self.planned_states:
+
+            # A `BackgroundPlanner` suggests no action until its plan is ready. Until then, the state
+            # is treated like a known state, and planning is tried again on the next visit.
+            suggested_action = self.planner_policy.suggest_action_for_ground_state(ground_state)
+
+            if suggested_action is not None:
+                self.planned_states.add(self._key(state))
+                return suggested_action
+
+        if random.random() >= self.epsilon:
+            return self.qtable_policy.suggest_action_for_state(state)
         else:
-            if random.random() >= self.epsilon:
-                return self.qtable_policy.suggest_action_for_state(state)
-            else:
-                return self.random_policy.suggest_action_for_state(state)
+            return self.random_policy.suggest_action_for_state(state)
 
     def update(self, state, action, delta: float):
         self.qtable_policy.update(state, action, delta)
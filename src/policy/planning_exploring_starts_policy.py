@@ -7,7 +7,8 @@ class PlanningExploringStartsPolicy:
     def __init__(self, planner_policy: PlannerPolicy, random_policy: RandomPolicy, 
                  qtable_policy: QTablePolicy, 
                  planning_factor: float = 0.0,
-                 plan_for_new_states: float = False):
+                 plan_for_new_states: float = False,
+                 state_interner = None):
 
         self.planner_policy = planner_policy
         self.random_policy = random_policy 
@@ -19,6 +20,10 @@ class PlanningExploringStartsPolicy:
         self.first_action_in_episode = True
 
         self.known_states = set()
+        self.state_interner = state_interner
+
+    def _key(self, state):
+        return self.state_interner.key(state) if self.state_interner is not None else state
 
     def is_new_state(self, state):
         return any(p.is_new_state(state) for p in [self.random_policy, self.qtable_policy])
@@ -33,10 +38,10 @@ class PlanningExploringStartsPolicy:
     def suggest_action_for_state(self, state, ground_state):
 
         is_new_episode = self.first_action_in_episode
-        is_new_state = not state in self.known_states
+        is_new_state = not self._key(state) in self.known_states
 
         self.first_action_in_episode &= False
-        self.known_states.add(state)
+        self.known_states.add(self._key(state))
 
         if is_new_episode:
 
@@ -46,7 +51,7 @@ class PlanningExploringStartsPolicy:
         elif is_new_state:
 
             if self.plan_for_new_states:
-                return self.planner_policy.suggest_action_for_ground_state(ground_state)
+                return self._suggest_planned_action(state, ground_state)
 
             else:
                 return self.qtable_policy.suggest_action_for_state(state)
@@ -57,7 +62,17 @@ class PlanningExploringStartsPolicy:
                 return self.qtable_policy.suggest_action_for_state(state)
 
             else:
-                return self.planner_policy.suggest_action_for_ground_state(ground_state)
+                return self._suggest_planned_action(state, ground_state)
+
+    def _suggest_planned_action(self, state, ground_state):
+
+        # A `BackgroundPlanner` suggests no action until its plan is ready.
+        suggested_action = self.planner_policy.suggest_action_for_ground_state(ground_state)
+
+        if suggested_action is None:
+            return self.qtable_policy.suggest_action_for_state(state)
+
+        return suggested_action
 
     def update(self, state, action, delta: float):
         self.qtable_policy.update(state, action, delta)
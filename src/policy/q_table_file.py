@@ -0,0 +1,266 @@
+import array
+import mmap
+import shutil
+import struct
+import sys
+import tempfile
+
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+class QTableFile:
+    """
+    A compact, versioned binary file format for q-tables, independent of the Python version.
+
+    Atoms and actions are stored once in a string table. A state is a list of atom ids (or a single
+    string id, for the string states of abstract MDPs), and the q-values of all states are stored in
+    one contiguous float64 array, ordered like the rows of an `ArrayQTablePolicy`. All sections are
+    8-byte aligned little-endian arrays, so that they can be memory-mapped without copying:
+
+        header
+        string_index  uint64[n_strings + 1]   byte offsets into `string_data`
+        string_data   utf-8
+        state_kinds   uint8[n_states]         0: set of atoms, 1: string state
+        state_index   uint64[n_states + 1]    offsets into `state_atoms`
+        state_atoms   uint32[n_state_atoms]   string ids
+        row_index     uint64[n_states + 1]    offsets into `row_actions` and `values`
+        row_actions   uint32[n_values]        string ids
+        values        float64[n_values]
+
+    Files are written in a streaming fashion with `QTableFile.write`, which only keeps the string
+    table in memory, and read with `QTableFile(file_path)`.
+    """
+
+    MAGIC = b'QTABLE\x00\x00'
+    VERSION = 1
+
+    # magic, version, reserved, the counts and the byte offsets of the sections
+    _HEADER = struct.Struct('<8sII5Q9Q')
+    _SECTIONS = ['string_index', 'string_data', 'state_kinds', 'state_index', 'state_atoms',
+                 'row_index', 'row_actions', 'values']
+    _DTYPES = { 'string_index': '<u8', 'string_data': 'u1', 'state_kinds': 'u1', 'state_index': '<u8',
+                'state_atoms': '<u4', 'row_index': '<u8', 'row_actions': '<u4', 'values': '<f8' }
+
+    _ATOMS = 0
+    _STRING = 1
+
+    @classmethod
+    def is_q_table_file(cls, file_path: str) -> bool:
+        with open(file_path, 'rb') as f:
+            return f.read(len(cls.MAGIC)) == cls.MAGIC
+
+    @classmethod
+    def write(cls, file_path: str, items: Iterable[Tuple[Any, Dict[str, float]]]):
+        """
+        Writes (state, {action: value}) pairs, e.g. the items of an exported q-table.
+        """
+
+        string_ids: Dict[str, int] = dict()
+
+        def string_id(string: str) -> int:
+            if string not in string_ids:
+                string_ids[string] = len(string_ids)
+            return string_ids[string]
+
+        # Sections are streamed into temporary files first, and concatenated at the end.
+        sections = { name: tempfile.TemporaryFile() for name in cls._SECTIONS if not name.startswith('string') }
+        buffers = { 'state_kinds': array.array('B'), 'state_index': array.array('Q', [0]),
+                    'state_atoms': array.array('I'), 'row_index': array.array('Q', [0]),
+                    'row_actions': array.array('I'), 'values': array.array('d') }
+
+        def flush():
+            for name, buffer in buffers.items():
+                if sys.byteorder != 'little':
+                    buffer.byteswap()
+                buffer.tofile(sections[name])
+                del buffer[:]
+
+        n_states = 0
+        n_state_atoms = 0
+        n_values = 0
+
+        for state, action_values in items:
+
+            if isinstance(state, str):
+                kind, atoms = cls._STRING, [state]
+            elif isinstance(state, (set, frozenset)):
+                kind, atoms = cls._ATOMS, sorted(state)
+            else:
+                raise ValueError(f'states of type {type(state).__name__} can not be written to a q-table file')
+
+            n_states += 1
+            n_state_atoms += len(atoms)
+            n_values += len(action_values)
+
+            buffers['state_kinds'].append(kind)
+            buffers['state_atoms'].extend([string_id(a) for a in atoms])
+            buffers['state_index'].append(n_state_atoms)
+
+            buffers['row_actions'].extend([string_id(a) for a in action_values])
+            buffers['values'].extend(action_values.values())
+            buffers['row_index'].append(n_values)
+
+            if len(buffers['values']) >= 1 << 16:
+                flush()
+
+        flush()
+
+        encoded_strings = [s.encode('utf-8') for s in string_ids]
+        sections['string_index'] = np.cumsum([0] + [len(s) for s in encoded_strings], dtype='<u8').tobytes()
+        sections['string_data'] = b''.join(encoded_strings)
+
+        with open(file_path, 'wb') as f:
+
+            f.write(b'\x00' * cls._HEADER.size)
+            offsets = []
+
+            for name in cls._SECTIONS:
+
+                # Every section starts at a multiple of 8 bytes.
+                f.write(b'\x00' * (-f.tell() % 8))
+                offsets.append(f.tell())
+
+                section = sections[name]
+                if isinstance(section, bytes):
+                    f.write(section)
+                else:
+                    section.seek(0)
+                    shutil.copyfileobj(section, f)
+                    section.close()
+
+            offsets.append(f.tell())
+
+            f.seek(0)
+            f.write(cls._HEADER.pack(cls.MAGIC, cls.VERSION, 0, len(encoded_strings), len(sections['string_data']),
+                                     n_states, n_state_atoms, n_values, *offsets))
+
+    def __init__(self, file_path: str, mmap_mode: str = 'r'):
+        """
+        Opens a q-table file. With `mmap_mode` 'r' the values are a read-only view of the file,
+        with 'c' changes of the values stay in memory (copy-on-write), and with `None` the file
+        is read into memory.
+        """
+
+        assert mmap_mode in {None, 'r', 'c'}, f"unknown mmap mode: '{mmap_mode}'"
+
+        self.file_path: str = file_path
+
+        with open(file_path, 'rb') as f:
+            if mmap_mode is None:
+                buffer = bytearray(f.read())
+            else:
+                access = mmap.ACCESS_READ if mmap_mode == 'r' else mmap.ACCESS_COPY
+                buffer = mmap.mmap(f.fileno(), 0, access=access)
+
+        if len(buffer) < self._HEADER.size or buffer[:len(self.MAGIC)] != self.MAGIC:
+            raise ValueError(f'{file_path} is not a q-table file')
+
+        magic, version, _, n_strings, n_string_bytes, n_states, n_state_atoms, n_values, *offsets = \
+            self._HEADER.unpack_from(buffer)
+
+        if version != self.VERSION:
+            raise ValueError(f'{file_path} has q-table file version {version}, expected {self.VERSION}')
+
+        counts = { 'string_index': n_strings + 1, 'string_data': n_string_bytes, 'state_kinds': n_states,
+                   'state_index': n_states + 1, 'state_atoms': n_state_atoms, 'row_index': n_states + 1,
+                   'row_actions': n_values, 'values': n_values }
+
+        self._buffer = buffer
+        self._arrays: Dict[str, np.ndarray] = { name: np.frombuffer(buffer, dtype=self._DTYPES[name],
+                                                                    count=counts[name], offset=offset)
+                                                for name, offset in zip(self._SECTIONS, offsets) }
+
+        # The string table is small compared to the states, and decoded right away.
+        string_index = self._arrays['string_index'].tolist()
+        string_data = self._arrays['string_data'].tobytes()
+        self.strings: List[str] = [string_data[string_index[i]:string_index[i+1]].decode('utf-8')
+                                   for i in range(n_strings)]
+
+        self.n_states: int = n_states
+
+    def __len__(self):
+        return self.n_states
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+
+        self._arrays.clear()
+
+        # A memory map stays open as long as arrays taken from it (e.g. `values`) are in use.
+        # It is closed once these are garbage collected.
+        if isinstance(self._buffer, mmap.mmap):
+            try:
+                self._buffer.close()
+            except BufferError:
+                pass
+
+        self._buffer = None
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._arrays['values']
+
+    def rows(self, states: Iterable = None, with_values: bool = True,
+             chunk_size: int = 65536) -> Iterator[Tuple[Any, int, Tuple[str, ...], List[float]]]:
+        """
+        Yields (state, offset into `values`, actions, values) for each row, optionally only for
+        the given states (partial loading). Rows with the same actions share the tuple of actions.
+        Without `with_values`, the values are not read and `None` is yielded instead.
+        """
+
+        if states is not None:
+            states = { frozenset(s) if isinstance(s, set) else s for s in states }
+
+        strings = self.strings
+        shared_actions: Dict[Tuple[int, ...], Tuple[str, ...]] = dict()
+
+        # The arrays are converted to lists chunk by chunk, which is much faster than reading
+        # single elements, and still keeps only a part of a large file in memory.
+        for first in range(0, self.n_states, chunk_size):
+
+            last = min(first + chunk_size, self.n_states)
+
+            state_kinds = self._arrays['state_kinds'][first:last].tolist()
+            state_index = self._arrays['state_index'][first:last+1].tolist()
+            state_atoms = self._arrays['state_atoms'][state_index[0]:state_index[-1]].tolist()
+            row_index = self._arrays['row_index'][first:last+1].tolist()
+            row_actions = self._arrays['row_actions'][row_index[0]:row_index[-1]].tolist()
+            if with_values:
+                values = self._arrays['values'][row_index[0]:row_index[-1]].tolist()
+
+            atom_offset = state_index[0]
+            value_offset = row_index[0]
+
+            for i in range(last - first):
+
+                atom_ids = state_atoms[state_index[i] - atom_offset:state_index[i+1] - atom_offset]
+
+                if state_kinds[i] == self._STRING:
+                    state = strings[atom_ids[0]]
+                else:
+                    state = frozenset(map(strings.__getitem__, atom_ids))
+
+                if states is not None and state not in states:
+                    continue
+
+                start, end = row_index[i] - value_offset, row_index[i+1] - value_offset
+
+                action_ids = tuple(row_actions[start:end])
+                actions = shared_actions.get(action_ids)
+                if actions is None:
+                    actions = shared_actions[action_ids] = tuple(map(strings.__getitem__, action_ids))
+
+                yield state, row_index[i], actions, values[start:end] if with_values else None
+
+    def items(self, states: Iterable = None) -> Iterator[Tuple[Any, Dict[str, float]]]:
+        for state, _, actions, values in self.rows(states):
+            yield state, dict(zip(actions, values))
+
+    def to_dict(self, states: Iterable = None) -> Dict[Any, Dict[str, float]]:
+        return dict(self.items(states))
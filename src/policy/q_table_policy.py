@@ -2,27 +2,34 @@ from typing import Set, Dict, Any
 import random
 
 from . import RandomPolicy
+from .q_table_file import QTableFile
 
 class QTablePolicy:
 
-    def __init__(self, initial_value_estimate: float = 0.0):
+    def __init__(self, initial_value_estimate: float = 0.0, state_interner = None):
         self.q_table: Dict[Any, Dict[Any, float]] = dict()
         self.initial_value_estimate: float = initial_value_estimate
 
+        # If given, states are stored under compact keys (see `mdp.StateInterner`).
+        self.state_interner = state_interner
+
+    def _key(self, state):
+        return self.state_interner.key(state) if self.state_interner is not None else state
+
     def is_new_state(self, state) -> bool:
-        return not state in self.q_table
+        return not self._key(state) in self.q_table
 
     def value_for(self, state, action) -> float:
 
         if action is None:
             return 0
 
-        return self.q_table[state][action]
+        return self.q_table[self._key(state)][action]
 
     def suggest_action_for_state(self, state, *args) -> Any:
 
 
-        available_estimates = self.q_table[state].items()
+        available_estimates = self.q_table[self._key(state)].items()
 
         if len(available_estimates) == 0:
             return None
@@ -36,10 +43,29 @@ class QTablePolicy:
 
     def initialize_state(self, state, available_actions: Set):
         if self.is_new_state(state):
-            self.q_table[state] = { a: self.initial_value_estimate for a in available_actions }
+            self.q_table[self._key(state)] = { a: self.initial_value_estimate for a in available_actions }
 
     def update(self, state, action, delta:float):
-        self.q_table[state][action] += delta
+        self.q_table[self._key(state)][action] += delta
 
     def optimal_value_for(self, state):
         return self.value_for(state, self.suggest_action_for_state(state))
+
+    def export_q_table(self) -> Dict[Any, Dict[Any, float]]:
+        # The q-table with the original states as keys, e.g. for saving it to a file.
+        if self.state_interner is not None:
+            return { self.state_interner.state(k): v for k, v in self.q_table.items() }
+        else:
+            return self.q_table
+
+    def import_q_table(self, q_table: Dict[Any, Dict[Any, float]]):
+        self.q_table = { self._key(s): v for s, v in q_table.items() }
+
+    def save(self, file_path: str):
+        # Writes the q-table in the binary format of `QTableFile`.
+        QTableFile.write(file_path, self.export_q_table().items())
+
+    def load(self, file_path: str, states = None):
+        # Reads a `QTableFile`, optionally only the given states.
+        with QTableFile(file_path) as q_table_file:
+            self.import_q_table(q_table_file.to_dict(states))
@@ -3,11 +3,17 @@ import random
 
 class RandomPolicy:
 
-    def __init__(self):
+    def __init__(self, state_interner = None):
         self._actions_for_state: Dict[Any, List[Any]] = dict()
+
+        # If given, states are stored under compact keys (see `mdp.StateInterner`).
+        self.state_interner = state_interner
+
+    def _key(self, state):
+        return self.state_interner.key(state) if self.state_interner is not None else state
    
     def suggest_action_for_state(self, state):
-        choices = self._actions_for_state[state]
+        choices = self._actions_for_state[self._key(state)]
         if len(choices) > 0:
             return random.choice(choices)
         else:
@@ -15,10 +21,10 @@ class RandomPolicy:
             return None
 
     def is_new_state(self, state) -> bool:
-        return not state in self._actions_for_state
+        return not self._key(state) in self._actions_for_state
 
     def initialize_state(self, state, available_actions: Set):
-        self._actions_for_state[state] = list(available_actions)
+        self._actions_for_state[self._key(state)] = list(available_actions)
 
     def initialize_new_episode(self):
         # Nothing to prepare in this policy
@@ -0,0 +1,308 @@
+from typing import Set, Dict, Tuple, Any
+import hashlib
+import multiprocessing
+import random
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from . import QTablePolicy
+
+class SharedQTablePolicy(QTablePolicy):
+    """
+    A `QTablePolicy` in shared memory, which several processes can read and update at the same time.
+
+    The q-table is an open-addressing hash table in one `multiprocessing.shared_memory` block. A state
+    is identified by a stable 64-bit hash of its atoms (or of its name, for the string states of
+    abstract MDPs). Its slot points to the values of its available actions in one shared float64
+    array, and to a record of the state and its actions, so that every process can look up (and
+    export) states that were added by other processes.
+
+    New states are added under a single lock. Updates of values are guarded by one of `n_stripes`
+    locks, chosen by the state, so that processes working on different states rarely wait for
+    each other. Values are read without locking. Each process caches the slots it has seen.
+
+    The table has a fixed size. The policy is passed to worker processes like any other object
+    (e.g. as an argument of `multiprocessing.Process`), and the creating process should `unlink`
+    the shared memory at the end.
+    """
+
+    # Records of states and actions are separated by this byte, which never occurs in atoms.
+    _SEPARATOR = '\x00'
+
+    def __init__(self, initial_value_estimate: float = 0.0, state_interner = None, max_states: int = 100000,
+                 max_values: int = None, max_record_bytes: int = None, n_stripes: int = 64, mp_context = None):
+
+        self.initial_value_estimate: float = initial_value_estimate
+
+        # If given, states are cached locally under compact keys (see `mdp.StateInterner`).
+        self.state_interner = state_interner
+
+        self.max_states: int = max_states
+        self.max_values: int = max_values if max_values is not None else 16 * max_states
+        self.max_record_bytes: int = max_record_bytes if max_record_bytes is not None else 256 * max_states
+
+        # Twice as many slots as states keep the probe sequences short.
+        self.capacity: int = 1 << (2 * max_states - 1).bit_length()
+
+        self._shared_memory = shared_memory.SharedMemory(create=True, size=self._size())
+        self._owner: bool = True
+
+        # The locks only work with processes of the same context (e.g. `multiprocessing.get_context('spawn')`).
+        mp_context = mp_context or multiprocessing.get_context()
+        self._insert_lock = mp_context.Lock()
+        self._stripe_locks = [mp_context.Lock() for _ in range(n_stripes)]
+
+        self._attach()
+
+    def _size(self) -> int:
+        return 8 * 4 + 8 * self.capacity + 8 * 4 * self.capacity + 8 * self.max_values + self.max_record_bytes
+
+    def _attach(self):
+
+        buffer = self._shared_memory.buf
+        offset = 0
+
+        def array(dtype, shape):
+            nonlocal offset
+            a = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+            offset += a.nbytes
+            return a
+
+        # Number of states, used values and used record bytes
+        self._header = array(np.int64, 4)
+
+        # Per slot: hash of the state (0 if empty), and offset of its values, number of actions,
+        # offset and length of its record
+        self._keys = array(np.uint64, self.capacity)
+        self._slots = array(np.int64, (self.capacity, 4))
+
+        self.values = array(np.float64, self.max_values)
+        self._records = array(np.uint8, self.max_record_bytes)
+
+        # Local cache: state key -> (offset of the values, actions, action index)
+        self._rows: Dict[Any, Tuple[int, Tuple[str, ...], Dict[str, int]]] = dict()
+        self._action_sets: Dict[Tuple[str, ...], Tuple[Tuple[str, ...], Dict[str, int]]] = dict()
+
+    def __getstate__(self):
+
+        state = { k: v for k, v in self.__dict__.items()
+                  if k not in {'_header', '_keys', '_slots', 'values', '_records', '_rows', '_action_sets'} }
+        state['_shared_memory'] = self._shared_memory.name
+
+        return state
+
+    def __setstate__(self, state):
+
+        self.__dict__.update(state)
+
+        # Only the creating process removes the shared memory. Before Python 3.13, attaching always
+        # registers it with the resource tracker, which is shared with the processes it started.
+        try:
+            self._shared_memory = shared_memory.SharedMemory(name=state['_shared_memory'], track=False)
+        except TypeError:
+            self._shared_memory = shared_memory.SharedMemory(name=state['_shared_memory'])
+
+        self._owner = False
+
+        self._attach()
+
+    def close(self):
+
+        for name in ['_header', '_keys', '_slots', 'values', '_records']:
+            setattr(self, name, None)
+
+        self._shared_memory.close()
+
+    def unlink(self):
+        self.close()
+        if self._owner:
+            self._shared_memory.unlink()
+
+    @property
+    def q_table(self) -> Dict[Any, Dict[Any, float]]:
+        return self.export_q_table()
+
+    @property
+    def n_states(self) -> int:
+        return int(self._header[0])
+
+    def is_new_state(self, state) -> bool:
+        return self._row(state) is None
+
+    def value_for(self, state, action) -> float:
+
+        if action is None:
+            return 0
+
+        offset, _, action_index = self._row(state)
+        return float(self.values[offset + action_index[action]])
+
+    def suggest_action_for_state(self, state, *args) -> Any:
+
+        offset, actions, _ = self._row(state)
+
+        if len(actions) == 0:
+            return None
+
+        values = self.values[offset:offset + len(actions)].tolist()
+        max_value = max(values)
+
+        return random.choice([a for a, v in zip(actions, values) if v == max_value])
+
+    def optimal_value_for(self, state):
+
+        offset, actions, _ = self._row(state)
+
+        if len(actions) == 0:
+            return 0
+
+        return float(self.values[offset:offset + len(actions)].max())
+
+    def initialize_state(self, state, available_actions: Set):
+        if self.is_new_state(state):
+            self._insert(state, { a: self.initial_value_estimate for a in available_actions })
+
+    def update(self, state, action, delta: float):
+
+        offset, _, action_index = self._row(state)
+
+        with self._stripe_locks[offset % len(self._stripe_locks)]:
+            self.values[offset + action_index[action]] += delta
+
+    def export_q_table(self) -> Dict[Any, Dict[Any, float]]:
+        # The q-table of all processes, with the original states as keys
+
+        q_table = dict()
+
+        for slot in np.flatnonzero(self._keys).tolist():
+
+            value_offset, n_actions, record_offset, record_length = self._slots[slot].tolist()
+            state, actions = self._decode(self._records[record_offset:record_offset + record_length].tobytes())
+
+            q_table[state] = dict(zip(actions, self.values[value_offset:value_offset + n_actions].tolist()))
+
+        return q_table
+
+    def import_q_table(self, q_table: Dict[Any, Dict[Any, float]]):
+        # States are added to the shared q-table, or their values are overwritten.
+
+        for s, v in q_table.items():
+
+            if self.is_new_state(s):
+                self._insert(s, v)
+
+            else:
+                offset, _, action_index = self._row(s)
+                for a, value in v.items():
+                    self.values[offset + action_index[a]] = value
+
+    def _row(self, state):
+
+        key = self._key(state)
+        row = self._rows.get(key)
+
+        if row is None:
+
+            slot, found = self._probe(self._encode_state(state))
+
+            if not found:
+                return None
+
+            # The state was added by this or another process.
+            value_offset, n_actions, record_offset, record_length = self._slots[slot].tolist()
+            _, actions = self._decode(self._records[record_offset:record_offset + record_length].tobytes())
+
+            row = self._rows[key] = (value_offset,) + self._shared_actions(actions)
+
+        return row
+
+    def _insert(self, state, action_values: Dict[str, float]):
+
+        state_record = self._encode_state(state)
+        actions = tuple(action_values)
+        record = self._SEPARATOR.join((state_record,) + actions).encode('utf-8')
+        key = self._hash(state_record)
+
+        with self._insert_lock:
+
+            slot, found = self._probe(state_record)
+
+            # Another process may have added the state in the meantime.
+            if not found:
+
+                n_states, value_offset, record_offset, _ = self._header.tolist()
+
+                if n_states >= self.max_states or value_offset + len(actions) > self.max_values \
+                   or record_offset + len(record) > self.max_record_bytes:
+                    raise RuntimeError(f'the shared q-table is full ({n_states} states)')
+
+                self.values[value_offset:value_offset + len(actions)] = [action_values[a] for a in actions]
+                self._records[record_offset:record_offset + len(record)] = np.frombuffer(record, dtype=np.uint8)
+                self._slots[slot] = (value_offset, len(actions), record_offset, len(record))
+                self._header[:3] = (n_states + 1, value_offset + len(actions), record_offset + len(record))
+
+                # The slot is published last, so that other processes never see an incomplete state.
+                self._keys[slot] = key
+
+    def _probe(self, state_record: str) -> Tuple[int, bool]:
+        # Returns the slot of the state, or the empty slot where it belongs. States with the same
+        # key (a hash collision) are told apart by the state in their record.
+
+        key = self._hash(state_record)
+        encoded_state_record = state_record.encode('utf-8')
+
+        mask = self.capacity - 1
+        slot = key & mask
+
+        while True:
+
+            slot_key = int(self._keys[slot])
+
+            if slot_key == key and self._state_record_of_slot(slot) == encoded_state_record:
+                return slot, True
+            if slot_key == 0:
+                return slot, False
+
+            slot = (slot + 1) & mask
+
+    def _state_record_of_slot(self, slot: int) -> bytes:
+
+        _, _, record_offset, record_length = self._slots[slot].tolist()
+        record = self._records[record_offset:record_offset + record_length].tobytes()
+
+        return record.split(self._SEPARATOR.encode('utf-8'), 1)[0]
+
+    def _shared_actions(self, actions: Tuple[str, ...]) -> Tuple[Tuple[str, ...], Dict[str, int]]:
+
+        if actions not in self._action_sets:
+            self._action_sets[actions] = (actions, { a: i for i, a in enumerate(actions) })
+
+        return self._action_sets[actions]
+
+    @staticmethod
+    def _hash(state_record: str) -> int:
+        # A stable hash (unlike `hash`, which differs between processes). 0 marks empty slots.
+        return int.from_bytes(hashlib.blake2b(state_record.encode('utf-8'), digest_size=8).digest(), 'little') or 1
+
+    @classmethod
+    def _encode_state(cls, state) -> str:
+
+        if isinstance(state, str):
+            return 'S' + state
+
+        # Ground states are sets of atoms.
+        return 'A' + ' '.join(sorted(state))
+
+    @classmethod
+    def _decode(cls, record: bytes) -> Tuple[Any, Tuple[str, ...]]:
+
+        state_record, *actions = record.decode('utf-8').split(cls._SEPARATOR)
+
+        if state_record[0] == 'S':
+            state = state_record[1:]
+        else:
+            state = frozenset(a for a in state_record[1:].split(' ') if a != '')
+
+        return state, tuple(actions)
@@ -6,10 +6,13 @@ from .policy import *
 import argparse
 import copy
 import csv
+import multiprocessing
 import sys
 import os
 import pickle
+import queue
 import signal
+import traceback
 from datetime import datetime
 
 from tqdm import tqdm
@@ -21,153 +24,166 @@ def handle_keyboard_interrupt(sig, frame):
     print('\nKeyboard interrupt detected! Quitting after saving this episode...')
 signal.signal(signal.SIGINT, handle_keyboard_interrupt)
 
-def write_experiment_data(data, filename):
-    if filename:
-        csv_headers = set()
-        for row in data:
-            csv_headers |= row.keys()
+class ExperimentDataWriter:
+    """
+    Appends one csv row per episode, without keeping earlier rows in memory.
 
-        with open(filename, 'w') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=list(csv_headers))
-            writer.writeheader()
-            writer.writerows(data)
+    The columns are taken from the first row. All rows of a training run have the same keys.
+    Rows are flushed to disk every `flush_interval` rows, and when the writer is closed.
+    """
 
-def build_episode_generator(episode_limit):
-    i = 0
-    while True:
-        yield i
-        i += 1
-        if episode_limit and i == episode_limit:
-            return
+    def __init__(self, filename, flush_interval=1):
+        self.filename = filename
+        self.flush_interval = flush_interval
 
-def main():
+        self._csvfile = None
+        self._writer = None
+        self._rows_since_flush = 0
 
-    global keyboard_interrupt_occurred
-
-    parser = argparse.ArgumentParser(description='Train a RLASP agent in a given MDP.')
-
-    parser.add_argument('--no_progress_bar', help='Don\'t show progress in stdout',
-                        dest='show_progress_bar', action='store_false')
-    parser.set_defaults(show_progress_bar=True)
+    def write(self, row):
 
-    parser.add_argument('--test_target_policy', help='Generate every episode, twice (with same starting state). Once with the behavior policy and learning as usual. Once with the target policy and no learning.',
-                        dest='test_target_policy', action='store_true')
-    parser.set_defaults(test_target_policy=False)
+        if not self.filename:
+            return
 
-    parser.add_argument('--qtable_input', help='Provides a file location to read a qtable description from. This will be used to initialize the qtables in both behavior and target policy before training.', metavar='qtable.pickle', default=None)
-    parser.add_argument('--qtable_output', help='Provides a file location to write a qtable description of the target policy after training.', metavar='qtable.pickle', default=None)
+        if self._writer is None:
+            self._csvfile = open(self.filename, 'w', newline='')
+            self._writer = csv.DictWriter(self._csvfile, fieldnames=list(row.keys()))
+            self._writer.writeheader()
 
-    parser.add_argument('--db_file', help='Location to store the generated data. If `None`, no file will be generated.', metavar='db_file.csv', default='out.csv')
+        self._writer.writerow(row)
 
-    parser.add_argument('--episodes', help='The number of episodes to train for.', type=int, default=None)
-    parser.add_argument('--max_episode_length', help='The maximum number of steps within an episode.', type=int, default=10)
+        self._rows_since_flush += 1
+        if self._rows_since_flush >= self.flush_interval:
+            self._csvfile.flush()
+            self._rows_since_flush = 0
 
-    # Behavior policies
-    parser.add_argument('--epsilon', help='The "epsilon" parameter for the epsilon-greedy behavior policy. Does nothing for other behavior policies.', type=float, default=0.3)
-    parser.add_argument('--planning_horizon', help='The number of steps into the future considered by the planner', type=int, default=4)
+    def close(self):
+        if self._csvfile is not None:
+            self._csvfile.close()
+            self._csvfile = None
+            self._writer = None
 
-    parser.add_argument('--no_planning', dest='plan_for_new_states', action='store_false')
-    parser.add_argument('--yes_planning', dest='plan_for_new_states', action='store_true')
-    parser.set_defaults(plan_for_new_states=False)
+def build_episode_generator(episode_limit):
+    i = 0
+    while True:
+        yield i
+        i += 1
+        if episode_limit and i == episode_limit:
+            return
 
-    # Control algorithms
-    parser.add_argument('--control_algorithm', help='The control algorithm to be used for training', default='q_learning',
-                              choices={'monte_carlo', 'q_learning', 'q_learning_reversed_update'})
+def load_q_table(q_table_policy, file_path):
 
-    parser.add_argument('--learning_rate', help='The learning rate (also step-size parameter or alpha) considered by some control algorithms.', type=float, default=0.3)
-    parser.add_argument('--initial_q_estimate', help='The starting q-value estimate for a new state-action pair.', type=float, default=0)
+    if QTableFile.is_q_table_file(file_path):
+        q_table_policy.load(file_path)
+    else:
+        with open(file_path, 'rb') as f:
+            q_table_policy.import_q_table(pickle.load(f))
 
-    # Abstraction / Carcass
-    parser.add_argument('--carcass', help='The filename of the logic programm describing a carcass for the given MDP. The file must be located in `src/mdp/abstraction/carcass_rules`.', 
-                        default=None)
+def save_q_table(q_table_policy, file_path):
 
-    # MDP's
-    subparsers = parser.add_subparsers(help='The markov decision procedure which should be learned.', title='Markov decision procedure')
+    if file_path.endswith('.qtable'):
+        q_table_policy.save(file_path)
+    else:
+        with open(file_path, 'wb') as f:
+            pickle.dump(q_table_policy.export_q_table(), f)
 
-    parser_blocksworld = subparsers.add_parser('blocksworld', help='The classic blocksworld.')
-    parser_blocksworld.add_argument('--blocks_world_size', help='The number of blocks in the blocks world.', type=int, default=5)
-    parser_blocksworld.add_argument('--blocks_world_reversed_stack_order', help='If true, block need to be stacked in reverse order.', 
-                                    default=False, action='store_true')
-    parser_blocksworld.set_defaults(mdp='blocksworld', behavior_policy='planning_epsilon_greedy')
+def build_mdp_builder(args, actor_id=0):
 
-    parser_sokoban = subparsers.add_parser('sokoban', help='The sokoban game.')
-    parser_sokoban.add_argument('--sokoban_level_name', help='The sokoban level name.', default='suitcase-05-01')
-    parser_sokoban.set_defaults(mdp='sokoban', behavior_policy='planning_epsilon_greedy')
-
-    parser_slidingpuzzle = subparsers.add_parser('slidingpuzzle', help='The sliding puzzle.')
-    parser_slidingpuzzle.add_argument('--sliding_puzzle_size', help='The sliding puzzle size.', type=int, default=2)
-    parser_slidingpuzzle.add_argument('--sliding_puzzle_missing_pieces', help='Missing pieces in the sliding puzzle.', type=int, default=2)
-    parser_slidingpuzzle.set_defaults(mdp='slidingpuzzle', behavior_policy='planning_epsilon_greedy')
-
-    parser_minigrid = subparsers.add_parser('minigrid', help='The minigrid environment from openAI gym')
-    parser_minigrid.add_argument('--minigrid_level', help='The minigrid level id', default='MiniGrid-MultiRoom-N6-v0')
-    parser_minigrid.add_argument('--minigrid_fully_observable', help='If true, the entire environment will be part of the agents observatons. If false, the agent sees only its immediate environment',
-                                 default=True)
-    parser_minigrid.add_argument('--minigrid_use_alternative_reward_system', 
-                                 help='If `false`, use the original rewards with no discounting. If `true`, a discount factor is introduced and the reward for reaching the goal state will always be 1.',
-                                 action='store_true', default=False)
-    # Note: max_episode_length is handled internally by minigrid environments -> set it to `None`.
-    parser_minigrid.set_defaults(mdp='minigrid', behavior_policy='planning_epsilon_greedy', max_episode_length=None)
-
-    parser_vacuum = subparsers.add_parser('vacuumworld', help='The sliding puzzle.')
-    parser_vacuum.set_defaults(mdp='vacuumworld', behavior_policy='planning_exploring_starts')
-
-    args = parser.parse_args()
+    if args.transition_cache_size > 0:
+        transition_cache = LRUCache(args.transition_cache_size, args.transition_cache_file)
+    else:
+        transition_cache = None
 
 
     if args.mdp == 'blocksworld':
-        mdp_builder = BlocksWorldBuilder(args.blocks_world_size, reverse_stack_order = args.blocks_world_reversed_stack_order)
+        mdp_builder = BlocksWorldBuilder(args.blocks_world_size, reverse_stack_order = args.blocks_world_reversed_stack_order,
+                                         transition_cache=transition_cache, transition_model=args.transition_model)
     elif args.mdp == 'sokoban':
-        mdp_builder = SokobanBuilder(args.sokoban_level_name)
+        mdp_builder = SokobanBuilder(args.sokoban_level_name, transition_cache=transition_cache,
+                                     transition_model=args.transition_model)
     elif args.mdp == 'slidingpuzzle':
-        mdp_builder = SlidingPuzzleBuilder(args.sliding_puzzle_size, args.sliding_puzzle_missing_pieces)
+        mdp_builder = SlidingPuzzleBuilder(args.sliding_puzzle_size, args.sliding_puzzle_missing_pieces,
+                                           transition_cache=transition_cache)
     elif args.mdp == 'minigrid':
-        mdp_builder = GymMinigridBuilder(args.minigrid_level, args.minigrid_fully_observable, args.minigrid_use_alternative_reward_system)
+        # Every actor draws its own levels.
+        seed = None if args.minigrid_seed is None else args.minigrid_seed + actor_id
+        mdp_builder = GymMinigridBuilder(args.minigrid_level, args.minigrid_fully_observable, args.minigrid_use_alternative_reward_system,
+                                         seed)
 
     elif args.mdp == 'vacuumworld':
-        mdp_builder = VacuumCleanerWorldBuilder()
+        mdp_builder = VacuumCleanerWorldBuilder(transition_cache)
 
     if args.carcass:
+
+        if args.abstraction_cache_size > 0:
+            abstraction_cache = LRUCache(args.abstraction_cache_size)
+        else:
+            abstraction_cache = None
+
         if args.carcass.endswith('.lp'):
             # This is an ASP CARCASS
-            mdp_builder = CarcassBuilder(mdp_builder, args.carcass)
+            mdp_builder = CarcassBuilder(mdp_builder, args.carcass, abstraction_cache)
         elif args.carcass.endswith('.pl'):
-            mdp_builder = PrologCarcassBuilder(mdp_builder, args.carcass)
+            mdp_builder = PrologCarcassBuilder(mdp_builder, args.carcass, abstraction_cache)
+
+    return mdp_builder, transition_cache
+
+def build_q_table_policy(args, state_interner):
+
+    if args.qtable_backend == 'shared':
+        q_table_policy = SharedQTablePolicy(args.initial_q_estimate, state_interner, args.shared_qtable_max_states)
+    else:
+        q_table_policy_class = ArrayQTablePolicy if args.qtable_backend == 'array' else QTablePolicy
+        q_table_policy = q_table_policy_class(args.initial_q_estimate, state_interner)
 
-    behavior_policy_qtable = QTablePolicy(args.initial_q_estimate)
     if args.qtable_input:
-        with open(args.qtable_input, 'rb') as f:
-            behavior_policy_qtable.q_table = pickle.load(f)
+        load_q_table(q_table_policy, args.qtable_input)
+
+    return q_table_policy
+
+def build_behavior_policy(args, mdp_builder, behavior_policy_qtable, state_interner):
 
+    plan_cache = LRUCache(args.plan_cache_size) if args.plan_cache_size > 0 else None
+    planner_policy = PlannerPolicy(args.planning_horizon, mdp_builder, plan_cache, args.reuse_plan_suffix,
+                                   args.iterative_deepening, args.planning_time_budget, args.planning_conflict_limit)
+
+    # The behavior policies only use the planner through `behavior_planner`.
+    if args.background_planning:
+        behavior_planner = BackgroundPlanner(planner_policy, speculation_depth=args.speculation_depth)
+    else:
+        behavior_planner = planner_policy
 
     if args.behavior_policy == 'planning_exploring_starts':
 
-        behavior_policy = PlanningExploringStartsPolicy(PlannerPolicy(args.planning_horizon, mdp_builder),
-                                                        RandomPolicy(),
+        behavior_policy = PlanningExploringStartsPolicy(behavior_planner,
+                                                        RandomPolicy(state_interner),
                                                         behavior_policy_qtable,
                                                         planning_factor=0,
-                                                        plan_for_new_states=args.plan_for_new_states)
+                                                        plan_for_new_states=args.plan_for_new_states,
+                                                        state_interner=state_interner)
 
     elif args.behavior_policy == 'planning_epsilon_greedy':
 
-        behavior_policy = PlanningEpsilonGreedyPolicy(PlannerPolicy(args.planning_horizon, mdp_builder),
-                                                      RandomPolicy(),
+        behavior_policy = PlanningEpsilonGreedyPolicy(behavior_planner,
+                                                      RandomPolicy(state_interner),
                                                       behavior_policy_qtable,
                                                       args.epsilon,
-                                                      args.plan_for_new_states)
+                                                      args.plan_for_new_states,
+                                                      state_interner)
+
+    return behavior_policy, planner_policy, behavior_planner
+
+def build_control(args, behavior_policy, behavior_policy_qtable, state_interner):
 
     if args.control_algorithm == 'monte_carlo':
 
         control = FirstVisitMonteCarloControl(behavior_policy)
-        
-        qtable_policy_for_export = behavior_policy.qtable_policy
+
+        qtable_policy_for_export = behavior_policy_qtable
 
     elif args.control_algorithm == 'q_learning':
 
-        target_policy = QTablePolicy(args.initial_q_estimate)
-        if args.qtable_input:
-            with open(args.qtable_input, 'rb') as f:
-                target_policy.q_table = pickle.load(f)
+        target_policy = build_q_table_policy(args, state_interner)
 
         control = QLearningControl(target_policy, behavior_policy, args.learning_rate)
 
@@ -175,17 +191,15 @@ def main():
 
     elif args.control_algorithm == 'q_learning_reversed_update':
 
-        target_policy = QTablePolicy(args.initial_q_estimate)
-        if args.qtable_input:
-            with open(args.qtable_input, 'rb') as f:
-                target_policy.q_table = pickle.load(f)
+        target_policy = build_q_table_policy(args, state_interner)
 
         control = QLearningReversedUpdateControl(target_policy, behavior_policy, args.learning_rate)
 
         qtable_policy_for_export = target_policy
 
-    df = list()
+    return control, qtable_policy_for_export
 
+def run_episodes(args, mdp_builder, control, planner_policy, experiment_data_writer):
 
     episode_ids = build_episode_generator(args.episodes)
     if args.show_progress_bar:
@@ -217,35 +231,371 @@ def main():
         time_spent_in_behavior_episode = (t1 - t0).total_seconds()
 
         # Store results in the dataframe
-        behavior_policy_return_cumulative += mdp.return_history[0]
+        behavior_policy_return_cumulative += mdp.discounted_return
         row = {
             ** { f'arg_{k}':v for k, v in vars(args).items() },
 
             'episode_id': episode_id,
-            'behavior_policy_return': mdp.return_history[0],
+            'behavior_policy_return': mdp.discounted_return,
             'behavior_policy_return_cumulative': behavior_policy_return_cumulative,
             'time_spent_in_behavior_episode': time_spent_in_behavior_episode,
+            # Plans that were used without proven optimality, due to the planning time budget or conflict limit
+            'planner_unproven_plans': planner_policy.unproven_plans,
         }
 
         if args.test_target_policy: 
-            target_policy_return_cumulative += mdp_target.return_history[0]
+            target_policy_return_cumulative += mdp_target.discounted_return
             row |= {
-                'target_policy_return': mdp_target.return_history[0],
+                'target_policy_return': mdp_target.discounted_return,
                 'time_spent_in_target_episode': time_spent_in_target_episode,
                 'target_policy_return_cumulative': target_policy_return_cumulative,
             }
 
-        df.append(row)
-
-        write_experiment_data(df, args.db_file)
+        experiment_data_writer.write(row)
 
         if keyboard_interrupt_occurred:
+            experiment_data_writer.close()
             sys.exit('\nProgram exit due to keyboard interrupt.')
 
 
+def apply_q_table_snapshot(q_table_policy, snapshot):
+    # A snapshot holds the rows of the states that changed since the previous snapshot.
+
+    for state, action_values in snapshot.items():
+
+        q_table_policy.initialize_state(state, action_values.keys())
+
+        for action, value in action_values.items():
+            q_table_policy.update(state, action, value - q_table_policy.value_for(state, action))
+
+def run_actor(args, actor_id, episodes_started, stop_event, snapshot_queue, result_queue, shared_behavior_policy_qtable=None):
+    """
+    Generates episodes with the behavior policy, and sends them to the learner as `EpisodeRecord`s.
+
+    The actor does not learn itself. Its q-table is updated with the snapshots sent by the learner,
+    or, with the shared q-table backend, it is the q-table of the learner itself.
+    """
+
+    # Keyboard interrupts are handled by the learner, which stops the actors.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    try:
+
+        mdp_builder, transition_cache = build_mdp_builder(args, actor_id)
+
+        state_interner = StateInterner() if args.intern_states else None
+
+        if shared_behavior_policy_qtable is not None:
+            behavior_policy_qtable = shared_behavior_policy_qtable
+        else:
+            behavior_policy_qtable = build_q_table_policy(args, state_interner)
+
+        behavior_policy, planner_policy, behavior_planner = build_behavior_policy(args, mdp_builder, behavior_policy_qtable,
+                                                                                  state_interner)
+
+        # The base class does not update any policy.
+        control = OffPolicyControl(behavior_policy, behavior_policy)
+
+        while not stop_event.is_set():
+
+            # Snapshots have to be applied in order, since each one only holds the changed states.
+            try:
+                while True:
+                    apply_q_table_snapshot(behavior_policy_qtable, snapshot_queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            with episodes_started.get_lock():
+                if args.episodes and episodes_started.value >= args.episodes:
+                    break
+                episodes_started.value += 1
+
+            mdp = mdp_builder.build_mdp()
+            episode = EpisodeRecord(mdp)
+
+            t0 = datetime.now()
+            control.learn_episode(mdp, step_limit=args.max_episode_length, per_step_callback=episode)
+            t1 = datetime.now()
+
+            result_queue.put(('episode', actor_id, episode, (t1 - t0).total_seconds(), planner_policy.unproven_plans))
+
+        if args.background_planning:
+            behavior_planner.stop()
+
+        # All actors have the same transitions in their caches, one of them writes its cache back.
+        if actor_id == 0 and transition_cache is not None and args.transition_cache_file:
+            transition_cache.save()
+
+        result_queue.put(('done', actor_id))
+
+    except BaseException:
+        result_queue.put(('error', actor_id, traceback.format_exc()))
+
+def run_episodes_with_actors(args, control, experiment_data_writer):
+
+    mp_context = multiprocessing.get_context()
+
+    episodes_started = mp_context.Value('q', 0)
+    stop_event = mp_context.Event()
+    result_queue = mp_context.Queue()
+    snapshot_queues = [mp_context.Queue() for _ in range(args.workers)]
+
+    # A shared q-table is updated by the learner and read by the actors directly, without snapshots.
+    shared_behavior_policy_qtable = control.behavior_policy if args.qtable_backend == 'shared' else None
+
+    actors = [mp_context.Process(target=run_actor, daemon=True,
+                                 args=(args, actor_id, episodes_started, stop_event, snapshot_queues[actor_id], result_queue,
+                                       shared_behavior_policy_qtable))
+              for actor_id in range(args.workers)]
+
+    for actor in actors:
+        actor.start()
+
+    if args.show_progress_bar:
+        progress_bar = tqdm(total=args.episodes, bar_format='{l_bar}{bar:20}{r_bar}' if args.episodes else None)
+
+    # The states which were learned since the last snapshot, with their available actions
+    changed_states = dict()
+
+    unproven_plans = [0] * args.workers
+    running_actors = args.workers
+
+    episode_id = 0
+    behavior_policy_return_cumulative = 0.0
+
+    try:
+
+        while running_actors > 0:
+
+            message, actor_id, *content = result_queue.get()
+
+            if message == 'done':
+                running_actors -= 1
+                continue
+
+            if message == 'error':
+                raise RuntimeError(f'actor {actor_id} failed:\n{content[0]}')
+
+            episode, time_spent_in_behavior_episode, unproven_plans[actor_id] = content
+
+            control.learn_recorded_episode(episode)
+            changed_states.update(zip(episode.state_history, episode.available_actions_history))
+
+            # Store results in the dataframe
+            behavior_policy_return_cumulative += episode.discounted_return
+            row = {
+                ** { f'arg_{k}':v for k, v in vars(args).items() },
+
+                'episode_id': episode_id,
+                'actor_id': actor_id,
+                'behavior_policy_return': episode.discounted_return,
+                'behavior_policy_return_cumulative': behavior_policy_return_cumulative,
+                'time_spent_in_behavior_episode': time_spent_in_behavior_episode,
+                # Plans that were used without proven optimality, due to the planning time budget or conflict limit
+                'planner_unproven_plans': sum(unproven_plans),
+            }
+
+            experiment_data_writer.write(row)
+
+            episode_id += 1
+            if args.show_progress_bar:
+                progress_bar.update()
+
+            if shared_behavior_policy_qtable is None and episode_id % args.snapshot_interval == 0:
+
+                snapshot = { state: { a: control.behavior_policy.value_for(state, a) for a in available_actions }
+                             for state, available_actions in changed_states.items() }
+                changed_states.clear()
+
+                for snapshot_queue in snapshot_queues:
+                    snapshot_queue.put(snapshot)
+
+            if keyboard_interrupt_occurred:
+                # The actors finish their current episodes, which are still learned.
+                stop_event.set()
+
+    except BaseException:
+        for actor in actors:
+            actor.terminate()
+        raise
+
+    finally:
+        if args.show_progress_bar:
+            progress_bar.close()
+
+        # Snapshots which were not read by the actors are dropped.
+        for snapshot_queue in snapshot_queues:
+            snapshot_queue.cancel_join_thread()
+
+    for actor in actors:
+        actor.join()
+
+    if keyboard_interrupt_occurred:
+        experiment_data_writer.close()
+        sys.exit('\nProgram exit due to keyboard interrupt.')
+
+def main():
+
+    global keyboard_interrupt_occurred
+
+    parser = argparse.ArgumentParser(description='Train a RLASP agent in a given MDP.')
+
+    parser.add_argument('--no_progress_bar', help='Don\'t show progress in stdout',
+                        dest='show_progress_bar', action='store_false')
+    parser.set_defaults(show_progress_bar=True)
+
+    parser.add_argument('--test_target_policy', help='Generate every episode, twice (with same starting state). Once with the behavior policy and learning as usual. Once with the target policy and no learning.',
+                        dest='test_target_policy', action='store_true')
+    parser.set_defaults(test_target_policy=False)
+
+    parser.add_argument('--qtable_input', help='Provides a file location to read a qtable description from. This will be used to initialize the qtables in both behavior and target policy before training. Both pickle files and binary q-table files are accepted.', metavar='qtable.pickle', default=None)
+    parser.add_argument('--qtable_backend', help='How q-tables are stored: as dicts of dicts, in one contiguous NumPy array with incrementally tracked greedy actions, or in shared memory. With several workers, the actors read the shared q-table of the learner instead of receiving snapshots.',
+                        choices=['dict', 'array', 'shared'], default='dict')
+    parser.add_argument('--shared_qtable_max_states', help='The number of states that fit into a shared q-table.',
+                        type=int, default=100000)
+    parser.add_argument('--qtable_output', help='Provides a file location to write a qtable description of the target policy after training. Files ending with `.qtable` are written in the binary q-table format, all others are pickled.', metavar='qtable.pickle', default=None)
+
+    parser.add_argument('--db_file', help='Location to store the generated data. If `None`, no file will be generated.', metavar='db_file.csv', default='out.csv')
+    parser.add_argument('--db_flush_interval', help='The number of episodes after which the generated data is flushed to `db_file`.', type=int, default=1)
+
+    parser.add_argument('--episodes', help='The number of episodes to train for.', type=int, default=None)
+    parser.add_argument('--max_episode_length', help='The maximum number of steps within an episode.', type=int, default=10)
+
+    parser.add_argument('--workers', help='The number of actor processes. Each actor generates episodes with its own copy of the behavior policy and its own MDP engines, and a central learner updates the q-tables. Does not support `--test_target_policy`.',
+                        type=int, default=1)
+    parser.add_argument('--snapshot_interval', help='With several workers, the number of learned episodes after which the learner sends the changed q-values to the actors.',
+                        type=int, default=10)
+
+    # Behavior policies
+    parser.add_argument('--epsilon', help='The "epsilon" parameter for the epsilon-greedy behavior policy. Does nothing for other behavior policies.', type=float, default=0.3)
+    parser.add_argument('--planning_horizon', help='The number of steps into the future considered by the planner', type=int, default=4)
+
+    parser.add_argument('--no_planning', dest='plan_for_new_states', action='store_false')
+    parser.add_argument('--yes_planning', dest='plan_for_new_states', action='store_true')
+    parser.set_defaults(plan_for_new_states=False)
+
+    parser.add_argument('--plan_cache_size', help='The maximal number of ground states for which the planner remembers its plan. Set to 0 to disable the cache.',
+                        type=int, default=100000)
+    parser.add_argument('--reuse_plan_suffix', help='Follow the remaining steps of the last plan as long as the ground states match the predicted ones, instead of planning again. The remaining steps are only optimal for the remaining horizon.',
+                        dest='reuse_plan_suffix', action='store_true')
+    parser.set_defaults(reuse_plan_suffix=False)
+    parser.add_argument('--iterative_deepening', help='Plan for increasing horizons up to the planning horizon, and stop early once a plan reaches a terminal state.',
+                        dest='iterative_deepening', action='store_true')
+    parser.set_defaults(iterative_deepening=False)
+    parser.add_argument('--planning_time_budget', help='Seconds after which a planning call stops and the best plan found so far is used. With iterative deepening, this is the budget for all horizons together.',
+                        dest='planning_time_budget', type=float, default=None)
+    parser.add_argument('--background_planning', help='Plan in a background thread, and use the q-table for new states until their plan is ready. States predicted by a plan are planned speculatively.',
+                        dest='background_planning', action='store_true')
+    parser.set_defaults(background_planning=False)
+    parser.add_argument('--speculation_depth', help='The number of states predicted by a plan that the background planner plans speculatively.',
+                        dest='speculation_depth', type=int, default=1)
+    parser.add_argument('--planning_conflict_limit', help='The number of solver conflicts after which a planning call stops and the best plan found so far is used.',
+                        dest='planning_conflict_limit', type=int, default=None)
+
+    # Control algorithms
+    parser.add_argument('--control_algorithm', help='The control algorithm to be used for training', default='q_learning',
+                              choices={'monte_carlo', 'q_learning', 'q_learning_reversed_update'})
+
+    parser.add_argument('--learning_rate', help='The learning rate (also step-size parameter or alpha) considered by some control algorithms.', type=float, default=0.3)
+    parser.add_argument('--initial_q_estimate', help='The starting q-value estimate for a new state-action pair.', type=float, default=0)
+
+    # Transition cache
+    parser.add_argument('--transition_cache_size', help='The maximal number of ground transitions remembered by deterministic ASP domains. Set to 0 to disable the cache.',
+                        type=int, default=100000)
+    parser.add_argument('--transition_cache_file', help='Provides a file location for the transition cache. A warm cache is read from this file before training (if it exists) and written back after training.',
+                        metavar='transitions.pickle', default=None)
+
+    parser.add_argument('--transition_model', help='How ground transitions are computed: by the ASP encoding, by a native python implementation (blocksworld and sokoban only) or by both, failing whenever they disagree.',
+                        default='asp', choices={'asp', 'python', 'differential'})
+
+    parser.add_argument('--intern_states', help='Store states in all policies under compact integer keys instead of sets of atoms. Trades lookup speed for memory: saves memory for large q-tables, but q-table lookups are several times slower.',
+                        dest='intern_states', action='store_true')
+    parser.set_defaults(intern_states=False)
+
+    # Abstraction / Carcass
+    parser.add_argument('--carcass', help='The filename of the logic programm describing a carcass for the given MDP. The file must be located in `src/mdp/abstraction/carcass_rules`.', 
+                        default=None)
+    parser.add_argument('--abstraction_cache_size', help='The maximal number of ground states for which the carcass remembers the abstract state. Set to 0 to disable the cache.',
+                        type=int, default=100000)
+
+    # MDP's
+    subparsers = parser.add_subparsers(help='The markov decision procedure which should be learned.', title='Markov decision procedure')
+
+    parser_blocksworld = subparsers.add_parser('blocksworld', help='The classic blocksworld.')
+    parser_blocksworld.add_argument('--blocks_world_size', help='The number of blocks in the blocks world.', type=int, default=5)
+    parser_blocksworld.add_argument('--blocks_world_reversed_stack_order', help='If true, block need to be stacked in reverse order.', 
+                                    default=False, action='store_true')
+    parser_blocksworld.set_defaults(mdp='blocksworld', behavior_policy='planning_epsilon_greedy')
+
+    parser_sokoban = subparsers.add_parser('sokoban', help='The sokoban game.')
+    parser_sokoban.add_argument('--sokoban_level_name', help='The sokoban level name.', default='suitcase-05-01')
+    parser_sokoban.set_defaults(mdp='sokoban', behavior_policy='planning_epsilon_greedy')
+
+    parser_slidingpuzzle = subparsers.add_parser('slidingpuzzle', help='The sliding puzzle.')
+    parser_slidingpuzzle.add_argument('--sliding_puzzle_size', help='The sliding puzzle size.', type=int, default=2)
+    parser_slidingpuzzle.add_argument('--sliding_puzzle_missing_pieces', help='Missing pieces in the sliding puzzle.', type=int, default=2)
+    parser_slidingpuzzle.set_defaults(mdp='slidingpuzzle', behavior_policy='planning_epsilon_greedy')
+
+    parser_minigrid = subparsers.add_parser('minigrid', help='The minigrid environment from openAI gym')
+    parser_minigrid.add_argument('--minigrid_level', help='The minigrid level id', default='MiniGrid-MultiRoom-N6-v0')
+    parser_minigrid.add_argument('--minigrid_fully_observable', help='If true, the entire environment will be part of the agents observatons. If false, the agent sees only its immediate environment',
+                                 default=True)
+    parser_minigrid.add_argument('--minigrid_use_alternative_reward_system', 
+                                 help='If `false`, use the original rewards with no discounting. If `true`, a discount factor is introduced and the reward for reaching the goal state will always be 1.',
+                                 action='store_true', default=False)
+    parser_minigrid.add_argument('--minigrid_seed', help='Seed for the levels of the episodes. With several workers, each actor uses its own seed, counting up from this one.',
+                                 type=int, default=None)
+    # Note: max_episode_length is handled internally by minigrid environments -> set it to `None`.
+    parser_minigrid.set_defaults(mdp='minigrid', behavior_policy='planning_epsilon_greedy', max_episode_length=None)
+
+    parser_vacuum = subparsers.add_parser('vacuumworld', help='The sliding puzzle.')
+    parser_vacuum.set_defaults(mdp='vacuumworld', behavior_policy='planning_exploring_starts')
+
+    args = parser.parse_args()
+
+    if args.workers < 1 or args.snapshot_interval < 1:
+        parser.error('--workers and --snapshot_interval must be positive')
+    if args.workers > 1 and args.test_target_policy:
+        parser.error('--test_target_policy is not supported with several workers')
+
+    state_interner = StateInterner() if args.intern_states else None
+
+    behavior_policy_qtable = build_q_table_policy(args, state_interner)
+
+    if args.workers > 1:
+        # The actor processes explore with their own behavior policies. The learner only needs the
+        # q-table of the behavior policy, which it sends to the actors.
+        control, qtable_policy_for_export = build_control(args, behavior_policy_qtable, behavior_policy_qtable, state_interner)
+
+    else:
+        mdp_builder, transition_cache = build_mdp_builder(args)
+        behavior_policy, planner_policy, behavior_planner = build_behavior_policy(args, mdp_builder, behavior_policy_qtable,
+                                                                                  state_interner)
+        control, qtable_policy_for_export = build_control(args, behavior_policy, behavior_policy_qtable, state_interner)
+
+    experiment_data_writer = ExperimentDataWriter(args.db_file, args.db_flush_interval)
+
+    if args.workers > 1:
+        run_episodes_with_actors(args, control, experiment_data_writer)
+    else:
+        run_episodes(args, mdp_builder, control, planner_policy, experiment_data_writer)
+
+    experiment_data_writer.close()
+
+    if args.workers == 1:
+
+        if args.background_planning:
+            behavior_planner.stop()
+
+        if transition_cache is not None and args.transition_cache_file:
+            transition_cache.save()
+
     if args.qtable_output:
-        with open(args.qtable_output, 'wb') as f:
-            pickle.dump(qtable_policy_for_export.q_table, f)
+        save_q_table(qtable_policy_for_export, args.qtable_output)
+
+    if args.qtable_backend == 'shared':
+        for q_table_policy in { id(p): p for p in [behavior_policy_qtable, qtable_policy_for_export] }.values():
+            q_table_policy.unlink()
 
 if __name__ == '__main__':
     main()
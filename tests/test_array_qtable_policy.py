@@ -0,0 +1,101 @@
+import os
+import sys
+import unittest
+import random
+from unittest.mock import patch
+
+# Make sure the path of the framework is included in the import path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+# Framework imports
+from mdp import StateInterner
+from policy import ArrayQTablePolicy, QTablePolicy
+
+import test_qtable_policy
+
+class TestArrayQTablePolicy(test_qtable_policy.TestQTablePolicy):
+
+    # All tests of `QTablePolicy` are run again, with the array backend.
+    def setUp(self):
+        patcher = patch.object(test_qtable_policy, 'QTablePolicy', ArrayQTablePolicy)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_greedy_action_after_decrease(self):
+
+        policy = ArrayQTablePolicy()
+        policy.initialize_state('s', ['a', 'b', 'c'])
+
+        policy.update('s', 'b', 3)
+        policy.update('s', 'c', 2)
+        self.assertEqual('b', policy.suggest_action_for_state('s'))
+
+        # The best action got worse, so the next best one is found again.
+        policy.update('s', 'b', -2)
+        self.assertEqual('c', policy.suggest_action_for_state('s'))
+        self.assertEqual(2, policy.optimal_value_for('s'))
+
+        policy.update('s', 'b', 1)
+        self.assertIn(policy.suggest_action_for_state('s'), {'b', 'c'})
+
+    def test_terminal_state(self):
+
+        policy = ArrayQTablePolicy()
+        policy.initialize_state('s', set())
+
+        self.assertIsNone(policy.suggest_action_for_state('s'))
+        self.assertEqual(0, policy.optimal_value_for('s'))
+
+    def test_contiguous_values(self):
+
+        policy = ArrayQTablePolicy(initial_capacity=1)
+
+        for i in range(10):
+            policy.initialize_state(f's{i}', ['a', 'b'])
+            policy.update(f's{i}', 'b', i)
+
+        self.assertEqual(20, policy.size)
+        self.assertEqual([0, 0, 0, 1, 0, 2], policy.values[:6].tolist())
+
+        # States with the same actions share the action index.
+        self.assertEqual(1, len(policy._action_sets))
+
+    def test_same_values_as_dict_backend(self):
+
+        states = [f's{i}' for i in range(20)]
+        actions = ['a', 'b', 'c', 'd']
+
+        policies = [QTablePolicy(1.0), ArrayQTablePolicy(1.0)]
+
+        rng = random.Random(0)
+        for _ in range(2000):
+
+            state = rng.choice(states)
+            action = rng.choice(actions)
+            delta = rng.choice([-1.0, -0.5, 0.0, 0.5, 1.0])
+
+            for policy in policies:
+                policy.initialize_state(state, actions)
+                policy.update(state, action, delta)
+
+            self.assertEqual(policies[0].optimal_value_for(state), policies[1].optimal_value_for(state))
+            self.assertEqual(policies[0].value_for(state, action), policies[1].value_for(state, action))
+
+        self.assertEqual(policies[0].q_table, policies[1].q_table)
+
+    def test_import_export(self):
+
+        interner = StateInterner()
+        policy = ArrayQTablePolicy(state_interner=interner)
+
+        state = {'on(b1,table)', 'on(b2,b1)'}
+        policy.initialize_state(state, {'move(b2,table)'})
+        policy.update(frozenset(state), 'move(b2,table)', 2.5)
+
+        exported = policy.export_q_table()
+        self.assertEqual({ frozenset(state): { 'move(b2,table)': 2.5 } }, exported)
+
+        other_policy = ArrayQTablePolicy()
+        other_policy.import_q_table(exported)
+        self.assertEqual(2.5, other_policy.optimal_value_for(frozenset(state)))
+        self.assertEqual('move(b2,table)', other_policy.suggest_action_for_state(frozenset(state)))
@@ -0,0 +1,160 @@
+import os
+import sys
+import threading
+import unittest
+from unittest.mock import patch
+
+# Make sure the path of the framework is included in the import path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+# Framework imports
+from mdp import BlocksWorld, BlocksWorldBuilder, SokobanBuilder, LRUCache
+from policy import BackgroundPlanner, PlannerPolicy
+
+class TestBackgroundPlanner(unittest.TestCase):
+
+    def test_plan_is_ready_later(self):
+
+        mdp_builder = BlocksWorldBuilder(blocks_world_size=2)
+        state = frozenset({'on(b0,b1)', 'on(b1,table)'})
+
+        planner = BackgroundPlanner(PlannerPolicy(planning_horizon=2, mdp_builder=mdp_builder))
+
+        # The first request only queues the state.
+        self.assertIsNone(planner.suggest_action_for_ground_state(state))
+
+        planner.wait_until_idle()
+
+        self.assertEqual('move(b0,table)', planner.suggest_action_for_ground_state(state))
+
+        # A ready plan is handed out only once.
+        self.assertNotIn(state, planner.ready_cache)
+
+        planner.stop()
+
+    def test_speculative_planning(self):
+
+        mdp_builder = BlocksWorldBuilder(blocks_world_size=2)
+        mdp = BlocksWorld(state_initial={'on(b0,b1)', 'on(b1,table)'},
+                          state_static={'subgoal(b1,b0)'})
+
+        planner = BackgroundPlanner(PlannerPolicy(planning_horizon=2, mdp_builder=mdp_builder))
+
+        planner.request_plan(mdp.state)
+        planner.wait_until_idle()
+
+        # The state predicted by the plan is planned as well, before the agent gets there.
+        mdp.transition(planner.suggest_action_for_ground_state(mdp.state))
+        self.assertIn(mdp.state, planner.ready_cache)
+        self.assertEqual('move(b1,b0)', planner.suggest_action_for_ground_state(mdp.state))
+
+        planner.stop()
+
+    def test_ready_cache_size(self):
+
+        mdp_builder = BlocksWorldBuilder(blocks_world_size=2)
+
+        planner = BackgroundPlanner(PlannerPolicy(planning_horizon=2, mdp_builder=mdp_builder),
+                                    ready_cache_size=1, speculation_depth=0)
+
+        planner.request_plan({'on(b0,b1)', 'on(b1,table)'})
+        planner.request_plan({'on(b0,table)', 'on(b1,table)'})
+        planner.wait_until_idle()
+
+        self.assertEqual(1, len(planner.ready_cache))
+
+        planner.stop()
+
+    def test_plan_cache(self):
+
+        mdp_builder = BlocksWorldBuilder(blocks_world_size=2)
+        state = frozenset({'on(b0,b1)', 'on(b1,table)'})
+
+        planner_policy = PlannerPolicy(planning_horizon=2, mdp_builder=mdp_builder, plan_cache=LRUCache())
+        planner = BackgroundPlanner(planner_policy, speculation_depth=0)
+
+        with patch.object(planner_policy, 'compute_plan_for_ground_state',
+                          wraps=planner_policy.compute_plan_for_ground_state) as compute_plan:
+
+            for _ in range(2):
+                planner.request_plan(state)
+                planner.wait_until_idle()
+                self.assertEqual('move(b0,table)', planner.suggest_action_for_ground_state(state))
+
+            # The second plan is taken from the plan cache.
+            self.assertEqual(1, compute_plan.call_count)
+
+        planner.stop()
+
+    def test_unproven_plans(self):
+
+        builder = SokobanBuilder(level_name='suitcase-05-02')
+        state = builder.build_mdp().state
+
+        planner_policy = PlannerPolicy(planning_horizon=9, mdp_builder=builder, conflict_limit=200)
+        planner = BackgroundPlanner(planner_policy, speculation_depth=0)
+
+        planner.request_plan(state)
+        planner.wait_until_idle()
+
+        self.assertIsNotNone(planner.suggest_action_for_ground_state(state))
+        self.assertEqual(1, planner_policy.unproven_plans)
+
+        planner.stop()
+
+    def test_state_without_plan(self):
+
+        mdp_builder = BlocksWorldBuilder(blocks_world_size=2)
+        state = frozenset({'on(b0,b1)', 'on(b1,table)'})
+
+        planner_policy = PlannerPolicy(planning_horizon=2, mdp_builder=mdp_builder)
+        planner = BackgroundPlanner(planner_policy)
+
+        with patch.object(planner_policy, 'suggest_plan_for_ground_state', side_effect=ValueError) as suggest_plan:
+
+            self.assertIsNone(planner.suggest_action_for_ground_state(state))
+            planner.wait_until_idle()
+
+            # The state is not queued again.
+            self.assertIsNone(planner.suggest_action_for_ground_state(state))
+            planner.wait_until_idle()
+
+            self.assertEqual(1, suggest_plan.call_count)
+            self.assertIn(state, planner.ready_cache)
+
+        planner.stop()
+
+    def test_stop_drops_queued_states(self):
+
+        mdp_builder = BlocksWorldBuilder(blocks_world_size=2)
+        planner_policy = PlannerPolicy(planning_horizon=2, mdp_builder=mdp_builder)
+        planner = BackgroundPlanner(planner_policy, speculation_depth=3)
+
+        planning = threading.Event()
+        stopping = threading.Event()
+
+        def suggest_plan(ground_state):
+
+            # Every plan predicts new states, which are queued speculatively.
+            planning.set()
+            stopping.wait()
+            return 'a', 0, tuple(('a', 0, ground_state | {f'predicted{i}'}) for i in range(3))
+
+        with patch.object(planner_policy, 'suggest_plan_for_ground_state', side_effect=suggest_plan) as suggest_plan_mock:
+
+            for i in range(5):
+                planner.request_plan({f'state{i}'})
+            planning.wait()
+
+            # Stop while the first state is planned. The other states are dropped.
+            threading.Timer(0.1, stopping.set).start()
+            planner.stop()
+
+            self.assertEqual(1, suggest_plan_mock.call_count)
+            self.assertEqual(1, len(planner.ready_cache))
+            self.assertEqual(0, len(planner._queued_states))
+
+            # Nothing is queued after stopping.
+            planner.request_plan({'state5'})
+            planner.wait_until_idle()
+            self.assertEqual(1, suggest_plan_mock.call_count)
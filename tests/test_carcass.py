@@ -7,7 +7,7 @@ from unittest.mock import MagicMock, patch
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
 
 # Framework imports
-from mdp import BlocksWorld, BlocksWorldBuilder
+from mdp import BlocksWorld, BlocksWorldBuilder, LRUCache
 from mdp.abstraction import Carcass, CarcassBuilder
 from policy import PlannerPolicy
 
@@ -183,3 +183,44 @@ class TestAbstraction(unittest.TestCase):
 
         self.assertNotEqual(ground_action, abstract_mdp.action_history[-1])
         self.assertEqual(ground_action, abstract_mdp.mdp.action_history[-1])
+
+    def test_abstraction_cache(self):
+
+        abstraction_cache = LRUCache()
+        mdp_builder = CarcassBuilder(BlocksWorldBuilder(blocks_world_size=3),
+                                     'blocksworld_stackordered.lp', abstraction_cache)
+
+        abstract_mdp = mdp_builder.build_mdp()
+        self.assertEqual(1, abstraction_cache.misses)
+
+        # The same ground state again -> served from the cache
+        cached_abstract_mdp = Carcass(BlocksWorld(abstract_mdp.ground_state, abstract_mdp.mdp.state_static),
+                                      'blocksworld_stackordered.lp', abstraction_cache=abstraction_cache)
+        self.assertEqual(1, abstraction_cache.hits)
+
+        uncached_abstract_mdp = Carcass(BlocksWorld(abstract_mdp.ground_state, abstract_mdp.mdp.state_static),
+                                        'blocksworld_stackordered.lp')
+
+        for m in [abstract_mdp, cached_abstract_mdp]:
+            self.assertEqual(uncached_abstract_mdp.state, m.state)
+            self.assertEqual(uncached_abstract_mdp.available_actions, m.available_actions)
+            for abstract_action in uncached_abstract_mdp.available_actions:
+                self.assertEqual(uncached_abstract_mdp.ground_actions_of(abstract_action),
+                                 m.ground_actions_of(abstract_action))
+
+    def test_abstraction_cache_debug(self):
+
+        abstraction_cache = LRUCache()
+        mdp = BlocksWorldBuilder(blocks_world_size=3).build_mdp()
+
+        Carcass(BlocksWorld(mdp.state, mdp.state_static), 'blocksworld_stackordered.lp', abstraction_cache=abstraction_cache)
+
+        # In debug mode, the model of the current state is always available.
+        debug_abstract_mdp = Carcass(mdp, 'blocksworld_stackordered.lp', debug=True, abstraction_cache=abstraction_cache)
+        self.assertEqual(0, abstraction_cache.hits)
+        self.assertTrue(any(s.name == 'choose' for s in debug_abstract_mdp._asp_model_symbols))
+
+        debug_abstract_mdp.transition(sorted(debug_abstract_mdp.available_actions)[0])
+        uncached_abstract_mdp = Carcass(BlocksWorld(mdp.state, mdp.state_static), 'blocksworld_stackordered.lp')
+        self.assertEqual(sorted(map(str, uncached_abstract_mdp._asp_model_symbols)),
+                         sorted(map(str, debug_abstract_mdp._asp_model_symbols)))
@@ -0,0 +1,46 @@
+import os
+import sys
+import unittest
+
+# Make sure the path of the framework is included in the import path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
+
+# Framework imports
+from mdp import BlocksWorld
+from mdp.abstraction import Carcass
+from mdp.abstraction.carcass_engine import CarcassEngine
+
+class TestCarcassEngine(unittest.TestCase):
+
+    def test_engine_is_shared(self):
+
+        mdp1 = BlocksWorld(state_initial={'on(b1,table)', 'on(b2,table)'},
+                           state_static={'subgoal(b2,b1)'})
+        mdp2 = BlocksWorld(state_initial={'on(b1,b2)', 'on(b2,table)'},
+                           state_static={'subgoal(b1,b2)'})
+
+        Carcass(mdp1, 'blocksworld_stackordered.lp')
+        Carcass(mdp2, 'blocksworld_stackordered.lp')
+
+        engine = CarcassEngine.for_rules(Carcass.file_path('blocksworld_stackordered.lp'))
+        self.assertIs(engine, CarcassEngine.for_rules(Carcass.file_path('blocksworld_stackordered.lp')))
+        self.assertFalse(engine.has_optimization)
+        self.assertTrue(CarcassEngine.for_rules(Carcass.file_path('minigrid_v2.lp')).has_optimization)
+
+    def test_previous_state_is_forgotten(self):
+
+        rules_file_path = Carcass.file_path('blocksworld_stackordered.lp')
+        engine = CarcassEngine.for_rules(rules_file_path)
+
+        states = [{'on(b1,table)', 'on(b2,table)', 'subgoal(b2,b1)'},
+                  # Block `b3` was never seen by the engine before.
+                  {'on(b1,table)', 'on(b2,table)', 'on(b3,b2)', 'subgoal(b2,b1)'},
+                  {'on(b1,table)', 'on(b2,b1)', 'on(b3,table)', 'subgoal(b3,b2)', 'subgoal(b2,b1)'},
+                  {'on(b1,table)', 'on(b2,table)', 'subgoal(b2,b1)'}]
+
+        for state in states:
+
+            # A new engine only ever sees this one state.
+            expected_symbols = CarcassEngine(rules_file_path).solve(state)
+
+            self.assertEqual(sorted(map(str, expected_symbols)), sorted(map(str, engine.solve(state))))
@@ -7,7 +7,7 @@ from unittest.mock import MagicMock, patch
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
 
 # Framework imports
-from mdp import BlocksWorld, BlocksWorldBuilder
+from mdp import BlocksWorld, BlocksWorldBuilder, LRUCache
 from mdp.abstraction import PrologCarcass, PrologCarcassBuilder
 from policy import PlannerPolicy
 
@@ -174,3 +174,30 @@ class TestCarcassProlog(unittest.TestCase):
         self.assertEqual('carcass_gutter[random]', abstract_mdp.state)
         self.assertEqual({'random'}, abstract_mdp.available_actions)
         self.assertEqual({'move(b3,table)'}, abstract_mdp.ground_actions_of('random'))
+
+    def test_precompute_abstractions(self):
+
+        abstraction_cache = LRUCache()
+        mdp_builder = PrologCarcassBuilder(BlocksWorldBuilder(blocks_world_size=3),
+                                           'prolog_blocksworld_stackordered.pl', abstraction_cache)
+
+        ground_states = [{'on(b0,table)', 'on(b1,table)', 'on(b2,table)'},
+                         {'on(b0,b1)', 'on(b1,table)', 'on(b2,table)'},
+                         {'on(b0,table)', 'on(b1,b0)', 'on(b2,b1)'}]
+
+        mdp_builder.precompute_abstractions(ground_states)
+        self.assertEqual(3, len(abstraction_cache))
+
+        for ground_state in ground_states:
+
+            state_static = mdp_builder.mdp_state_static
+            cached_abstract_mdp = PrologCarcass(BlocksWorld(ground_state, state_static),
+                                                'prolog_blocksworld_stackordered.pl',
+                                                abstraction_cache=abstraction_cache)
+            abstract_mdp = PrologCarcass(BlocksWorld(ground_state, state_static),
+                                         'prolog_blocksworld_stackordered.pl')
+
+            self.assertEqual(abstract_mdp.state, cached_abstract_mdp.state)
+
+        self.assertEqual(3, abstraction_cache.hits)
+        self.assertEqual(0, abstraction_cache.misses)
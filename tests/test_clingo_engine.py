@@ -0,0 +1,60 @@
+import os
+import sys
+import unittest
+
+# Make sure the path of the framework is included in the import path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
+
+# Framework imports
+from mdp import BlocksWorld
+from mdp.clingo_engine import ClingoEngine
+
+class TestClingoEngine(unittest.TestCase):
+
+    def test_engine_is_shared(self):
+
+        mdp1 = BlocksWorld(state_initial={'on(b1,table)', 'on(b2,table)'},
+                           state_static={'subgoal(b2,b1)'})
+        mdp2 = BlocksWorld(state_initial={'on(b1,b2)', 'on(b2,table)'},
+                           state_static={'subgoal(b2,b1)'})
+        mdp3 = BlocksWorld(state_initial={'on(b1,b2)', 'on(b2,table)'},
+                           state_static={'subgoal(b1,b2)'})
+
+        # Same domain and static facts -> same engine
+        self.assertIs(mdp1.engine, mdp2.engine)
+
+        # Different static facts -> different engine
+        self.assertIsNot(mdp1.engine, mdp3.engine)
+
+    def test_unknown_atoms(self):
+
+        engine = ClingoEngine.for_domain(BlocksWorld.file_path('markov_decision_procedure.lp'),
+                                         BlocksWorld.file_path('blocksworld.lp'),
+                                         {'subgoal(b1,b2)'})
+
+        self.assertEqual({'move(b1,b2)', 'move(b2,b1)'},
+                         engine.available_actions({'on(b1,table)', 'on(b2,table)'}))
+
+        # Block `b3` was never seen by the engine before.
+        self.assertEqual({'move(b1,b2)', 'move(b1,b3)', 'move(b2,b1)', 'move(b2,b3)',
+                          'move(b3,b1)', 'move(b3,b2)'},
+                         engine.available_actions({'on(b1,table)', 'on(b2,table)', 'on(b3,table)'}))
+
+        next_state, next_reward, available_actions = engine.transition({'on(b1,table)', 'on(b2,table)'},
+                                                                       'move(b1,b2)')
+        self.assertEqual({'on(b1,b2)', 'on(b2,table)', 'goal'}, next_state)
+        self.assertEqual(99, next_reward)
+        self.assertEqual(set(), available_actions)
+
+    def test_previous_state_is_forgotten(self):
+
+        engine = ClingoEngine.for_domain(BlocksWorld.file_path('markov_decision_procedure.lp'),
+                                         BlocksWorld.file_path('blocksworld.lp'),
+                                         {'subgoal(b1,b2)'})
+
+        engine.transition({'on(b1,table)', 'on(b2,b1)'}, 'move(b2,table)')
+
+        # Nothing of the previous call may leak into this one.
+        next_state, next_reward, _ = engine.transition({'on(b1,table)', 'on(b2,table)'}, 'move(b2,b1)')
+        self.assertEqual({'on(b1,table)', 'on(b2,b1)'}, next_state)
+        self.assertEqual(-1, next_reward)
@@ -8,7 +8,7 @@ from collections import defaultdict, deque
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
 
 # Framework imports
-from mdp import BlocksWorld, VacuumCleanerWorldBuilder
+from mdp import BlocksWorld, VacuumCleanerWorldBuilder, EpisodeRecord
 from policy import QTablePolicy 
 from control import *
 import random
@@ -402,3 +402,44 @@ class TestControl(unittest.TestCase):
 
             },
             my_callback_obj.history[5])
+
+    def test_episode_record(self):
+
+        control = OffPolicyControl(QTablePolicy(), GuidedPolicy(['vacuum', 'move(right)', 'vacuum']))
+
+        mdp = VacuumCleanerWorldBuilder().build_mdp()
+        episode = EpisodeRecord(mdp)
+        control.learn_episode(mdp, per_step_callback=episode)
+
+        self.assertEqual(mdp.state_history, episode.state_history)
+        self.assertEqual(mdp.action_history, episode.action_history)
+        self.assertEqual(mdp.reward_history, episode.reward_history)
+        self.assertEqual(mdp.return_history, episode.return_history)
+
+        self.assertEqual(4, len(episode.available_actions_history))
+        self.assertSetEqual({'vacuum', 'move(right)'}, episode.available_actions_history[0])
+        self.assertSetEqual(set(), episode.available_actions_history[-1])
+
+    def test_learn_recorded_episode(self):
+
+        # Learning from a recorded episode gives the same q-table as learning from the mdp.
+        for build_control in [lambda p, b: QLearningControl(p, b, alpha=0.3),
+                              lambda p, b: QLearningReversedUpdateControl(p, b, alpha=0.3),
+                              lambda p, b: FirstVisitMonteCarloControl(p)]:
+
+            random.seed(1)
+
+            policy = QTablePolicy()
+            control = build_control(policy, policy)
+            replay_policy = QTablePolicy()
+            replay_control = build_control(replay_policy, replay_policy)
+
+            for _ in range(5):
+
+                mdp = VacuumCleanerWorldBuilder().build_mdp()
+                episode = EpisodeRecord(mdp)
+                control.learn_episode(mdp, step_limit=10, per_step_callback=episode)
+
+                replay_control.learn_recorded_episode(episode)
+
+            self.assertDictEqual(policy.q_table, replay_policy.q_table)
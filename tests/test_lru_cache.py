@@ -0,0 +1,99 @@
+import copy
+import os
+import sys
+import tempfile
+import unittest
+
+# Make sure the path of the framework is included in the import path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
+
+# Framework imports
+from mdp import LRUCache, BlocksWorld
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_hits_and_misses(self):
+
+        cache = LRUCache(max_size=10)
+
+        self.assertIsNone(cache.get('a'))
+        cache.put('a', 1)
+        self.assertEqual(1, cache.get('a'))
+        self.assertEqual(1, cache.get('a'))
+
+        self.assertEqual(2, cache.hits)
+        self.assertEqual(1, cache.misses)
+        self.assertAlmostEqual(2/3, cache.hit_rate)
+
+    def test_eviction(self):
+
+        cache = LRUCache(max_size=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+
+        # Using `a` makes `b` the least recently used entry.
+        cache.get('a')
+        cache.put('c', 3)
+
+        self.assertEqual(2, len(cache))
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+
+    def test_persistence(self):
+
+        with tempfile.TemporaryDirectory() as directory:
+
+            file_path = os.path.join(directory, 'cache.pickle')
+
+            cache = LRUCache(max_size=10, file_path=file_path)
+            cache.put(('s', 'a'), (frozenset({'s2'}), -1, {'a2'}))
+            cache.save()
+
+            warm_cache = LRUCache(max_size=10, file_path=file_path)
+            self.assertEqual((frozenset({'s2'}), -1, {'a2'}), warm_cache.get(('s', 'a')))
+
+    def test_copies_are_shared(self):
+
+        cache = LRUCache()
+        self.assertIs(cache, copy.deepcopy(cache))
+
+    def test_cached_transitions(self):
+
+        cache = LRUCache()
+
+        for _ in range(2):
+
+            mdp = BlocksWorld(state_initial={'on(b1,table)', 'on(b2,table)'},
+                              state_static={'subgoal(b2,b1)'},
+                              transition_cache=cache)
+
+            next_state, next_reward = mdp.transition('move(b2,b1)')
+
+            self.assertEqual({'on(b1,table)', 'on(b2,b1)', 'goal'}, next_state)
+            self.assertEqual(99, next_reward)
+            self.assertEqual(set(), mdp.available_actions)
+
+        # The second MDP did not need the solver (neither for its initial actions nor the transition)
+        self.assertEqual(2, cache.hits)
+        self.assertEqual(2, cache.misses)
+
+    def test_cached_available_actions(self):
+
+        cache = LRUCache()
+
+        mdp = BlocksWorld(state_initial={'on(b1,table)', 'on(b2,b1)', 'on(b3,b2)'},
+                          state_static={'subgoal(b1,b2)'},
+                          transition_cache=cache)
+        mdp.transition('move(b3,table)')
+
+        self.assertEqual(0, cache.hits)
+
+        # The available actions of the reached state are known from the transition.
+        # Building an MDP that starts there does not need the solver.
+        mdp = BlocksWorld(state_initial={'on(b1,table)', 'on(b2,b1)', 'on(b3,table)'},
+                          state_static={'subgoal(b1,b2)'},
+                          transition_cache=cache)
+
+        self.assertEqual(1, cache.hits)
+        self.assertEqual({'move(b2,b3)', 'move(b2,table)', 'move(b3,b2)'}, mdp.available_actions)
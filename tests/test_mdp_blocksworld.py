@@ -2,6 +2,9 @@ import os
 import sys
 import unittest
 
+import clingo
+import random
+
 # Make sure the path of the framework is included in the import path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
 
@@ -109,3 +112,72 @@ class TestBlocksWorld(unittest.TestCase):
                           state_static = {'subgoal(b2,b1)'})
 
         self.assertEqual({'on(b1,table)', 'on(b2,table)'}, mdp.ground_state)
+
+    def test_all_states(self):
+
+        # The unranked states are exactly the states enumerated by `blocksworld_initial_states.lp`.
+        for size in range(2, 6):
+
+            builder = BlocksWorldBuilder(size)
+
+            ctl = clingo.Control(['0'])
+            ctl.load(BlocksWorld.file_path('blocksworld_initial_states.lp'))
+            ctl.add('base', [], ' '.join(f'block({t}).' for t in builder.block_terms))
+            ctl.add('base', [], '#show state/1.')
+            ctl.ground([('base', [])])
+
+            with ctl.solve(yield_=True) as models:
+                enumerated_states = { frozenset(str(symbol.arguments[0]) for symbol in model.symbols(shown=True))
+                                      for model in models }
+
+            self.assertEqual(len(enumerated_states), len(builder.all_states))
+            self.assertSetEqual(enumerated_states, set(builder.all_states))
+
+        self.assertEqual([3, 13, 73, 501], [len(BlocksWorldBuilder(n).all_states) for n in range(2, 6)])
+
+    def test_all_states_is_lazy(self):
+
+        builder = BlocksWorldBuilder(9)
+
+        self.assertEqual(4596553, len(builder.all_states))
+        self.assertEqual(builder.all_states[-1], builder.all_states[len(builder.all_states) - 1])
+        self.assertEqual(builder.all_states[2:4], [builder.all_states[2], builder.all_states[3]])
+        self.assertEqual(9, len(builder.all_states[123456]))
+        self.assertRaises(IndexError, builder.all_states.__getitem__, len(builder.all_states))
+
+    def test_grounding_probabilities(self):
+
+        builder = BlocksWorldBuilder(40, transition_model='python')
+        p = BlocksWorldBuilder._grounding_probabilities(40)
+
+        for phi in range(1, 41):
+            for tau in range(41 - phi):
+                self.assertAlmostEqual(builder._g(phi-1, tau+1) / builder._g(phi, tau), p[phi, tau], places=12)
+
+    def test_random_uniform_state(self):
+
+        random.seed(1)
+
+        builder = BlocksWorldBuilder(4, state_enumeration_limit=0)
+        sampled_states = { builder._generate_random_uniform_state() for _ in range(5000) }
+
+        self.assertSetEqual(set(BlocksWorldBuilder(4).all_states), sampled_states)
+
+    def test_random_uniform_state_large(self):
+
+        builder = BlocksWorldBuilder(1000, transition_model='python')
+        state = builder._generate_random_uniform_state()
+
+        on = dict(atom[len('on('):-1].split(',') for atom in state)
+        self.assertEqual(set(builder.block_terms), on.keys())
+
+        # Every block is on the table or on a different block, and no block carries two blocks.
+        blocks_below = [below for below in on.values() if below != 'table']
+        self.assertEqual(len(blocks_below), len(set(blocks_below)))
+
+        for block in on:
+            for _ in range(len(on) + 1):
+                if block == 'table':
+                    break
+                block = on[block]
+            self.assertEqual('table', block)
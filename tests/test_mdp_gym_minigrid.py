@@ -1,5 +1,6 @@
 import os
 import sys
+import random
 import unittest
 import warnings
 
@@ -8,6 +9,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../s
 
 # Framework imports
 from mdp import GymMinigrid, GymMinigridBuilder, GymMinigridCustomLevelBuilder
+from mdp.gym_minigrid import world_object_tuple_to_atom, world_object_tuple_to_term
 
 class TestGymMinigrid(unittest.TestCase):
 
@@ -311,3 +313,77 @@ class TestGymMinigrid(unittest.TestCase):
         self.assertSetEqual(set(), mdp.available_actions)
 
 
+
+    def test_environment_pool(self):
+
+        builder = GymMinigridBuilder('MiniGrid-Empty-5x5-v0')
+
+        first_mdp = builder.build_mdp()
+        env = first_mdp.env
+
+        # Finished episodes keep their environment, e.g. for rendering.
+        for action in ['forward', 'forward', 'right', 'forward', 'forward']:
+            first_mdp.transition(action)
+        self.assertTrue(first_mdp.done)
+        self.assertGreater(first_mdp.reward_history[-1], 0)
+
+        second_mdp = builder.build_mdp()
+        self.assertIsNot(env, second_mdp.env)
+        self.assertIs(env, first_mdp.env)
+        self.assertEqual((3, 3), tuple(first_mdp.env.unwrapped.agent_pos))
+
+        # Once the mdp is gone, its environment is reused, from its start.
+        initial_state = first_mdp.state_history[0]
+        del first_mdp
+
+        third_mdp = builder.build_mdp()
+        self.assertIs(env, third_mdp.env)
+        self.assertEqual(initial_state, third_mdp.state)
+        self.assertFalse(third_mdp.done)
+
+    def test_seed(self):
+
+        # Multi room levels are different for each seed.
+        def states(builder):
+            return [builder.build_mdp().state for _ in range(5)]
+
+        first_states = states(GymMinigridBuilder('MiniGrid-MultiRoom-N2-S4-v0', seed=1))
+
+        self.assertEqual(first_states, states(GymMinigridBuilder('MiniGrid-MultiRoom-N2-S4-v0', seed=1)))
+        self.assertNotEqual(first_states, states(GymMinigridBuilder('MiniGrid-MultiRoom-N2-S4-v0', seed=2)))
+        self.assertGreater(len(set(first_states)), 1)
+
+    def test_incremental_state_encoding(self):
+
+        random.seed(1)
+
+        for env_label, full_observability in [('MiniGrid-DoorKey-8x8-v0', True),
+                                              ('MiniGrid-DoorKey-8x8-v0', False),
+                                              ('MiniGrid-MultiRoom-N4-S5-v0', True)]:
+
+            builder = GymMinigridBuilder(env_label, full_observability, seed=1)
+
+            for _ in range(3):
+
+                mdp = builder.build_mdp()
+
+                while not mdp.done:
+
+                    # Encode the current observation cell by cell.
+                    env = mdp.env
+                    observation = env.unwrapped.gen_obs()
+                    if full_observability:
+                        observation = env.observation(observation)
+
+                    img = observation['image']
+                    width, height, _ = img.shape
+                    state = { world_object_tuple_to_term(x, y, *img[x,y])
+                              for x in range(width) for y in range(height) } - { None }
+                    if env.unwrapped.carrying:
+                        state.add(f'carries({world_object_tuple_to_atom(*env.unwrapped.carrying.encode())})')
+
+                    self.assertSetEqual(state, mdp.state)
+
+                    mdp.transition(random.choice(sorted(mdp.available_actions)))
+
+                self.assertIn('terminal', mdp.state)
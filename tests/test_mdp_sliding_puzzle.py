@@ -1,12 +1,14 @@
 import os
 import sys
+import random
 import unittest
+from collections import deque
 
 # Make sure the path of the framework is included in the import path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
 
 # Framework imports
-from mdp import SlidingPuzzle
+from mdp import SlidingPuzzle, SlidingPuzzleBuilder
 
 class TestSlidingPuzzle(unittest.TestCase):
 
@@ -104,3 +106,56 @@ class TestSlidingPuzzle(unittest.TestCase):
         self.assertEqual(mdp.return_history[2], -1 + 99)
         self.assertEqual(mdp.return_history[3], 99)
         self.assertEqual(mdp.return_history[4], 0) # Return is zero in terminal state
+
+    def reachable_states(self, puzzle_size, missing_pieces):
+
+        # Breadth-first search from the goal state. A state is a tuple with the piece (or `None`)
+        # on each cell, where the cell of position (x, y) is x * puzzle_size + y.
+        n = puzzle_size**2
+        goal = tuple(range(n - missing_pieces)) + (None,) * missing_pieces
+
+        reached = { goal }
+        queue = deque([goal])
+
+        while queue:
+            state = queue.popleft()
+            for cell, piece in enumerate(state):
+                if piece is None:
+                    continue
+                x, y = divmod(cell, puzzle_size)
+                for nx, ny in [(x-1, y), (x+1, y), (x, y-1), (x, y+1)]:
+                    if 0 <= nx < puzzle_size and 0 <= ny < puzzle_size and state[nx * puzzle_size + ny] is None:
+                        next_state = list(state)
+                        next_state[cell], next_state[nx * puzzle_size + ny] = None, piece
+                        next_state = tuple(next_state)
+                        if next_state not in reached:
+                            reached.add(next_state)
+                            queue.append(next_state)
+
+        return { frozenset(f'on(p{piece},{cell // puzzle_size},{cell % puzzle_size})'
+                           for cell, piece in enumerate(state) if piece is not None)
+                 for state in reached }
+
+    def test_solvable_states(self):
+
+        random.seed(1)
+
+        for puzzle_size, missing_pieces in [(2, 1), (2, 2), (3, 1), (3, 3)]:
+
+            builder = SlidingPuzzleBuilder(puzzle_size, missing_pieces)
+            reachable_states = self.reachable_states(puzzle_size, missing_pieces)
+
+            # Exactly the reachable states are ranked, and sampled.
+            self.assertEqual(len(reachable_states), len(builder.all_states))
+            self.assertSetEqual(reachable_states, set(builder.all_states))
+
+            for _ in range(100):
+                self.assertIn(builder._generate_random_state(), reachable_states)
+
+    def test_large_puzzle(self):
+
+        builder = SlidingPuzzleBuilder(30, 1)
+        state = builder._generate_random_state()
+
+        self.assertEqual(30**2 - 1, len(state))
+        self.assertEqual(30**2 - 1, len({ atom.split(',', 1)[1] for atom in state }))
@@ -48,6 +48,28 @@ class TestVacuumCleanerWorld(unittest.TestCase):
         self.assertEqual(mdp.return_history[2], -1 + 99)
         self.assertEqual(mdp.return_history[3], 99)
 
+    def test_returns_incremental(self):
+
+        # Returns are updated with every transition, also with discounting.
+        mdp = VacuumCleanerWorld()
+        mdp.discount_rate = 0.5
+
+        self.assertEqual([0], mdp.return_history)
+        self.assertEqual(0, mdp.discounted_return)
+
+        mdp.transition('move(right)')
+        self.assertEqual([-1, 0], mdp.return_history)
+        self.assertEqual(-1, mdp.discounted_return)
+
+        mdp.transition('vacuum')
+        self.assertEqual([-1 - 0.5, -1, 0], mdp.return_history)
+        self.assertEqual(-1 - 0.5, mdp.discounted_return)
+
+        mdp.transition('move(left)')
+        mdp.transition('vacuum')
+        self.assertEqual([-1 - 0.5 - 0.25 + 0.125 * 99, -1 - 0.5 + 0.25 * 99, -1 + 0.5 * 99, 99, 0], mdp.return_history)
+        self.assertEqual(mdp.return_history[0], mdp.discounted_return)
+
     def test_trajectory(self):
 
         mdp = VacuumCleanerWorld()
@@ -0,0 +1,90 @@
+import os
+import sys
+import random
+import unittest
+
+# Make sure the path of the framework is included in the import path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
+
+# Framework imports
+from mdp import MarkovDecisionProcedure, BlocksWorld, BlocksWorldBuilder, SokobanBuilder
+from mdp.native_engine import parse_atom
+
+class TestNativeEngine(unittest.TestCase):
+
+    def run_random_trajectories(self, mdp_builder, episodes, steps):
+
+        # In the differential mode, every transition is computed by both the ASP encoding and the
+        # native engine. Any disagreement raises an AssertionError.
+        for _ in range(episodes):
+
+            mdp = mdp_builder.build_mdp()
+
+            for _ in range(steps):
+
+                if len(mdp.available_actions) == 0:
+                    break
+
+                mdp.transition(random.choice(sorted(mdp.available_actions)))
+
+    def test_parse_atom(self):
+
+        self.assertEqual(('goal', ()), parse_atom('goal'))
+        self.assertEqual(('on', ('b1', 'table')), parse_atom('on(b1,table)'))
+        self.assertEqual(('push', ('6', '3', 'left')), parse_atom('push(6, 3, left)'))
+
+    def test_blocksworld_differential(self):
+
+        for blocks_world_size in range(2, 7):
+
+            mdp_builder = BlocksWorldBuilder(blocks_world_size, transition_model='differential')
+            self.run_random_trajectories(mdp_builder, episodes=10, steps=20)
+
+    def test_sokoban_differential(self):
+
+        for level_name in ['suitcase-05-01', 'suitcase-05-02', 'suitcase-05-04', 'monkey']:
+
+            mdp_builder = SokobanBuilder(level_name, transition_model='differential')
+            self.run_random_trajectories(mdp_builder, episodes=10, steps=20)
+
+    def test_blocksworld_native(self):
+
+        mdp = BlocksWorld(state_initial={'on(b1,table)', 'on(b2,b1)'},
+                          state_static={'subgoal(b1,b2)'},
+                          transition_model='python')
+
+        self.assertEqual({'move(b2,table)'}, mdp.available_actions)
+
+        next_state, next_reward = mdp.transition('move(b2,table)')
+        self.assertEqual({'on(b1,table)', 'on(b2,table)'}, next_state)
+        self.assertEqual(-1, next_reward)
+        self.assertEqual({'move(b1,b2)', 'move(b2,b1)'}, mdp.available_actions)
+
+        next_state, next_reward = mdp.transition('move(b1,b2)')
+        self.assertEqual({'on(b1,b2)', 'on(b2,table)', 'goal'}, next_state)
+        self.assertEqual(99, next_reward)
+        self.assertEqual(set(), mdp.available_actions)
+
+    def test_sokoban_native(self):
+
+        mdp = SokobanBuilder('suitcase-05-01', transition_model='python').build_mdp()
+        s0 = mdp.state
+
+        mdp.transition('push(6,3,left)')
+        s1 = s0 - { 'sokoban(4,3)', 'box(6,3)' } | { 'sokoban(6,3)', 'box(5,3)' }
+        self.assertSetEqual(s1, mdp.state)
+
+    def test_not_executable(self):
+
+        mdp = BlocksWorld(state_initial={'on(b1,table)', 'on(b2,b1)'},
+                          state_static={'subgoal(b1,b2)'},
+                          transition_model='python')
+
+        with self.assertRaises(ValueError):
+            mdp.transition('move(b1,b2)')
+
+    def test_domain_without_native_engine(self):
+
+        with self.assertRaises(AssertionError):
+            MarkovDecisionProcedure({'robot(left)', 'dirty(left)'}, set(), 1, 'vacuum_cleaner_world.lp',
+                                    transition_model='python')
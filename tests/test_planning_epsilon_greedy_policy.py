@@ -54,6 +54,25 @@ class TestPlanningEpsilonGreedyPolicy(unittest.TestCase):
         planner_policy.suggest_action_for_state.assert_not_called()
 
 
+    def test_plan_not_ready(self):
+
+        # A background planner has no plan ready yet.
+        planner_policy = MagicMock()
+        planner_policy.suggest_action_for_ground_state = MagicMock(return_value=None)
+
+        qtable_policy = MagicMock()
+        qtable_policy.suggest_action_for_state = MagicMock(return_value='qtable')
+
+        policy = PlanningEpsilonGreedyPolicy(planner_policy, MagicMock(), qtable_policy, epsilon=0)
+
+        # The q-table is used instead, until the plan is ready.
+        policy.initialize_state(state='s1', available_actions={'plan', 'qtable'})
+        self.assertEqual('qtable', policy.suggest_action_for_state(state='s1', ground_state='gs1'))
+
+        planner_policy.suggest_action_for_ground_state = MagicMock(return_value='plan')
+        self.assertEqual('plan', policy.suggest_action_for_state(state='s1', ground_state='gs1'))
+        self.assertEqual('qtable', policy.suggest_action_for_state(state='s1', ground_state='gs1'))
+
     def test_no_planning_in_new_states(self):
 
         planner_policy = MagicMock()
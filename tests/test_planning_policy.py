@@ -1,12 +1,13 @@
 import os
 import sys
 import unittest
+from unittest.mock import patch
 
 # Make sure the path of the framework is included in the import path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
 # Framework imports
-from mdp import BlocksWorld, BlocksWorldBuilder, VacuumCleanerWorld, VacuumCleanerWorldBuilder, Sokoban, SokobanBuilder
+from mdp import BlocksWorld, BlocksWorldBuilder, VacuumCleanerWorld, VacuumCleanerWorldBuilder, Sokoban, SokobanBuilder, LRUCache
 from policy import PlannerPolicy
 
 class TestPlanner(unittest.TestCase): 
@@ -204,3 +205,119 @@ class TestPlanner(unittest.TestCase):
 
         self.assertEqual('push(6,4,right)', a)
         self.assertEqual(-101, g)
+
+    def test_plan_cache(self):
+
+        mdp_builder = BlocksWorldBuilder(blocks_world_size=2)
+        state = {'on(b0,b1)', 'on(b1,table)'}
+
+        planner = PlannerPolicy(planning_horizon=2, mdp_builder=mdp_builder, plan_cache=LRUCache())
+
+        with patch.object(planner, 'compute_plan_for_ground_state',
+                          wraps=planner.compute_plan_for_ground_state) as compute_plan:
+
+            self.assertEqual(('move(b0,table)', 98), planner.suggest_action_and_return_for_ground_state(state))
+            self.assertEqual(('move(b0,table)', 98), planner.suggest_action_and_return_for_ground_state(state))
+
+            self.assertEqual(1, compute_plan.call_count)
+
+        _, _, plan = planner.plan_cache.get((planner.mdp_problem_file_path, frozenset(planner.mdp_state_static),
+                                             frozenset(state), 2))
+
+        self.assertEqual((('move(b0,table)', -1, frozenset({'on(b0,table)', 'on(b1,table)'})),
+                          ('move(b1,b0)', 99, frozenset({'on(b0,table)', 'on(b1,b0)', 'goal'}))), plan)
+
+    def test_plan_suffix_reuse(self):
+
+        mdp_builder = BlocksWorldBuilder(blocks_world_size=2)
+        mdp = BlocksWorld(state_initial={'on(b0,b1)', 'on(b1,table)'},
+                          state_static={'subgoal(b1,b0)'})
+
+        planner = PlannerPolicy(planning_horizon=2, mdp_builder=mdp_builder, reuse_plan_suffix=True)
+
+        with patch.object(planner, 'compute_plan_for_ground_state',
+                          wraps=planner.compute_plan_for_ground_state) as compute_plan:
+
+            suggested_action_0, expected_return_0 = planner.suggest_action_and_return_for_ground_state(mdp.state)
+            mdp.transition(suggested_action_0)
+
+            # The next state was predicted by the first plan.
+            suggested_action_1, expected_return_1 = planner.suggest_action_and_return_for_ground_state(mdp.state)
+            mdp.transition(suggested_action_1)
+
+            self.assertEqual(1, compute_plan.call_count)
+
+        self.assertEqual('move(b0,table)', suggested_action_0)
+        self.assertEqual(mdp.return_history[0], expected_return_0)
+
+        self.assertEqual('move(b1,b0)', suggested_action_1)
+        self.assertEqual(mdp.return_history[1], expected_return_1)
+
+    def test_iterative_deepening(self):
+
+        mdp_builder = BlocksWorldBuilder(blocks_world_size=2)
+        state = {'on(b0,table)', 'on(b1,table)'}
+
+        planner = PlannerPolicy(planning_horizon=10, mdp_builder=mdp_builder, plan_cache=LRUCache(),
+                                iterative_deepening=True)
+
+        with patch.object(planner, '_compute_plan_for_horizon',
+                          wraps=planner._compute_plan_for_horizon) as compute_plan:
+
+            # The goal is reached after one step, so there is no need to plan further ahead.
+            self.assertEqual(('move(b1,b0)', 99), planner.suggest_action_and_return_for_ground_state(state))
+            self.assertEqual(2, compute_plan.call_count)
+
+        self.assertEqual(1, len(planner.plan_cache))
+
+    def test_iterative_deepening_time_budget(self):
+
+        mdp_builder = BlocksWorldBuilder(blocks_world_size=2)
+        state = {'on(b0,b1)', 'on(b1,table)'}
+
+        planner = PlannerPolicy(planning_horizon=10, mdp_builder=mdp_builder, plan_cache=LRUCache(),
+                                iterative_deepening=True, time_budget=0)
+
+        # Only the plan for horizon 1 fits into the time budget.
+        suggested_action, _, plan, planned_horizon = planner.compute_plan_for_ground_state(state)
+        self.assertEqual(1, planned_horizon)
+        self.assertEqual(1, len(plan))
+
+        # Incomplete plans are not cached.
+        planner.suggest_action_and_return_for_ground_state(state)
+        self.assertEqual(0, len(planner.plan_cache))
+
+    def test_conflict_limit(self):
+
+        builder = SokobanBuilder(level_name='suitcase-05-02')
+        mdp = builder.build_mdp()
+
+        planner = PlannerPolicy(planning_horizon=9, mdp_builder=builder, plan_cache=LRUCache(), conflict_limit=200)
+
+        # The best plan found within the conflict limit is used, but it is not proven to be optimal.
+        suggested_action, _ = planner.suggest_action_and_return_for_ground_state(mdp.state)
+        self.assertIn(suggested_action, mdp.available_actions)
+        self.assertFalse(planner.optimality_proven)
+        self.assertEqual(1, planner.unproven_plans)
+        self.assertEqual(0, len(planner.plan_cache))
+
+        planner.conflict_limit = None
+
+        self.assertEqual(94, planner.compute_optimal_return_for_ground_state(mdp.state))
+        self.assertTrue(planner.optimality_proven)
+        self.assertEqual(1, planner.unproven_plans)
+        self.assertEqual(1, len(planner.plan_cache))
+
+    def test_tiny_conflict_limit(self):
+
+        builder = SokobanBuilder(level_name='suitcase-05-02')
+        mdp = builder.build_mdp()
+
+        # Without any plan within the conflict limit, the first plan found is used.
+        for conflict_limit in [0, 1, 5]:
+
+            planner = PlannerPolicy(planning_horizon=9, mdp_builder=builder, conflict_limit=conflict_limit)
+
+            suggested_action, _ = planner.suggest_action_and_return_for_ground_state(mdp.state)
+            self.assertIn(suggested_action, mdp.available_actions)
+            self.assertEqual(1, planner.unproven_plans)
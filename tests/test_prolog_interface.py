@@ -8,7 +8,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../s
 
 # Framework imports
 from policy import RandomPolicy
-from mdp.abstraction import PrologInterface
+from mdp.abstraction import PrologInterface, PrologCarcass
 
 class TestPrologInterface(unittest.TestCase):
 
@@ -76,3 +76,40 @@ class TestPrologInterface(unittest.TestCase):
 
         self.assertEqual([{'X':2,'Y':'a'},{'X':3,'Y':'b'}], results[0])
         self.assertEqual([{'X':1,'Y':'c'}], results[1])
+
+    def test_consulted_file_is_reused(self):
+
+        consult_file = PrologCarcass.file_path('prolog_blocksworld_otterlo_example.pl')
+
+        p = PrologInterface()
+
+        kb1 = ['on(b1,b2)', 'on(b2,table)', 'on(b3,table)']
+        kb2 = ['on(b1,table)', 'on(b2,table)', 'on(b3,table)']
+
+        response_1 = p.run_query(kb1, 'choose(R)', consult_file=consult_file)
+        response_2 = p.run_query(kb2, ['choose(R)', 'on(b1,b2)'], consult_file=consult_file)
+
+        self.assertEqual('r1', response_1[0]['R'])
+        self.assertEqual('r2', response_2[0][0]['R'])
+
+        # The facts of the first call are gone
+        self.assertEqual([], response_2[1])
+
+    def test_failing_query(self):
+
+        p = PrologInterface()
+
+        with self.assertRaises(RuntimeError):
+            p.run_query(['p(1)'], 'X is foo + 1')
+
+        # The worker is still usable and the knowledge base is clean
+        self.assertEqual([{'X':2}], p.run_query(['p(2)'], 'p(X)'))
+
+    def test_batch_query(self):
+
+        kbs = [['p(1)'], ['p(2)', 'p(3)'], []]
+        qu = 'p(X)'
+
+        p = PrologInterface()
+
+        self.assertEqual([[{'X':1}], [{'X':2},{'X':3}], []], p.run_batch_query(kbs, qu))
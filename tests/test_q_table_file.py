@@ -0,0 +1,138 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Make sure the path of the framework is included in the import path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+# Framework imports
+from mdp import StateInterner
+from policy import QTableFile, QTablePolicy, ArrayQTablePolicy
+
+class TestQTableFile(unittest.TestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.file_path = os.path.join(self.directory.name, 'q.qtable')
+
+        self.q_table = {
+            frozenset({'on(b1,table)', 'on(b2,b1)'}): { 'move(b2,table)': 2.5, 'move(b1,b2)': -1.0 },
+            frozenset({'on(b1,table)', 'on(b2,table)'}): { 'move(b2,b1)': 0.5, 'move(b1,b2)': 0.0 },
+            'carcass_rule_3[move(b1,b2)]': { 'move(b1,b2)': 7.0 },
+            frozenset({'goal'}): {},
+        }
+
+    def test_write_and_read(self):
+
+        # Items are streamed from a generator.
+        QTableFile.write(self.file_path, (item for item in self.q_table.items()))
+
+        self.assertTrue(QTableFile.is_q_table_file(self.file_path))
+
+        with QTableFile(self.file_path) as q_table_file:
+            self.assertEqual(4, len(q_table_file))
+            self.assertEqual(self.q_table, q_table_file.to_dict())
+
+    def test_partial_loading(self):
+
+        QTableFile.write(self.file_path, self.q_table.items())
+
+        states = [{'on(b1,table)', 'on(b2,b1)'}, 'carcass_rule_3[move(b1,b2)]', 'unknown']
+
+        with QTableFile(self.file_path) as q_table_file:
+            q_table = q_table_file.to_dict(states)
+
+        self.assertEqual({ frozenset(states[0]), states[1] }, q_table.keys())
+
+    def test_not_a_q_table_file(self):
+
+        with open(self.file_path, 'wb') as f:
+            f.write(b'\x80\x04}q\x00.')
+
+        self.assertFalse(QTableFile.is_q_table_file(self.file_path))
+        self.assertRaises(ValueError, QTableFile, self.file_path)
+
+    def test_version(self):
+
+        QTableFile.write(self.file_path, self.q_table.items())
+
+        with open(self.file_path, 'r+b') as f:
+            f.seek(len(QTableFile.MAGIC))
+            f.write((QTableFile.VERSION + 1).to_bytes(4, 'little'))
+
+        self.assertRaises(ValueError, QTableFile, self.file_path)
+
+    def test_policies(self):
+
+        for policy_class in [QTablePolicy, ArrayQTablePolicy]:
+
+            policy = policy_class(state_interner=StateInterner())
+            policy.import_q_table(self.q_table)
+            policy.save(self.file_path)
+
+            other_policy = policy_class()
+            other_policy.load(self.file_path)
+            self.assertEqual(self.q_table, other_policy.q_table)
+
+    def test_memory_mapped_evaluation(self):
+
+        QTableFile.write(self.file_path, self.q_table.items())
+
+        state = frozenset({'on(b1,table)', 'on(b2,b1)'})
+
+        policy = ArrayQTablePolicy()
+        policy.load(self.file_path, mmap_mode='r')
+
+        self.assertEqual('move(b2,table)', policy.suggest_action_for_state(state))
+        self.assertEqual(2.5, policy.optimal_value_for(state))
+        self.assertEqual(0, policy.optimal_value_for(frozenset({'goal'})))
+
+        # The values are a read-only view of the file.
+        self.assertRaises(ValueError, policy.update, state, 'move(b1,b2)', 1.0)
+
+        # With copy-on-write, changes stay in memory.
+        policy = ArrayQTablePolicy()
+        policy.load(self.file_path, mmap_mode='c')
+        policy.update(state, 'move(b1,b2)', 4.0)
+        policy.initialize_state('new', {'a'})
+
+        self.assertEqual('move(b1,b2)', policy.suggest_action_for_state(state))
+        self.assertEqual(3.0, policy.optimal_value_for(state))
+
+        with QTableFile(self.file_path) as q_table_file:
+            self.assertEqual(self.q_table, q_table_file.to_dict())
+
+    def test_close_memory_mapped_file(self):
+
+        QTableFile.write(self.file_path, self.q_table.items())
+
+        state = frozenset({'on(b1,table)', 'on(b2,b1)'})
+
+        # Without a memory map, the file is closed right after loading.
+        with patch.object(QTableFile, 'close', autospec=True, side_effect=QTableFile.close) as close:
+            ArrayQTablePolicy().load(self.file_path)
+            self.assertEqual(1, close.call_count)
+
+        # With a memory map, the file is closed by the policy, which still works afterwards.
+        policy = ArrayQTablePolicy()
+        policy.load(self.file_path, mmap_mode='r')
+        q_table_file = policy._q_table_file
+
+        policy.close()
+        self.assertIsNone(q_table_file._buffer)
+        self.assertIsNone(policy._q_table_file)
+        self.assertEqual(2.5, policy.optimal_value_for(state))
+
+    def test_partial_loading_into_memory(self):
+
+        QTableFile.write(self.file_path, self.q_table.items())
+
+        policy = ArrayQTablePolicy()
+        policy.load(self.file_path, states=['carcass_rule_3[move(b1,b2)]'])
+
+        self.assertEqual(1, policy.size)
+        self.assertEqual(7.0, policy.optimal_value_for('carcass_rule_3[move(b1,b2)]'))
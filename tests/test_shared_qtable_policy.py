@@ -0,0 +1,137 @@
+import os
+import sys
+import unittest
+import multiprocessing
+from unittest.mock import patch
+
+# Make sure the path of the framework is included in the import path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+# Framework imports
+from mdp import BlocksWorldBuilder
+from policy import SharedQTablePolicy, QTablePolicy, PlannerPolicy, RandomPolicy, PlanningEpsilonGreedyPolicy
+from control import QLearningControl
+
+import test_qtable_policy
+
+def count_visits(policy, states):
+
+    for state in states:
+        policy.initialize_state(state, {'visit', 'skip'})
+        policy.update(state, 'visit', 1)
+
+    policy.close()
+
+def learn_episodes(target_policy, behavior_qtable_policy, episodes):
+
+    mdp_builder = BlocksWorldBuilder(blocks_world_size=3)
+
+    behavior_policy = PlanningEpsilonGreedyPolicy(PlannerPolicy(2, mdp_builder), RandomPolicy(),
+                                                  behavior_qtable_policy, epsilon=0.3)
+    control = QLearningControl(target_policy, behavior_policy, 0.3)
+
+    for _ in range(episodes):
+        control.learn_episode(mdp_builder.build_mdp(), step_limit=5)
+
+class TestSharedQTablePolicy(test_qtable_policy.TestQTablePolicy):
+
+    # All tests of `QTablePolicy` are run again, with the shared memory backend.
+    def setUp(self):
+
+        def shared_q_table_policy(*args, **kwargs):
+            policy = SharedQTablePolicy(*args, max_states=100, **kwargs)
+            self.addCleanup(policy.unlink)
+            return policy
+
+        patcher = patch.object(test_qtable_policy, 'QTablePolicy', shared_q_table_policy)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_full(self):
+
+        policy = SharedQTablePolicy(max_states=2)
+        self.addCleanup(policy.unlink)
+
+        policy.initialize_state('s1', {'a'})
+        policy.initialize_state('s2', {'a'})
+        self.assertRaises(RuntimeError, policy.initialize_state, 's3', {'a'})
+
+    def test_hash_collisions(self):
+
+        policy = SharedQTablePolicy(max_states=10)
+        self.addCleanup(policy.unlink)
+
+        # All states get the same key, and are told apart by their records.
+        with patch.object(SharedQTablePolicy, '_hash', staticmethod(lambda state_record: 1)):
+
+            states = [frozenset({'on(b1,table)'}), frozenset({'on(b1,b2)'}), 'carcass_rule_3']
+            for i, state in enumerate(states):
+                policy.initialize_state(state, {'a'})
+                policy.update(state, 'a', i)
+
+            # Without the rows cached in this process, the states are looked up in the shared table.
+            policy._rows.clear()
+
+            self.assertEqual(3, policy.n_states)
+            self.assertEqual([0, 1, 2], [policy.value_for(state, 'a') for state in states])
+            self.assertTrue(policy.is_new_state(frozenset({'on(b2,b1)'})))
+
+    def test_import_export(self):
+
+        q_table = {
+            frozenset({'on(b1,table)', 'on(b2,b1)'}): { 'move(b2,table)': 2.5, 'move(b1,b2)': -1.0 },
+            'carcass_rule_3[move(b1,b2)]': { 'move(b1,b2)': 7.0 },
+            frozenset(): {},
+        }
+
+        policy = SharedQTablePolicy(max_states=10)
+        self.addCleanup(policy.unlink)
+
+        policy.import_q_table(q_table)
+        self.assertEqual(3, policy.n_states)
+        self.assertEqual(q_table, policy.export_q_table())
+
+    def test_processes(self):
+
+        # Processes are spawned, so the policy is pickled and attached to the shared memory again.
+        context = multiprocessing.get_context('spawn')
+
+        policy = SharedQTablePolicy(max_states=100, mp_context=context)
+        self.addCleanup(policy.unlink)
+
+        states = [frozenset({f'at({i})'}) for i in range(20)]
+
+        processes = [context.Process(target=count_visits, args=(policy, states)) for _ in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        # Every state is added once, and no update is lost.
+        self.assertEqual(20, policy.n_states)
+        for state in states:
+            self.assertFalse(policy.is_new_state(state))
+            self.assertEqual(4, policy.value_for(state, 'visit'))
+            self.assertEqual('visit', policy.suggest_action_for_state(state))
+
+    def test_learn_episodes_in_processes(self):
+
+        context = multiprocessing.get_context('spawn')
+
+        target_policy = SharedQTablePolicy(max_states=1000, mp_context=context)
+        behavior_qtable_policy = SharedQTablePolicy(max_states=1000, mp_context=context)
+        self.addCleanup(target_policy.unlink)
+        self.addCleanup(behavior_qtable_policy.unlink)
+
+        processes = [context.Process(target=learn_episodes, args=(target_policy, behavior_qtable_policy, 5))
+                     for _ in range(2)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        self.assertTrue(all(process.exitcode == 0 for process in processes))
+
+        # Both q-tables know the same states, since every state is initialized in both.
+        self.assertGreater(target_policy.n_states, 1)
+        self.assertEqual(target_policy.export_q_table().keys(), behavior_qtable_policy.export_q_table().keys())
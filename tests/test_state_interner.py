@@ -0,0 +1,99 @@
+import copy
+import os
+import sys
+import unittest
+
+# Make sure the path of the framework is included in the import path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
+
+# Framework imports
+from mdp import StateInterner
+from policy import QTablePolicy
+
+class TestStateInterner(unittest.TestCase):
+
+    def test_key(self):
+
+        interner = StateInterner()
+
+        key = interner.key({'on(b1,table)', 'on(b2,b1)'})
+        self.assertEqual(key, interner.key(frozenset({'on(b2,b1)', 'on(b1,table)'})))
+        self.assertEqual(key, interner.key(key))
+        self.assertEqual(2, len(interner))
+
+        self.assertEqual(frozenset({'on(b1,table)', 'on(b2,b1)'}), interner.state(key))
+
+    def test_key_cache(self):
+
+        interner = StateInterner(key_cache_size=2)
+
+        states = [frozenset({'on(b1,table)', f'on(b{i},b1)'}) for i in range(2, 5)]
+        keys = [interner.key(state) for state in states[:2]]
+
+        # The least recently used key is dropped, but all keys stay the same.
+        interner.key(states[0])
+        keys.append(interner.key(states[2]))
+
+        self.assertEqual(2, len(interner._key_cache))
+        self.assertIn(states[0], interner._key_cache)
+        self.assertNotIn(states[1], interner._key_cache)
+        self.assertEqual(keys, [interner.key(state) for state in states])
+        self.assertEqual(keys, [tuple(sorted(interner.atom_id(atom) for atom in state)) for state in states])
+
+    def test_deepcopy(self):
+
+        interner = StateInterner()
+        state = frozenset({'on(b1,table)', 'on(b2,b1)'})
+        key = interner.key(state)
+
+        # A copy has its own atoms and key cache.
+        other_interner = copy.deepcopy(interner)
+        other_interner.key(frozenset({'on(b3,b2)'}))
+
+        self.assertEqual(key, other_interner.key(state))
+        self.assertEqual(2, len(interner))
+        self.assertEqual(1, len(interner._key_cache))
+        self.assertEqual(2, len(other_interner._key_cache))
+
+    def test_string_states_are_not_interned(self):
+
+        interner = StateInterner()
+
+        self.assertEqual('carcass_rule_3', interner.key('carcass_rule_3'))
+        self.assertEqual('carcass_rule_3', interner.state('carcass_rule_3'))
+        self.assertEqual(0, len(interner))
+
+    def test_to_string(self):
+
+        interner1 = StateInterner()
+        interner2 = StateInterner()
+        interner2.atom_id('goal')
+
+        key1 = interner1.key({'on(b1,table)', 'on(b2,b1)'})
+        key2 = interner2.key({'on(b1,table)', 'on(b2,b1)'})
+        self.assertNotEqual(key1, key2)
+
+        string = interner1.to_string(key1)
+        self.assertEqual('on(b1,table) on(b2,b1)', string)
+        self.assertEqual(string, interner2.to_string(key2))
+        self.assertEqual(key2, interner2.from_string(string))
+
+    def test_q_table_policy(self):
+
+        interner = StateInterner()
+        policy = QTablePolicy(state_interner=interner)
+
+        state = {'on(b1,table)', 'on(b2,b1)'}
+        policy.initialize_state(state, {'move(b2,table)'})
+        policy.update(frozenset(state), 'move(b2,table)', 2.5)
+
+        self.assertFalse(policy.is_new_state(state))
+        self.assertEqual(2.5, policy.value_for(state, 'move(b2,table)'))
+        self.assertEqual('move(b2,table)', policy.suggest_action_for_state(state))
+
+        exported = policy.export_q_table()
+        self.assertEqual({ frozenset(state): { 'move(b2,table)': 2.5 } }, exported)
+
+        other_policy = QTablePolicy(state_interner=StateInterner())
+        other_policy.import_q_table(exported)
+        self.assertEqual(2.5, other_policy.value_for(state, 'move(b2,table)'))
@@ -0,0 +1,101 @@
+import os
+import sys
+import random
+import unittest
+
+# Make sure the path of the framework is included in the import path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
+
+# Framework imports
+from mdp import BlocksWorldBuilder, SokobanBuilder, VacuumCleanerWorldBuilder, LRUCache, VectorMDP
+from mdp.clingo_engine import ClingoEngine
+from mdp.batch_clingo_engine import BatchClingoEngine
+
+class TestVectorMDP(unittest.TestCase):
+
+    def assert_same_transitions_as_single_mdps(self, builder, size=4, steps=30):
+
+        random.seed(1)
+
+        vector_mdp = VectorMDP(builder, size, step_limit=8)
+        mdp = vector_mdp.mdps[0]
+        engine = ClingoEngine.for_domain(mdp.interface_file_path, mdp.problem_file_path, mdp.state_static)
+
+        for _ in range(steps):
+
+            states = vector_mdp.states
+            actions = [random.choice(sorted(a)) for a in vector_mdp.available_actions]
+            expected_transitions = [engine.transition(s, a) for s, a in zip(states, actions)]
+            mdps = list(vector_mdp.mdps)
+
+            next_states, next_rewards, dones = vector_mdp.step(actions)
+
+            for i, (next_state, next_reward, available_actions) in enumerate(expected_transitions):
+
+                self.assertEqual(next_state, next_states[i])
+                self.assertEqual(next_reward, next_rewards[i])
+                self.assertEqual(next_state, mdps[i].state)
+                self.assertSetEqual(available_actions, mdps[i].available_actions)
+                self.assertEqual(len(available_actions) == 0 or len(mdps[i].action_history) == 8, dones[i])
+
+    def test_blocksworld(self):
+        self.assert_same_transitions_as_single_mdps(BlocksWorldBuilder(4))
+
+    def test_sokoban(self):
+        # Sokoban uses classically negated atoms.
+        self.assert_same_transitions_as_single_mdps(SokobanBuilder('suitcase-05-01'))
+
+    def test_transition_cache(self):
+
+        transition_cache = LRUCache()
+        self.assert_same_transitions_as_single_mdps(BlocksWorldBuilder(3, transition_cache=transition_cache))
+
+        self.assertGreater(len(transition_cache), 0)
+
+    def test_auto_reset(self):
+
+        vector_mdp = VectorMDP(VacuumCleanerWorldBuilder(), 2)
+        first_mdp, second_mdp = vector_mdp.mdps
+
+        _, rewards, dones = vector_mdp.step(['vacuum', 'move(right)'])
+        self.assertEqual([False, False], dones)
+
+        _, rewards, dones = vector_mdp.step(['move(right)', 'vacuum'])
+        self.assertEqual([False, False], dones)
+
+        next_states, rewards, dones = vector_mdp.step(['vacuum', 'move(left)'])
+        self.assertEqual([True, False], dones)
+        self.assertEqual([99, -1], rewards)
+        self.assertEqual(frozenset({'robot(right)'}), next_states[0])
+
+        # The finished mdp was replaced by a new one.
+        self.assertIs(first_mdp, vector_mdp.finished_mdps[0])
+        self.assertIsNot(first_mdp, vector_mdp.mdps[0])
+        self.assertIs(second_mdp, vector_mdp.mdps[1])
+        self.assertEqual(1, len(vector_mdp.finished_mdps))
+        self.assertEqual(frozenset({'robot(left)', 'dirty(left)', 'dirty(right)'}), vector_mdp.states[0])
+
+    def test_step_limit(self):
+
+        vector_mdp = VectorMDP(BlocksWorldBuilder(3), 3, step_limit=1)
+        _, _, dones = vector_mdp.step([random.choice(sorted(a)) for a in vector_mdp.available_actions])
+
+        self.assertEqual([True, True, True], dones)
+        self.assertEqual(3, len(vector_mdp.finished_mdps))
+
+    def test_action_not_executable(self):
+
+        mdp = BlocksWorldBuilder(3).build_mdp()
+        engine = BatchClingoEngine.for_domain(mdp.interface_file_path, mdp.problem_file_path, mdp.state_static, 2)
+
+        action = sorted(mdp.available_actions)[0]
+        with self.assertRaises(ValueError):
+            engine.transitions([(mdp.state, action), (mdp.state, 'move(b0,b0)')])
+
+        # The engine is still usable afterwards.
+        (next_state, _, _), = engine.transitions([(mdp.state, action)])
+        self.assertEqual(ClingoEngine.for_domain(mdp.interface_file_path, mdp.problem_file_path,
+                                                 mdp.state_static).transition(mdp.state, action)[0], next_state)
+
+if __name__ == '__main__':
+    unittest.main()